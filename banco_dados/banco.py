@@ -1,11 +1,21 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, Table, Text, MetaData, DateTime, Time, JSON
+from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, Table, Text, MetaData, DateTime, Time, JSON, Index
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column,relationship ,sessionmaker, Session
 from pathlib import Path
-from sqlalchemy import create_engine, func, text
+from sqlalchemy import create_engine, func, text, event, select, bindparam, cast, type_coerce
+from sqlalchemy.types import NullType
 from sqlalchemy.exc import SQLAlchemyError
 import pandas as pd
+from banco_dados.cache import cache_consultas, em_cache, incrementar_versao, monitorar_escritas, nao_guardar_resultado, registrar_tabela_derivada
+from banco_dados.monitor_consultas import ConexaoMonitorada, monitorar_consultas
+from banco_dados.tipos import aplicar_tipos
 from datetime import datetime
+import threading
+from contextlib import contextmanager
+import atexit
+import queue
+import time
 import json
+import os
 
 class Base(DeclarativeBase):
     pass
@@ -175,6 +185,9 @@ class CHAPA(Base):
 
 class BAIXA(Base):
     __tablename__ = 'baixa'
+    __table_args__ = (
+        Index('ix_baixa_pcp_id_data', 'pcp_id', 'data'),
+    )
 
     baixa_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # ID único
     pcp_id: Mapped[int] = mapped_column(ForeignKey("pcp.pcp_id"), nullable=False)  # Relacionamento com PCP
@@ -187,12 +200,16 @@ class BAIXA(Base):
     categoria_qualidade: Mapped[int] = mapped_column(Integer, nullable=True)
     status: Mapped[str] = mapped_column(String(50), nullable=True)
     notafiscal: Mapped[str] = mapped_column(String(50), nullable=True)
+    ajuste: Mapped[int] = mapped_column(Integer, nullable=True)  # 1 = ajuste de estoque, fora da produção
 
     # Relacionamento com PCP
     pcp: Mapped["PCP"] = relationship("PCP", back_populates="baixas")     
 
 class RETIRADA(Base):
     __tablename__ = 'retirada'
+    __table_args__ = (
+        Index('ix_retirada_ret_id_pcp', 'ret_id_pcp'),
+    )
 
     ret_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # ID único
     ret_id_pcp: Mapped[int] = mapped_column(ForeignKey("pcp.pcp_id"), nullable=False)  # Relacionamento com PCP
@@ -203,6 +220,15 @@ class RETIRADA(Base):
     # Relacionamento com PCP
     pcp: Mapped["PCP"] = relationship("PCP", back_populates="retiradas")
 
+class PCP_SALDO(Base):
+    # Totais de baixa e retirada por PCP, mantidos pelos triggers de TRIGGERS_PCP_SALDO.
+    # Sem FK: uma baixa pode apontar para um PCP já excluído, como nas tabelas de origem.
+    __tablename__ = 'pcp_saldo'
+
+    pcp_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    qtd_baixa: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text('0'))
+    qtd_retirada: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text('0'))
+
 class RETIRADA_EXP(Base):
     __tablename__ = 'retirada_exp'
 
@@ -218,6 +244,10 @@ class RETIRADA_EXP(Base):
 
 class PLANEJAMENTO(Base):
     __tablename__ = 'planejamento'
+    __table_args__ = (
+        Index('ix_planejamento_id_pcp', 'id_pcp'),
+        Index('ix_planejamento_data_programacao', 'data_programacao'),
+    )
 
     plan_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     id_pcp: Mapped[int] = mapped_column(ForeignKey("pcp.pcp_id"), nullable=False) # Foreign Key to PCP table
@@ -283,6 +313,10 @@ class PRODUTO_COMPRAS(Base):
 
 class ORDEM_COMPRA(Base):
     __tablename__ = 'ordem_compra'
+    __table_args__ = (
+        Index('ix_ordem_compra_oc_pcp_id', 'oc_pcp_id'),
+        Index('ix_ordem_compra_oc_status', 'oc_status'),
+    )
     
     oc_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     oc_nome_solicitacao: Mapped[str] = mapped_column(String(100), nullable=True)
@@ -341,6 +375,9 @@ class COTACAO(Base):
 
 class CARREGAMENTO(Base):
     __tablename__ = 'carregamento'
+    __table_args__ = (
+        Index('ix_carregamento_car_oc_id', 'car_oc_id'),
+    )
     
     car_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     car_oc_id: Mapped[int] = mapped_column(ForeignKey("ordem_compra.oc_id"), nullable=False)  # Linkado com ordem de compra
@@ -387,6 +424,10 @@ class ESTUDO_ESTOQUE(Base):
 
 class PRODUCAO(Base):
     __tablename__ = 'producao'
+    __table_args__ = (
+        Index('ix_producao_setor_maquina_data', 'pr_setor_id', 'pr_maquina_id', 'pr_data'),
+        Index('ix_producao_pr_data', 'pr_data'),
+    )
 
     pr_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     pr_setor_id: Mapped[int] = mapped_column(ForeignKey('setor.setor_id'), nullable=False)
@@ -406,6 +447,9 @@ class PRODUCAO(Base):
 
 class APONTAMENTO(Base):
     __tablename__ = 'apontamento'
+    __table_args__ = (
+        Index('ix_apontamento_ap_pr', 'ap_pr'),
+    )
 
     ap_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     ap_tempo: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -473,6 +517,10 @@ class MAQUINA(Base):
 
 class APONTAMENTO_PRODUTO(Base):
     __tablename__ = 'apontamento_produto'
+    __table_args__ = (
+        Index('ix_apontamento_produto_atp_producao', 'atp_producao'),
+        Index('ix_apontamento_produto_atp_pcp', 'atp_pcp'),
+    )
 
     atp_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     atp_producao: Mapped[int] = mapped_column(ForeignKey('producao.pr_id'), nullable=False)
@@ -605,33 +653,323 @@ class AGENDAMENTO_HISTORICO(Base):
     
     # Relacionamentos
     agendamento: Mapped["AGENDAMENTO_LOGISTICA"] = relationship("AGENDAMENTO_LOGISTICA", back_populates="historico")
+
+class LOGS(Base):
+    __tablename__ = 'logs'
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    tipo_movimentacao: Mapped[str] = mapped_column(String(50), nullable=True)  # insercao, edicao, delecao...
+    nome_tabela: Mapped[str] = mapped_column(String(100), nullable=True)
+    dados_antigos: Mapped[str] = mapped_column(Text, nullable=True)  # JSON
+    dados_novos: Mapped[str] = mapped_column(Text, nullable=True)  # JSON
+    timestamp: Mapped[DateTime] = mapped_column(DateTime, default=datetime.utcnow)
     
 # Criar o banco de dados SQLite ========================
 pasta_atual = Path(__file__).parent
-PATH_TO_BD = pasta_atual / 'bd_pcp.sqlite'
+# PCP_BD_ARQUIVO aponta para outro arquivo (ex.: banco sintético de banco_dados.gerador_dados)
+PATH_TO_BD = Path(os.environ.get('PCP_BD_ARQUIVO', pasta_atual / 'bd_pcp.sqlite'))
 
+# Engine e fábrica de sessões únicas por processo. Banco, listar_*, juncao* e as
+# funções de usuário compartilham o mesmo pool em vez de criar um novo a cada chamada.
 engine = create_engine(
-    f'sqlite:///{PATH_TO_BD}',
-    connect_args={"check_same_thread": False},  # Permitir múltiplos threads
+    f'sqlite:///{PATH_TO_BD.resolve()}',
+    connect_args={
+        "check_same_thread": False,  # Permitir múltiplos threads
+        "factory": ConexaoMonitorada,  # Cursor que mede também o tempo de leitura das linhas
+    },
     pool_size=10,  # Definindo o tamanho do pool (conexões simultâneas)
     max_overflow=20  # Número máximo de conexões extras permitidas
 )
+SessionLocal = sessionmaker(bind=engine)
+
+# Toda escrita que passa pela engine incrementa a versão da tabela no cache de consultas
+monitorar_escritas(engine)
+# Tempo, linhas e origem de cada comando; lentos vão para consultas_lentas.log
+monitorar_consultas(engine)
+
+# Perfis de conexão SQLite ==============================
+# Aplicados em toda conexão nova do pool. O perfil é escolhido por instalação pela
+# variável de ambiente PCP_SQLITE_PERFIL (padrão: "producao").
+# foreign_keys fica desligado em "producao" porque o banco atual tem exclusões que
+# dependem da ausência de checagem (ex.: excluir cliente com PCPs); "estrito" liga.
+PERFIS_SQLITE = {
+    'producao': {
+        'journal_mode': 'WAL',        # leituras não bloqueiam durante escritas
+        'synchronous': 'NORMAL',      # seguro com WAL, menos fsyncs por commit
+        'cache_size': -64000,         # ~64 MB de cache de páginas por conexão
+        'mmap_size': 268435456,       # 256 MB mapeados em memória
+        'temp_store': 'MEMORY',
+        'busy_timeout': 15000,        # espera até 15 s por lock antes de "database is locked"
+        'foreign_keys': 'OFF',
+    },
+    'estrito': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000,
+        'foreign_keys': 'ON',
+    },
+    'legado': {},  # padrões de conexão do SQLite (o journal_mode WAL, se já gravado no arquivo, persiste)
+}
+PERFIL_SQLITE = os.environ.get('PCP_SQLITE_PERFIL', 'producao')
+if PERFIL_SQLITE not in PERFIS_SQLITE:
+    raise ValueError(f"Perfil SQLite '{PERFIL_SQLITE}' inválido. Opções: {', '.join(PERFIS_SQLITE)}.")
+
+@event.listens_for(engine, 'connect')
+def _aplicar_perfil_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, valor in PERFIS_SQLITE[PERFIL_SQLITE].items():
+            cursor.execute(f"PRAGMA {pragma}={valor}")
+    finally:
+        cursor.close()
 
+@event.listens_for(engine, 'connect')
+def _registrar_funcoes_sqlite(dbapi_connection, connection_record):
+    # lower() do SQLite só converte ASCII; os filtros de texto precisam de acentos (Ã, Ç...)
+    dbapi_connection.create_function('minusculo', 1, lambda valor: None if valor is None else str(valor).lower(),
+                                     deterministic=True)
 
-
+def verificar_pragmas():
+    """
+    Lê e imprime os valores efetivos dos pragmas do perfil em uma conexão do pool.
+    Chamada uma vez na inicialização do app (index.py), não na importação.
+    """
+    pragmas = ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout', 'foreign_keys')
+    with engine.connect() as conn:
+        efetivos = {pragma: conn.exec_driver_sql(f"PRAGMA {pragma}").scalar() for pragma in pragmas}
+    print(f"SQLite perfil '{PERFIL_SQLITE}': " + ", ".join(f"{k}={v}" for k, v in efetivos.items()))
+    return efetivos
+
+# Na importação apenas garante que as tabelas existam; a reflexão do esquema e as
+# leituras de dados acontecem sob demanda (ver obter_metadata e obter_dataframe).
 Base.metadata.create_all(bind=engine)
-# Limpar o cache de metadados
-Base.metadata.clear()
 
-# Recarregar o esquema atualizado (sem a tabela pcp_old)
-Base.metadata.reflect(bind=engine)
+def migrar_indices(analisar=False):
+    """
+    Cria os índices declarados nos modelos que ainda não existem no banco.
+    create_all só cria índices junto com tabelas novas; esta etapa cobre bancos já
+    existentes. Roda ANALYZE quando algum índice é criado (ou se analisar=True).
+    Retorna a lista de índices criados.
+    """
+    criados = []
+    with engine.begin() as conn:
+        existentes = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for tabela in Base.metadata.sorted_tables:
+            for indice in sorted(tabela.indexes, key=lambda i: i.name):
+                if indice.name not in existentes:
+                    indice.create(bind=conn, checkfirst=True)
+                    criados.append(indice.name)
+        if criados or analisar:
+            conn.exec_driver_sql("ANALYZE")
+    if criados:
+        print(f"Índices criados: {', '.join(criados)}")
+    return criados
+
+def migrar_colunas():
+    """
+    Adiciona às tabelas existentes as colunas anuláveis declaradas nos modelos
+    que ainda não existem no banco (ex.: baixa.ajuste). create_all não altera
+    tabelas já criadas. Colunas obrigatórias ficam de fora: ALTER TABLE ADD
+    COLUMN exige um valor padrão para elas. Retorna a lista de colunas criadas.
+    """
+    criadas = []
+    with engine.begin() as conn:
+        for tabela in Base.metadata.sorted_tables:
+            existentes = {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{tabela.name}")')}
+            for coluna in tabela.columns:
+                if coluna.name in existentes or not coluna.nullable or coluna.primary_key:
+                    continue
+                tipo = coluna.type.compile(dialect=engine.dialect)
+                conn.exec_driver_sql(f'ALTER TABLE "{tabela.name}" ADD COLUMN "{coluna.name}" {tipo}')
+                criadas.append(f"{tabela.name}.{coluna.name}")
+    if criadas:
+        print(f"Colunas criadas: {', '.join(criadas)}")
+    return criadas
+
+migrar_colunas()
+migrar_indices()
+
+# Saldo materializado por PCP ============================
+# Cada alteração em baixa/retirada ajusta pcp_saldo na mesma transação, então
+# o saldo nunca fica à frente ou atrás das tabelas de origem. Linhas com pcp_id
+# nulo ou não inteiro são ignoradas, como nos antigos SUM() por pcp_id.
+def _sql_trigger_saldo(nome, evento, origem, chave, qtd, coluna, operacoes):
+    corpo = []
+    for registro, sinal in operacoes:
+        corpo.append(f"""
+    INSERT OR IGNORE INTO pcp_saldo (pcp_id, qtd_baixa, qtd_retirada)
+        SELECT {registro}.{chave}, 0, 0 WHERE typeof({registro}.{chave}) = 'integer';
+    UPDATE pcp_saldo SET {coluna} = {coluna} {sinal} COALESCE({registro}.{qtd}, 0)
+        WHERE pcp_id = {registro}.{chave} AND typeof({registro}.{chave}) = 'integer';""")
+    return f"CREATE TRIGGER IF NOT EXISTS {nome} AFTER {evento} ON {origem} BEGIN{''.join(corpo)}\nEND"
+
+TRIGGERS_PCP_SALDO = {}
+for _origem, _chave, _qtd, _coluna in (('baixa', 'pcp_id', 'qtd', 'qtd_baixa'),
+                                       ('retirada', 'ret_id_pcp', 'ret_qtd', 'qtd_retirada')):
+    for _evento, _operacoes in (('INSERT', [('NEW', '+')]),
+                                ('DELETE', [('OLD', '-')]),
+                                (f'UPDATE OF {_chave}, {_qtd}', [('OLD', '-'), ('NEW', '+')])):
+        _nome = f"trg_saldo_{_origem}_{_evento.split()[0].lower()}"
+        TRIGGERS_PCP_SALDO[_nome] = _sql_trigger_saldo(_nome, _evento, _origem, _chave, _qtd, _coluna, _operacoes)
+
+# Escritas em baixa/retirada alteram pcp_saldo por trigger, sem citá-la no SQL
+registrar_tabela_derivada('pcp_saldo', 'baixa', 'retirada')
+
+SQL_SALDO_CALCULADO = """
+    SELECT pcp_id, SUM(qtd_baixa) AS qtd_baixa, SUM(qtd_retirada) AS qtd_retirada
+    FROM (
+        SELECT pcp_id, COALESCE(qtd, 0) AS qtd_baixa, 0 AS qtd_retirada
+        FROM baixa WHERE typeof(pcp_id) = 'integer'
+        UNION ALL
+        SELECT ret_id_pcp, 0, COALESCE(ret_qtd, 0)
+        FROM retirada WHERE typeof(ret_id_pcp) = 'integer'
+    )
+    GROUP BY pcp_id
+"""
 
-engine.dispose()  # Desconecta a engine do banco
-Base.metadata.clear()  # Limpa os metadados
-Base.metadata.reflect(bind=engine)  # Recarrega as tabelas
+def reconstruir_pcp_saldo(conn=None):
+    """
+    Recalcula pcp_saldo inteira a partir de baixa e retirada.
+    Retorna a quantidade de PCPs com saldo.
+    """
+    if conn is None:
+        with engine.begin() as conn:
+            return reconstruir_pcp_saldo(conn)
+    conn.exec_driver_sql("DELETE FROM pcp_saldo")
+    # Linhas inseridas = PCPs com saldo, sem ler a tabela de volta
+    return conn.exec_driver_sql(f"INSERT INTO pcp_saldo (pcp_id, qtd_baixa, qtd_retirada) {SQL_SALDO_CALCULADO}").rowcount
+
+def garantir_pcp_saldo():
+    """
+    Cria os triggers de pcp_saldo que faltam. Se algum foi criado (banco novo ou
+    anterior ao saldo materializado), reconstrói a tabela na mesma transação.
+    Retorna a lista de triggers criados.
+    """
+    criados = []
+    with engine.begin() as conn:
+        existentes = {row[0] for row in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        for nome, sql in TRIGGERS_PCP_SALDO.items():
+            if nome not in existentes:
+                conn.exec_driver_sql(sql)
+                criados.append(nome)
+        if criados:
+            total = reconstruir_pcp_saldo(conn)
+    if criados:
+        print(f"Triggers de pcp_saldo criados ({len(criados)}); saldo reconstruído para {total} PCPs.")
+    return criados
+
+def verificar_pcp_saldo():
+    """
+    Compara pcp_saldo com os totais calculados de baixa e retirada.
+    Retorna um DataFrame com as divergências (vazio se estiver consistente).
+    """
+    sql = f"""
+        WITH calculado AS ({SQL_SALDO_CALCULADO}),
+        ids AS (SELECT pcp_id FROM calculado UNION SELECT pcp_id FROM pcp_saldo)
+        SELECT ids.pcp_id,
+               COALESCE(s.qtd_baixa, 0) AS qtd_baixa_saldo, COALESCE(c.qtd_baixa, 0) AS qtd_baixa_calculada,
+               COALESCE(s.qtd_retirada, 0) AS qtd_retirada_saldo, COALESCE(c.qtd_retirada, 0) AS qtd_retirada_calculada
+        FROM ids
+        LEFT JOIN pcp_saldo s ON s.pcp_id = ids.pcp_id
+        LEFT JOIN calculado c ON c.pcp_id = ids.pcp_id
+        WHERE COALESCE(s.qtd_baixa, 0) != COALESCE(c.qtd_baixa, 0)
+           OR COALESCE(s.qtd_retirada, 0) != COALESCE(c.qtd_retirada, 0)
+        ORDER BY ids.pcp_id
+    """
+    with engine.connect() as conn:
+        return pd.read_sql(text(sql), conn)
+
+def ler_saldos_pcp(pcp_ids=None):
+    """
+    Saldos por PCP: pcp_id, qtd_baixa, qtd_retirada, saldo_em_processo
+    (pcp_qtd - baixas) e saldo_em_estoque (baixas - retiradas), ambos sem
+    negativos. PCPs sem baixa nem retirada vêm com zero.
+    """
+    consulta = (
+        select(
+            PCP.pcp_id,
+            PCP.pcp_qtd,
+            func.coalesce(PCP_SALDO.qtd_baixa, 0).label('qtd_baixa'),
+            func.coalesce(PCP_SALDO.qtd_retirada, 0).label('qtd_retirada'),
+        )
+        .select_from(PCP)
+        .outerjoin(PCP_SALDO, PCP_SALDO.pcp_id == PCP.pcp_id)
+    )
+    ids = None if pcp_ids is None else {int(pcp_id) for pcp_id in pcp_ids}
+    # Listas grandes estouram o limite de parâmetros do SQLite: lê tudo e filtra
+    if ids is not None and len(ids) <= 900:
+        consulta = consulta.where(PCP.pcp_id.in_(sorted(ids)))
+    with engine.connect() as conn:
+        df = pd.read_sql(consulta, conn)
+    if ids is not None and len(ids) > 900:
+        df = df[df['pcp_id'].isin(ids)].reset_index(drop=True)
+    df['saldo_em_processo'] = (pd.to_numeric(df['pcp_qtd'], errors='coerce').fillna(0) - df['qtd_baixa']).clip(lower=0)
+    df['saldo_em_estoque'] = (df['qtd_baixa'] - df['qtd_retirada']).clip(lower=0)
+    return df.drop(columns='pcp_qtd')
+
+garantir_pcp_saldo()
+
+_metadata_refletida = None
+_esquema_tabelas = {}
+_lock_metadata = threading.Lock()
+
+def _montar_esquema(tabela):
+    chave_primaria = [col.name for col in tabela.columns if col.primary_key]
+    nome_id = chave_primaria[0] if chave_primaria else None
+    return {
+        'tabela': tabela,
+        'chave_primaria': nome_id,
+        'colunas_insercao': frozenset(col.name for col in tabela.columns if not col.primary_key),
+        'colunas_edicao': frozenset(col.name for col in tabela.columns if col.name != nome_id),
+    }
+
+def obter_metadata():
+    """
+    Retorna o MetaData refletido do banco, carregado uma única vez por processo.
+    Junto com a reflexão é montado o cache de esquema usado pelo CRUD do Banco.
+    """
+    global _metadata_refletida
+    if _metadata_refletida is None:
+        with _lock_metadata:
+            if _metadata_refletida is None:
+                metadata = MetaData()
+                metadata.reflect(bind=engine)
+                _esquema_tabelas.clear()
+                _esquema_tabelas.update({nome: _montar_esquema(tabela) for nome, tabela in metadata.tables.items()})
+                _metadata_refletida = metadata
+    return _metadata_refletida
+
+def obter_esquema(nome_tabela):
+    """
+    Retorna o esquema em cache da tabela: objeto Table, nome da chave primária
+    e os conjuntos de colunas aceitas em inserção e edição.
+    """
+    obter_metadata()
+    esquema = _esquema_tabelas.get(nome_tabela)
+    if esquema is None:
+        raise ValueError(f"A tabela '{nome_tabela}' não existe no banco de dados.")
+    return esquema
+
+def recarregar_esquema():
+    """
+    Descarta o esquema em cache e reflete o banco novamente.
+    Deve ser chamada apenas após migrações que alterem tabelas ou colunas.
+    """
+    global _metadata_refletida
+    with _lock_metadata:
+        _metadata_refletida = None
+    return obter_metadata()
 #======================================================
 
-def listar_pcp():
+@em_cache('pcp', 'clientes', 'produtos')
+def listar_pcp(tipado=False):
+    """
+    PCP com nome do cliente e do produto. tipado=True aplica os tipos de
+    banco_dados.tipos (datas como datetime64, inteiros anuláveis, categorias).
+    """
     try:
         # Conexão ao banco de dados
         with engine.connect() as conn:
@@ -663,17 +1001,181 @@ def listar_pcp():
     except SQLAlchemyError as e:
         #print(f'ERRO AO BAIXAR BANCO DE DADOS: {e}')
         df = pd.DataFrame()  # Retorna um DataFrame vazio em caso de erro
+        nao_guardar_resultado()
 
+    if tipado:
+        aplicar_tipos(df, obter_esquema('pcp')['tabela'], 'listar_pcp')
     return df
 
-df_pcp = listar_pcp()
+# Filtros do PCP no SQL ==================================
+# A mesma especificação de calculos.Filtros ({coluna: (tipo, valor)} ou lista de
+# critérios) traduzida para o WHERE da junção de listar_pcp. Critérios sem
+# tradução exata (colunas fora da junção, tipos incompatíveis, valores
+# inválidos) voltam para o filtro em memória.
+def _semana_iso(coluna):
+    # Dia do ano da quinta-feira da mesma semana ISO, em blocos de 7 dias
+    quinta = func.date(coluna, '-3 days', 'weekday 4')
+    return (cast(func.strftime('%j', quinta), Integer) - 1).self_group().op('/')(7) + 1
+
+def _colunas_filtro_pcp():
+    colunas = {coluna.name: coluna for coluna in PCP.__table__.c}
+    colunas['cliente_nome'] = CLIENTE.__table__.c.nome
+    colunas['produto_nome'] = PRODUTO.__table__.c.nome
+    # Colunas derivadas de pcp_entrega montadas pelas telas do PCP
+    colunas['pcp_ano'] = cast(func.strftime('%Y', PCP.__table__.c.pcp_entrega), Integer)
+    colunas['pcp_sem'] = colunas['pcp_semana'] = _semana_iso(PCP.__table__.c.pcp_entrega)
+    return colunas
+
+COLUNAS_FILTRO_PCP = _colunas_filtro_pcp()
+
+OPERADORES_COMPARACAO = {
+    '==': lambda coluna, valor: coluna == valor,
+    '>=': lambda coluna, valor: coluna >= valor,
+    '<=': lambda coluna, valor: coluna <= valor,
+    '>': lambda coluna, valor: coluna > valor,
+    '<': lambda coluna, valor: coluna < valor,
+}
+
+def _numero(valor):
+    """
+    Valor convertido para int/float do Python, ou None se não for numérico.
+    """
+    if isinstance(valor, bool) or valor is None or str(valor).strip() == '':
+        return None
+    numero = pd.to_numeric(valor, errors='coerce')
+    if pd.isna(numero):
+        return None
+    return numero.item() if hasattr(numero, 'item') else numero
 
-def listar_dados(nome_tabela):
-    pasta_atual = Path(__file__).parent
-    PATH_TO_BD = pasta_atual / 'bd_pcp.sqlite'
+def _condicao_pcp(coluna, tipo, valor):
+    """
+    Condição SQL equivalente a um critério de Filtros, ou None se não houver.
+    """
+    expressao = COLUNAS_FILTRO_PCP.get(coluna)
+    if expressao is None:
+        return None
+    texto = isinstance(expressao.type, String)
+    inteiro = isinstance(expressao.type, Integer)
+
+    if tipo == 'contem' and isinstance(valor, str):
+        if not (texto or inteiro):
+            return None
+        alvo = expressao if texto else cast(expressao, Text)
+        return func.instr(func.minusculo(alvo), valor.lower()) > 0
+
+    if tipo == 'multi' and isinstance(valor, list):
+        if len(valor) > 900:  # limite de parâmetros do SQLite
+            return None
+        if texto and all(isinstance(v, str) for v in valor):
+            return expressao.in_(valor)
+        # Texto contra coluna inteira não casa no pandas, mas o SQLite converteria
+        numeros = [None if isinstance(v, str) else _numero(v) for v in valor]
+        if inteiro and None not in numeros:
+            return expressao.in_(numeros)
+        return None
+
+    if tipo == 'comparar_num' and isinstance(valor, tuple) and len(valor) == 2:
+        operador, num_valor = valor
+        numero = _numero(num_valor)
+        if not inteiro or operador not in OPERADORES_COMPARACAO or numero is None:
+            return None
+        return OPERADORES_COMPARACAO[operador](expressao, numero)
+
+    if tipo in ('contem', 'multi', 'comparar_num'):
+        return None
+
+    # Filtro exato
+    if texto:
+        return expressao == str(valor)
+    numero = _numero(valor)
+    if inteiro and numero is not None:
+        return expressao == numero
+    return None
+
+def traduzir_filtros_pcp(filtros):
+    """
+    Separa a especificação de filtros em (condições SQL, filtros restantes).
+    Os restantes seguem o formato de Filtros.filtrar.
+    """
+    condicoes, restantes = [], {}
+    for coluna, criterios in filtros.items():
+        if criterios is None:
+            continue
+        sobra = []
+        for tipo, valor in (criterios if isinstance(criterios, list) else [criterios]):
+            if valor is None or (isinstance(valor, (str, list)) and not valor):
+                continue
+            condicao = _condicao_pcp(coluna, tipo, valor)
+            if condicao is None:
+                sobra.append((tipo, valor))
+            else:
+                condicoes.append(condicao)
+        if sobra:
+            restantes[coluna] = sobra if len(sobra) > 1 else sobra[0]
+    return condicoes, restantes
+
+@em_cache('pcp', 'clientes', 'produtos')
+def _colunas_inteiras_pcp():
+    """
+    {coluna inteira: dtype que o pandas dá a ela na leitura completa de listar_pcp}.
+    """
+    inteiras = [c.name for c in PCP.__table__.c if isinstance(c.type, Integer)]
+    with engine.connect() as conn:
+        linha = conn.execute(text(
+            "SELECT COUNT(*), " + ", ".join(f"COUNT({c})" for c in inteiras) + " FROM pcp"
+        )).first()
+    total = linha[0]
+    dtypes = {}
+    for coluna, preenchidos in zip(inteiras, linha[1:]):
+        if preenchidos == total:
+            dtypes[coluna] = 'int64'
+        elif preenchidos > 0:
+            dtypes[coluna] = 'float64'
+    return dtypes
+
+def _ler_pcp_filtrado(condicoes, tipado):
+    tabela_pcp = PCP.__table__
+    # Sem conversão de tipos do SQLAlchemy: datas chegam como texto, igual a listar_pcp
+    colunas = [type_coerce(coluna, NullType()).label(coluna.name) for coluna in tabela_pcp.c]
+    consulta = (
+        select(*colunas, CLIENTE.__table__.c.nome.label('cliente_nome'), PRODUTO.__table__.c.nome.label('produto_nome'))
+        .select_from(tabela_pcp)
+        .outerjoin(CLIENTE.__table__, tabela_pcp.c.pcp_cliente_id == CLIENTE.__table__.c.cliente_id)
+        .outerjoin(PRODUTO.__table__, tabela_pcp.c.pcp_produto_id == PRODUTO.__table__.c.produto_id)
+        .where(*condicoes)
+        .order_by(tabela_pcp.c.pcp_id)
+    )
+    with engine.connect() as conn:
+        df = pd.read_sql(consulta, conn)
+
+    # Mesmos tipos da leitura completa: um subconjunto sem nulos viria como int64
+    for coluna, dtype in _colunas_inteiras_pcp().items():
+        if df[coluna].dtype != dtype:
+            df[coluna] = pd.to_numeric(df[coluna]).astype(dtype)
+    if tipado:
+        aplicar_tipos(df, obter_esquema('pcp')['tabela'], 'listar_pcp')
+    return df
 
-    engine = create_engine(f'sqlite:///{PATH_TO_BD}')
-    Base.metadata.create_all(bind=engine)
+def listar_pcp_filtrado(filtros, tipado=False):
+    """
+    listar_pcp com os critérios de filtros aplicados no SQL, de modo que só as
+    linhas que casam saem do SQLite. Retorna (df, filtros restantes): aplicar
+    Filtros.filtrar(df, restantes) dá o mesmo resultado de
+    Filtros.filtrar(listar_pcp(), filtros), com índice sequencial.
+    """
+    condicoes, restantes = traduzir_filtros_pcp(filtros)
+    if not condicoes:
+        return listar_pcp(tipado=tipado), filtros
+    chave = ('banco_dados.banco.listar_pcp_filtrado', repr(filtros), tipado)
+    try:
+        df = cache_consultas.obter(chave, ('pcp', 'clientes', 'produtos'), lambda: _ler_pcp_filtrado(condicoes, tipado))
+    except SQLAlchemyError as e:
+        print(f'ERRO AO FILTRAR PCP NO BANCO: {e}')
+        return listar_pcp(tipado=tipado), filtros
+    return df, restantes
+
+def listar_dados(nome_tabela):
+    df = pd.DataFrame()
     try:
         # Conexão ao banco de dados
         with engine.connect() as conn:
@@ -685,17 +1187,45 @@ def listar_dados(nome_tabela):
                 pass
     except SQLAlchemyError as e:
         print(f'ERRO AO LER TABELA {nome_tabela.upper()}: {e}')
+        nao_guardar_resultado()
     return df
 
-df_produtos = listar_dados('produtos')
-df_clientes = listar_dados('clientes')
-df_chapas = listar_dados('chapa')
-df_baixas = listar_dados('baixa')
+# DataFrames de apoio carregados sob demanda ============
+# Cada entrada: nome -> (função de carga, tabelas das quais depende).
+DATAFRAMES_SOB_DEMANDA = {
+    'df_pcp': (listar_pcp.sem_cache, ('pcp', 'clientes', 'produtos')),
+    'df_produtos': (lambda: listar_dados('produtos'), ('produtos',)),
+    'df_clientes': (lambda: listar_dados('clientes'), ('clientes',)),
+    'df_chapas': (lambda: listar_dados('chapa'), ('chapa',)),
+    'df_baixas': (lambda: listar_dados('baixa'), ('baixa',)),
+}
+
+def obter_dataframe(nome):
+    """
+    Retorna uma cópia do DataFrame de apoio, lendo do banco apenas no primeiro
+    acesso ou depois que uma das tabelas de origem for alterada.
+    """
+    carregar, tabelas = DATAFRAMES_SOB_DEMANDA[nome]
+    return cache_consultas.obter(('dataframe', nome), tabelas, carregar)
+
+def invalidar_cache(nome_tabela=None):
+    """
+    Incrementa a versão de nome_tabela (ou de todas, se None), descartando os
+    resultados em cache que dependem dela.
+    """
+    incrementar_versao(nome_tabela)
+
+def __getattr__(nome):
+    # Compatibilidade com `from banco_dados.banco import df_pcp` e similares:
+    # o DataFrame só é carregado quando o nome é de fato acessado.
+    if nome in DATAFRAMES_SOB_DEMANDA:
+        return obter_dataframe(nome)
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+#======================================================
 
 def juncao_ret_pcp():
     # Criação da sessão
-    SessionFactory = sessionmaker(bind=engine)
-    session = SessionFactory()
+    session = SessionLocal()
 
     try:
         # Consulta que junta as tabelas RETIRADA, PCP, CLIENTE e PRODUTO
@@ -731,8 +1261,7 @@ def juncao_ret_pcp():
 
 def juncao():
     # Criação da sessão
-    SessionFactory = sessionmaker(bind=engine)
-    session = SessionFactory()
+    session = SessionLocal()
 
     try:
         # Consulta que junta as tabelas PCP, CLIENTE, BAIXA e PRODUTO
@@ -766,26 +1295,267 @@ def juncao():
         # Garantir o fechamento da sessão
         session.close()
 
+# Auditoria assíncrona ==================================
+def _serializar_log(dados):
+    if not dados:
+        return None
+    return json.dumps(dados, ensure_ascii=False, default=str, separators=(',', ':'))
+
+class GravadorLogs:
+    """
+    Fila em memória de registros de auditoria, drenada por uma thread que grava
+    na tabela logs em lotes: a cada intervalo_ms ou quando juntar tamanho_lote
+    linhas, o que vier primeiro. A fila é limitada; quando cheia, quem registra
+    espera até espera_maxima segundos e, se ainda não houver espaço, grava
+    o log diretamente (nenhum registro é descartado).
+    """
+    def __init__(self, intervalo_ms=500, tamanho_lote=200, capacidade=10000, espera_maxima=5):
+        self.intervalo = intervalo_ms / 1000
+        self.tamanho_lote = tamanho_lote
+        self.espera_maxima = espera_maxima
+        self._fila = queue.Queue(maxsize=capacidade)
+        self._parar = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def registrar(self, log):
+        self._iniciar()
+        try:
+            self._fila.put(log, timeout=self.espera_maxima)
+        except queue.Full:
+            self._gravar([log])
+
+    def descarregar(self):
+        """
+        Bloqueia até que todos os logs enfileirados tenham sido gravados.
+        """
+        if self._thread is not None:
+            self._fila.join()
+
+    def encerrar(self):
+        """
+        Grava o que restou na fila e para a thread (registrado no atexit).
+        """
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join(timeout=30)
+        self._thread = None
+
+    def _iniciar(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._parar.clear()
+                    self._thread = threading.Thread(target=self._executar, name='gravador-logs', daemon=True)
+                    self._thread.start()
+
+    def _executar(self):
+        while not (self._parar.is_set() and self._fila.empty()):
+            try:
+                lote = [self._fila.get(timeout=self.intervalo)]
+            except queue.Empty:
+                continue
+            prazo = time.monotonic() + self.intervalo
+            while len(lote) < self.tamanho_lote:
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(self._fila.get(timeout=restante))
+                except queue.Empty:
+                    break
+            try:
+                self._gravar(lote)
+            finally:
+                for _ in lote:
+                    self._fila.task_done()
+
+    def _gravar(self, lote):
+        try:
+            tabela_logs = obter_esquema('logs')['tabela']
+            with engine.begin() as conn:
+                conn.execute(tabela_logs.insert(), lote)
+        except Exception as e:
+            print(f"ERRO AO GRAVAR {len(lote)} LOG(S): {e}")
+
+gravador_logs = GravadorLogs()
+atexit.register(gravador_logs.encerrar)
+
+# Sufixos aceitos nos filtros de ler_tabela: coluna__operador=valor
+OPERADORES_FILTRO = {
+    'in': lambda coluna, valor: coluna.in_(list(valor)),
+    'nao_in': lambda coluna, valor: coluna.not_in(list(valor)),
+    'ne': lambda coluna, valor: coluna != valor,
+    'gt': lambda coluna, valor: coluna > valor,
+    'gte': lambda coluna, valor: coluna >= valor,
+    'lt': lambda coluna, valor: coluna < valor,
+    'lte': lambda coluna, valor: coluna <= valor,
+    'entre': lambda coluna, valor: coluna.between(*valor),
+}
+
+def _obter_coluna(tabela, nome_coluna):
+    if nome_coluna not in tabela.c:
+        raise ValueError(f"A coluna '{nome_coluna}' não existe na tabela '{tabela.name}'.")
+    return tabela.c[nome_coluna]
+
+def montar_filtros(tabela, filtros):
+    """
+    Converte {'coluna': valor, 'coluna__gte': valor, 'coluna__in': [...]} em
+    condições SQLAlchemy. Sem sufixo é igualdade (None vira IS NULL).
+    """
+    condicoes = []
+    for chave, valor in filtros.items():
+        nome_coluna, _, operador = chave.partition('__')
+        coluna = _obter_coluna(tabela, nome_coluna)
+        if not operador:
+            condicoes.append(coluna == valor)
+        elif operador in OPERADORES_FILTRO:
+            condicoes.append(OPERADORES_FILTRO[operador](coluna, valor))
+        else:
+            raise ValueError(f"Operador de filtro '{operador}' não suportado. Use: {', '.join(OPERADORES_FILTRO)}.")
+    return condicoes
+
+def montar_consulta(tabela, colunas=None, filtros=None, order_by=None, limit=None):
+    """
+    Monta o SELECT com projeção, filtros, ordenação ('-coluna' = decrescente) e limite.
+    """
+    if colunas:
+        consulta = select(*[_obter_coluna(tabela, c) for c in colunas])
+    else:
+        consulta = select(tabela)
+    if filtros:
+        consulta = consulta.where(*montar_filtros(tabela, filtros))
+    if order_by:
+        for campo in ([order_by] if isinstance(order_by, str) else order_by):
+            if campo.startswith('-'):
+                consulta = consulta.order_by(_obter_coluna(tabela, campo[1:]).desc())
+            else:
+                consulta = consulta.order_by(_obter_coluna(tabela, campo))
+    if limit is not None:
+        consulta = consulta.limit(limit)
+    return consulta
+
+# Transação ativa por thread (compartilhada entre instâncias de Banco)
+_transacao_local = threading.local()
+
+def _bloquear_escrita(session):
+    """
+    Abre a transação da sessão já com o lock de escrita (BEGIN IMMEDIATE).
+    O pysqlite só inicia a transação no primeiro INSERT/UPDATE/DELETE; sem
+    isto, a leitura dos valores antigos rodaria fora dela e outra conexão
+    poderia alterar a linha entre a leitura e o UPDATE.
+    """
+    conexao = session.connection()
+    if not conexao.connection.dbapi_connection.in_transaction:
+        conexao.exec_driver_sql("BEGIN IMMEDIATE")
+
+def _tipo_chave(tabela, nome_id):
+    """
+    Conversor para o tipo Python da chave primária: callbacks do Dash costumam
+    mandar o id como texto ('1'), e o SQLite compara '1' com 1 pela afinidade
+    da coluna, mas um dicionário indexado pelo valor lido do banco não.
+    """
+    try:
+        return tabela.c[nome_id].type.python_type
+    except NotImplementedError:
+        return lambda valor: valor
+
+def _ler_antigos(session, tabela, nome_id, ids):
+    """
+    Linhas atuais de ids, como {id: dict}, em uma única consulta.
+    """
+    linhas = session.execute(select(tabela).where(tabela.c[nome_id].in_(ids))).mappings()
+    return {linha[nome_id]: dict(linha) for linha in linhas}
+
 class Banco:
-    def __init__(self):
-        # Correção para usar um caminho absoluto para o banco de dados
-        pasta_bd = Path(__file__).parent
-        db_path = pasta_bd / 'bd_pcp.sqlite'
-        database_url = f"sqlite:///{db_path.resolve()}"
-
-        self.engine = create_engine(
-            database_url,
-            connect_args={"check_same_thread": False},
-            pool_size=10,
-            max_overflow=20
-        )
-        self.Session = sessionmaker(bind=self.engine)
-        self.metadata = MetaData()
-        self.metadata.reflect(bind=self.engine)
+    def __init__(self, somente_leitura=False):
+        # Reaproveita a engine, as sessões e o esquema refletido do processo;
+        # instanciar Banco() dentro de callbacks não abre novos pools.
+        self.engine = engine
+        self.Session = SessionLocal
+
+        # Painéis: leituras no snapshot de banco_dados.snapshot, quando ativo.
+        # Formulários usam Banco() e sempre leem as próprias escritas.
+        if somente_leitura:
+            from banco_dados.snapshot import engine_leitura, sessao_leitura
+            self.engine = engine_leitura()
+            self.Session = sessao_leitura()
 
         # Criação da tabela de logs caso não exista
         #self.criar_tabela_logs()
 
+    @property
+    def metadata(self):
+        # Refletido no primeiro uso, não ao instanciar: módulos criam Banco() na importação
+        return obter_metadata()
+
+    @contextmanager
+    def transacao(self):
+        """
+        Unidade de trabalho: dentro de `with banco.transacao():` todas as
+        chamadas CRUD da thread usam a mesma sessão e são confirmadas com um
+        único commit no final. Qualquer exceção desfaz tudo e é repassada.
+        Transações aninhadas reaproveitam a transação externa.
+        """
+        atual = getattr(_transacao_local, 'transacao', None)
+        if atual is not None:
+            yield atual['session']
+            return
+
+        session = self.Session()
+        estado = {'session': session, 'tabelas': set(), 'logs': []}
+        _transacao_local.transacao = estado
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            _transacao_local.transacao = None
+            session.close()
+
+        # Só depois do commit: invalida caches e grava os logs adiados
+        for nome_tabela in estado['tabelas']:
+            invalidar_cache(nome_tabela)
+        for log in estado['logs']:
+            self.registrar_log(*log)
+
+    @contextmanager
+    def _sessao(self):
+        """
+        Sessão para uma operação CRUD: a da transação ativa (sem commit, que
+        fica a cargo de transacao()) ou uma sessão própria com commit.
+        """
+        atual = getattr(_transacao_local, 'transacao', None)
+        if atual is not None:
+            yield atual['session']
+            return
+
+        session = self.Session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _apos_escrita(self, nome_tabela, *log):
+        """
+        Invalida o cache da tabela e registra o log. Dentro de uma
+        transação as duas coisas esperam o commit.
+        """
+        atual = getattr(_transacao_local, 'transacao', None)
+        if atual is not None:
+            atual['tabelas'].add(nome_tabela)
+            atual['logs'].append(log)
+            return
+        invalidar_cache(nome_tabela)
+        self.registrar_log(*log)
+
     def criar_tabela_logs(self):
         # Define a tabela de logs
         if 'logs' not in self.metadata.tables:
@@ -798,213 +1568,305 @@ class Banco:
                 Column('timestamp', DateTime, default=datetime.utcnow)
             )
             self.metadata.create_all(self.engine)
+            recarregar_esquema()
 
     def registrar_log(self, tipo, nome_tabela, dados_antigos=None, dados_novos=None):
         """
         Função para registrar movimentação na tabela de logs.
+        O registro é enfileirado e gravado em lote pelo gravador_logs.
         """
-        session = self.Session()
-        try:
-            dados_antigos = str(dados_antigos) if dados_antigos else None
-            dados_novos = str(dados_novos) if dados_novos else None
-
-            log = {
-                'tipo_movimentacao': tipo,
-                'nome_tabela': nome_tabela,
-                'dados_antigos': dados_antigos,
-                'dados_novos': dados_novos,
-                'timestamp': datetime.utcnow()
-            }
+        gravador_logs.registrar({
+            'tipo_movimentacao': tipo,
+            'nome_tabela': nome_tabela,
+            'dados_antigos': _serializar_log(dados_antigos),
+            'dados_novos': _serializar_log(dados_novos),
+            'timestamp': datetime.utcnow()
+        })
+
+    def ler_tabela(self, nome_tabela, colunas=None, order_by=None, limit=None, tipado=False, **filtros):  # READ
+        """
+        Lê a tabela como DataFrame. Os filtros vão para o WHERE:
+        coluna=valor, coluna__in=[...], coluna__gte=..., coluna__entre=(ini, fim), etc.
+        colunas limita a projeção; order_by aceita 'coluna' ou '-coluna'.
+        tipado=True aplica os tipos de banco_dados.tipos (datas, inteiros anuláveis, categorias).
+        """
+        tabela = obter_esquema(nome_tabela)['tabela']
+        consulta = montar_consulta(tabela, colunas, filtros, order_by, limit)
 
-            tabela_logs = Table('logs', self.metadata, autoload_with=self.engine)
-            session.execute(tabela_logs.insert().values(log))
-            session.commit()
-        finally:
-            session.close()
+        # Dentro de uma transação enxerga as escritas ainda não confirmadas
+        with self._sessao() as session:
+            resultado = session.execute(consulta)
+            # DataFrame direto das tuplas do cursor; mantém as colunas mesmo sem linhas
+            df = pd.DataFrame(resultado.fetchall(), columns=list(resultado.keys()))
+        return aplicar_tipos(df, tabela) if tipado else df
 
-    def ler_tabela(self, nome_tabela, **kwargs):  # READ
-        if nome_tabela not in self.metadata.tables:
-            raise ValueError(f"A tabela '{nome_tabela}' não existe no banco de dados.")
-        
-        tabela = Table(nome_tabela, self.metadata, autoload_with=self.engine)
-        session = self.Session()
-        
-        try:
-            query = session.query(tabela)
-            if kwargs:
-                query = query.filter_by(**kwargs)
+    def ler_em_blocos(self, nome_tabela, tamanho_bloco=5000, colunas=None, tipado=False, **filtros):  # READ em blocos
+        """
+        Gerador de DataFrames de até tamanho_bloco linhas, paginando pela chave
+        primária (WHERE pk > último ORDER BY pk LIMIT n). Aceita os mesmos
+        filtros de ler_tabela e mantém só um bloco em memória por vez.
+        """
+        esquema = obter_esquema(nome_tabela)
+        tabela = esquema['tabela']
+        nome_id = esquema['chave_primaria']
 
-            consulta = query.all()
-            dados = [dict(row._mapping) for row in consulta]  # Converte os resultados para dicionário
-            return pd.DataFrame(dados)  # Retorna um DataFrame
-        finally:
-            session.close()
+        if not nome_id:
+            raise ValueError(f"A tabela '{nome_tabela}' não possui uma chave primária definida.")
+
+        # A chave primária é necessária para paginar, mesmo fora da projeção pedida
+        colunas_consulta = list(colunas) if colunas else None
+        remover_id = bool(colunas_consulta) and nome_id not in colunas_consulta
+        if remover_id:
+            colunas_consulta.append(nome_id)
+
+        base = montar_consulta(tabela, colunas_consulta, filtros, order_by=nome_id, limit=tamanho_bloco)
+        ultimo_id = None
+
+        while True:
+            consulta = base if ultimo_id is None else base.where(tabela.c[nome_id] > ultimo_id)
+            with self._sessao() as session:
+                resultado = session.execute(consulta)
+                linhas = resultado.fetchall()
+                bloco = pd.DataFrame(linhas, columns=list(resultado.keys()))
+
+            if not linhas:
+                return
+            # Valor Python puro da última linha (tipos numpy não são aceitos como parâmetro)
+            ultimo_id = linhas[-1]._mapping[nome_id]
+            if remover_id:
+                bloco = bloco.drop(columns=[nome_id])
+            yield aplicar_tipos(bloco, tabela) if tipado else bloco
+
+            if len(linhas) < tamanho_bloco:
+                return
 
     def inserir_dados(self, nome_tabela, **campos):  # POST 
-        if nome_tabela not in self.metadata.tables:
-            raise ValueError(f"A tabela '{nome_tabela}' não existe no banco de dados.")
-        
-        tabela = Table(nome_tabela, self.metadata, autoload_with=self.engine)
-        session = self.Session()
-        
-        try:
-            colunas = [col.name for col in tabela.columns if not col.primary_key]
-            dados_filtrados = {k: v for k, v in campos.items() if k in colunas}
+        esquema = obter_esquema(nome_tabela)
+        tabela = esquema['tabela']
 
-            if not dados_filtrados:
-                raise ValueError("Nenhum campo válido foi fornecido para inserção.")
+        dados_filtrados = {k: v for k, v in campos.items() if k in esquema['colunas_insercao']}
 
-            # A serialização de dicionários para JSON é tratada pelo tipo JSON do SQLAlchemy.
-            # O código a seguir foi removido para evitar dupla serialização.
-            # for key, value in dados_filtrados.items():
-            #     if isinstance(value, dict):
-            #         dados_filtrados[key] = json.dumps(value, ensure_ascii=False)
+        if not dados_filtrados:
+            raise ValueError("Nenhum campo válido foi fornecido para inserção.")
 
+        # A serialização de dicionários para JSON é tratada pelo tipo JSON do SQLAlchemy.
+        # O código a seguir foi removido para evitar dupla serialização.
+        # for key, value in dados_filtrados.items():
+        #     if isinstance(value, dict):
+        #         dados_filtrados[key] = json.dumps(value, ensure_ascii=False)
+
+        with self._sessao() as session:
             inserir = tabela.insert().values(**dados_filtrados)
             session.execute(inserir)
-            session.commit()
 
-            # Registra o log
-            self.registrar_log("insercao", nome_tabela, dados_novos=dados_filtrados)
-        finally:
-            session.close()
+        # Registra o log
+        self._apos_escrita(nome_tabela, "insercao", nome_tabela, None, dados_filtrados)
+
+    def inserir_em_lote(self, nome_tabela, registros, tamanho_lote=None):  # POST em lote
+        """
+        Insere vários registros em uma única transação (executemany) e grava um
+        único log agregado. tamanho_lote limita quantas linhas vão por comando.
+        Retorna os IDs gerados, na mesma ordem de registros.
+        """
+        esquema = obter_esquema(nome_tabela)
+        tabela = esquema['tabela']
+        nome_id = esquema['chave_primaria']
+
+        dados_filtrados = [{k: v for k, v in campos.items() if k in esquema['colunas_insercao']} for campos in registros]
+        if not dados_filtrados:
+            return []
+        if not all(dados_filtrados):
+            raise ValueError("Nenhum campo válido foi fornecido para inserção em um dos registros.")
+
+        # executemany exige o mesmo conjunto de colunas; agrupa registros heterogêneos
+        grupos = {}
+        for posicao, dados in enumerate(dados_filtrados):
+            grupos.setdefault(tuple(sorted(dados)), []).append(posicao)
+
+        tamanho_lote = tamanho_lote or len(dados_filtrados)
+        ids = [None] * len(dados_filtrados)
+
+        with self._sessao() as session:
+            for posicoes in grupos.values():
+                for inicio in range(0, len(posicoes), tamanho_lote):
+                    lote = posicoes[inicio:inicio + tamanho_lote]
+                    inserir = tabela.insert()
+                    if nome_id:
+                        inserir = inserir.returning(tabela.c[nome_id], sort_by_parameter_order=True)
+                        resultado = session.execute(inserir, [dados_filtrados[p] for p in lote])
+                        for posicao, novo_id in zip(lote, resultado.scalars()):
+                            ids[posicao] = novo_id
+                    else:
+                        session.execute(inserir, [dados_filtrados[p] for p in lote])
+
+        # Um único log para o lote inteiro
+        self._apos_escrita(nome_tabela, "insercao_lote", nome_tabela, None, {'quantidade': len(ids), 'ids': ids, 'registros': dados_filtrados})
+        return ids
 
     def deletar_dado(self, nome_tabela, id):  # DELETE
-        if nome_tabela not in self.metadata.tables:
-            raise ValueError(f"A tabela '{nome_tabela}' não existe no banco de dados.")
+        esquema = obter_esquema(nome_tabela)
+        tabela = esquema['tabela']
         
-        tabela = Table(nome_tabela, self.metadata, autoload_with=self.engine)
+        # Nome da chave primária vem do cache de esquema
+        nome_id = esquema['chave_primaria']
         
-        # Obtém o nome da chave primária automaticamente
-        chave_primaria = [col.name for col in tabela.columns if col.primary_key]
-        
-        if not chave_primaria:
+        if not nome_id:
             raise ValueError(f"A tabela '{nome_tabela}' não possui uma chave primária definida.")
         
-        nome_id = chave_primaria[0]  # Pega o nome correto da chave primária (ex: fo_id)
-        
-        session = self.Session()
-        
-        try:
-            # Obtém os dados antes da exclusão para registrar
-            dados_antigos = session.query(tabela).filter(tabela.c[nome_id] == id).first()
+        with self._sessao() as session:
+            deletar = tabela.delete().where(tabela.c[nome_id] == id)
+            if self.engine.dialect.delete_returning:
+                # SQLite >= 3.35: a linha excluída volta no próprio DELETE
+                dados_antigos = session.execute(deletar.returning(*tabela.c)).mappings().first()
+            else:
+                _bloquear_escrita(session)
+                dados_antigos = session.execute(select(tabela).where(tabela.c[nome_id] == id)).mappings().first()
+                if dados_antigos:
+                    session.execute(deletar)
             if not dados_antigos:
                 raise ValueError(f"O dado com ID '{id}' não foi encontrado.")
+            dados_antigos = dict(dados_antigos)
 
-            dados_antigos = dict(dados_antigos._mapping)  # Converte os dados antigos para dicionário
-            deletar = tabela.delete().where(tabela.c[nome_id] == id)
-            resultado = session.execute(deletar)
-            session.commit()
-
-            # Registra o log
-            self.registrar_log("delecao", nome_tabela, dados_antigos=dados_antigos)
-            return resultado.rowcount > 0
-        finally:
-            session.close()
+        # Registra o log
+        self._apos_escrita(nome_tabela, "delecao", nome_tabela, dados_antigos, None)
+        return True
 
     def editar_dado(self, nome_tabela, id, **campos):  # UPLOAD
-        if nome_tabela not in self.metadata.tables:
-            raise ValueError(f"A tabela '{nome_tabela}' não existe no banco de dados.")
-        
-        tabela = Table(nome_tabela, self.metadata, autoload_with=self.engine)
+        esquema = obter_esquema(nome_tabela)
+        tabela = esquema['tabela']
 
-        # Obtém o nome da chave primária automaticamente
-        chave_primaria = [col.name for col in tabela.columns if col.primary_key]
+        # Nome da chave primária vem do cache de esquema
+        nome_id = esquema['chave_primaria']
         
-        if not chave_primaria:
+        if not nome_id:
             raise ValueError(f"A tabela '{nome_tabela}' não possui uma chave primária definida.")
-        
-        nome_id = chave_primaria[0]  # Pega o nome correto da chave primária (ex: fo_id)
 
-        session = self.Session()
-        
         try:
-            # Obtém os dados antigos antes da atualização
-            dados_antigos = session.query(tabela).filter(tabela.c[nome_id] == id).first()
-            if not dados_antigos:
-                raise ValueError(f"O dado com ID '{id}' não foi encontrado.")
-                
-            dados_antigos = dict(dados_antigos._mapping)  # Converte os dados antigos para dicionário
-
-            colunas = [col.name for col in tabela.columns if col.name != nome_id]
-            dados_filtrados = {k: v for k, v in campos.items() if k in colunas}
+            dados_filtrados = {k: v for k, v in campos.items() if k in esquema['colunas_edicao']}
 
             if not dados_filtrados:
                 raise ValueError("Nenhum campo válido foi fornecido para atualização.")
 
             # A serialização de dicionários para JSON é tratada pelo tipo JSON do SQLAlchemy.
-            # O código a seguir foi removido para evitar dupla serialização.
-            # for key, value in dados_filtrados.items():
-            #     if isinstance(value, dict):
-            #         dados_filtrados[key] = json.dumps(value, ensure_ascii=False)
 
-            atualizar = tabela.update().where(tabela.c[nome_id] == id).values(**dados_filtrados)
-            resultado = session.execute(atualizar)
-            session.commit()
+            with self._sessao() as session:
+                # Valores antigos lidos sob o lock de escrita, na mesma transação do UPDATE
+                _bloquear_escrita(session)
+                # Uma única linha: não depende de o id vir como texto ou número
+                dados_antigos = next(iter(_ler_antigos(session, tabela, nome_id, [id]).values()), None)
+                if not dados_antigos:
+                    raise ValueError(f"O dado com ID '{id}' não foi encontrado.")
+
+                atualizar = tabela.update().where(tabela.c[nome_id] == id).values(**dados_filtrados)
+                resultado = session.execute(atualizar)
 
             # Registra o log
-            self.registrar_log("edicao", nome_tabela, dados_antigos=dados_antigos, dados_novos=dados_filtrados)
+            self._apos_escrita(nome_tabela, "edicao", nome_tabela, dados_antigos, dados_filtrados)
             return resultado.rowcount > 0
         except Exception as e:
             print(f"--- [ERROR] EDITAR_DADO FAILED ---")
             print(e)
             print("---------------------------------")
-            session.rollback()
-        finally:
-            session.close()
+            # Dentro de uma transação o erro sobe para que tudo seja desfeito
+            if getattr(_transacao_local, 'transacao', None) is not None:
+                raise
+
+    def editar_em_lote(self, nome_tabela, alteracoes):  # UPLOAD em lote
+        """
+        Edita várias linhas em uma transação: alteracoes é {id: {coluna: valor}}.
+        Os valores antigos de todas as linhas saem de uma única consulta e cada
+        conjunto de colunas vira um UPDATE com executemany. Se algum id não
+        existir nada é alterado (ValueError). Grava um único log agregado.
+        Retorna a quantidade de linhas alteradas.
+        """
+        esquema = obter_esquema(nome_tabela)
+        tabela = esquema['tabela']
+        nome_id = esquema['chave_primaria']
+
+        if not nome_id:
+            raise ValueError(f"A tabela '{nome_tabela}' não possui uma chave primária definida.")
+
+        # Ids no tipo da chave, para casar com as linhas lidas em _ler_antigos
+        tipo_id = _tipo_chave(tabela, nome_id)
+        dados_filtrados = {tipo_id(id): {k: v for k, v in campos.items() if k in esquema['colunas_edicao']}
+                           for id, campos in alteracoes.items()}
+        if not dados_filtrados:
+            return 0
+        if not all(dados_filtrados.values()):
+            raise ValueError("Nenhum campo válido foi fornecido para atualização em um dos registros.")
+
+        # executemany exige o mesmo conjunto de colunas; agrupa alterações heterogêneas
+        grupos = {}
+        for id, dados in dados_filtrados.items():
+            grupos.setdefault(tuple(sorted(dados)), []).append(id)
+
+        alteradas = 0
+        with self._sessao() as session:
+            _bloquear_escrita(session)
+            dados_antigos = _ler_antigos(session, tabela, nome_id, list(dados_filtrados))
+            faltantes = [id for id in dados_filtrados if id not in dados_antigos]
+            if faltantes:
+                raise ValueError(f"Os dados com ID {faltantes} não foram encontrados.")
+
+            for colunas, ids in grupos.items():
+                # Parâmetros com prefixo: o SQLAlchemy reserva os nomes das colunas para o SET
+                atualizar = tabela.update().where(tabela.c[nome_id] == bindparam('_id')) \
+                                           .values({coluna: bindparam(f'_{coluna}') for coluna in colunas})
+                parametros = [{'_id': id, **{f'_{k}': v for k, v in dados_filtrados[id].items()}} for id in ids]
+                resultado = session.execute(atualizar, parametros)
+                alteradas += resultado.rowcount
+
+        # Um único log para o lote inteiro
+        self._apos_escrita(nome_tabela, "edicao_lote", nome_tabela, dados_antigos, dados_filtrados)
+        return alteradas
 
 # Função para adicionar usuários
 def add_user(username, password, user_level="user"):
-    SessionFactory = sessionmaker(bind=engine)
-    session = SessionFactory()
-    if session.query(User).filter_by(username=username).first():
-        print(f"Usuário '{username}' já existe.")
-        return
-    new_user = User(username=username, password=password, user_level=user_level)
-    session.add(new_user)
-    session.commit()
+    with SessionLocal() as session:
+        if session.query(User).filter_by(username=username).first():
+            print(f"Usuário '{username}' já existe.")
+            return
+        new_user = User(username=username, password=password, user_level=user_level)
+        session.add(new_user)
+        session.commit()
     print(f"Usuário '{username}' com nível '{user_level}' adicionado com sucesso.")
 
 # Função para editar senha
 def edit_password(username, new_password):
-    SessionFactory = sessionmaker(bind=engine)
-    session = SessionFactory()
-    user = session.query(User).filter_by(username=username).first()
-    if not user:
-        print(f"Usuário '{username}' não encontrado.")
-        return
-    user.password = new_password
-    session.commit()
+    with SessionLocal() as session:
+        user = session.query(User).filter_by(username=username).first()
+        if not user:
+            print(f"Usuário '{username}' não encontrado.")
+            return
+        user.password = new_password
+        session.commit()
     print(f"Senha do usuário '{username}' atualizada com sucesso.")
 
 # Função para editar nível de usuário
 def edit_user_level(username, new_user_level):
-    SessionFactory = sessionmaker(bind=engine)
-    session = SessionFactory()
-    user = session.query(User).filter_by(username=username).first()
-    if not user:
-        print(f"Usuário '{username}' não encontrado.")
-        return
-    user.user_level = new_user_level
-    session.commit()
+    with SessionLocal() as session:
+        user = session.query(User).filter_by(username=username).first()
+        if not user:
+            print(f"Usuário '{username}' não encontrado.")
+            return
+        user.user_level = new_user_level
+        session.commit()
     print(f"Nível do usuário '{username}' atualizado para '{new_user_level}'.")
 
 # Função para excluir usuários
 def delete_user(username):
-    SessionFactory = sessionmaker(bind=engine)
-    session = SessionFactory()
-    user = session.query(User).filter_by(username=username).first()
-    if not user:
-        print(f"Usuário '{username}' não encontrado.")
-        return
-    session.delete(user)
-    session.commit()
+    with SessionLocal() as session:
+        user = session.query(User).filter_by(username=username).first()
+        if not user:
+            print(f"Usuário '{username}' não encontrado.")
+            return
+        session.delete(user)
+        session.commit()
     print(f"Usuário '{username}' excluído com sucesso.")
 
 # Função de autenticação personalizada com banco de dados
 def authenticate_user(username, password):
-    SessionFactory = sessionmaker(bind=engine)
-    session = SessionFactory()
+    session = SessionLocal()
     try:
         user = session.query(User).filter_by(username=username).first()
         if user and user.password == password:
@@ -1040,12 +1902,12 @@ def criar_usuario_admin_inicial():
     Cria um usuário admin inicial se não existir nenhum usuário no sistema.
     Esta função deve ser chamada na inicialização do sistema.
     """
-    SessionFactory = sessionmaker(bind=engine)
-    session = SessionFactory()
+    session = SessionLocal()
     
     try:
-        # Verifica se já existe algum usuário no sistema
-        total_usuarios = session.query(User).count()
+        # Verifica se já existe algum usuário no sistema. Contagem pela tabela, sem
+        # session.query(User): a configuração dos mappers fica para a primeira consulta ORM
+        total_usuarios = session.execute(select(func.count()).select_from(User.__table__)).scalar()
         
         if total_usuarios == 0:
             # Permissões completas para o admin inicial
@@ -0,0 +1,321 @@
+"""
+Cache de resultados de consultas com invalidação por versão de tabela.
+
+Cada tabela tem um contador de versão que é incrementado sempre que alguém
+escreve nela (INSERT/UPDATE/DELETE passando pela engine, ou pelos métodos de
+Banco). Escritas no arquivo que não passam pela engine (outro processo, sqlite3
+direto) são detectadas pelo PRAGMA data_version e invalidam o cache inteiro. A chave de um resultado em cache inclui as versões das tabelas lidas,
+então qualquer escrita torna o resultado antigo inalcançável; ele sai do cache
+pela política LRU/tamanho.
+
+Funções que tratam um erro e devolvem um valor padrão (DataFrame vazio)
+chamam nao_guardar_resultado() antes de retornar: quem chamou recebe o valor,
+mas ele não entra no cache e a próxima chamada volta a consultar o banco.
+
+Uso:
+    from banco_dados.cache import em_cache
+
+    @em_cache('pcp', 'clientes', 'produtos')
+    def listar_pcp():
+        ...
+"""
+from collections import OrderedDict
+import functools
+import re
+import sys
+import threading
+
+import pandas as pd
+
+# Versões por tabela =====================================
+_versoes = {}
+_versao_global = 0
+_lock_versoes = threading.Lock()
+# Um _VigiaArquivo por engine monitorada (ver monitorar_escritas)
+_vigias = []
+
+# Tabelas mantidas por triggers: escrever na origem também altera a derivada,
+# mas o comando SQL só cita a origem.
+_derivadas = {}
+
+def registrar_tabela_derivada(derivada, *origens):
+    for origem in origens:
+        _derivadas.setdefault(origem, set()).add(derivada)
+
+def versao_tabela(nome_tabela):
+    return _versoes.get(nome_tabela, 0)
+
+def versoes(tabelas):
+    """
+    Tupla com as versões atuais das tabelas (e a versão global, que muda
+    quando o cache inteiro é invalidado). Antes confere se outro processo
+    gravou no arquivo do banco.
+    """
+    for vigia in _vigias:
+        vigia.verificar()
+    return (_versao_global,) + tuple(_versoes.get(t, 0) for t in tabelas)
+
+def incrementar_versao(nome_tabela=None):
+    """
+    Marca nome_tabela como alterada. Sem nome, invalida todas as tabelas.
+    """
+    global _versao_global
+    with _lock_versoes:
+        if nome_tabela is None:
+            _versao_global += 1
+        else:
+            for tabela in (nome_tabela, *_derivadas.get(nome_tabela, ())):
+                _versoes[tabela] = _versoes.get(tabela, 0) + 1
+
+
+# Resultados de erro ====================================
+# Contador por thread: o cache compara o valor antes e depois da carga. Um
+# erro em uma função em cache chamada por outra também impede a externa de
+# guardar o resultado montado com o valor padrão.
+_erros_carga = threading.local()
+
+def nao_guardar_resultado():
+    """
+    Marca o resultado da carga em andamento como valor de erro, que não deve
+    ser guardado no cache.
+    """
+    _erros_carga.total = getattr(_erros_carga, 'total', 0) + 1
+
+def _total_erros():
+    return getattr(_erros_carga, 'total', 0)
+
+
+# Detecção de escritas na engine =========================
+_padrao_escrita = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM'
+    r'|DROP\s+TABLE(?:\s+IF\s+EXISTS)?|ALTER\s+TABLE)\s+["`\[]?(\w+)',
+    re.IGNORECASE
+)
+
+def tabela_escrita(statement):
+    """
+    Nome da tabela alterada por um comando SQL, ou None se for leitura.
+    """
+    encontrado = _padrao_escrita.match(statement)
+    return encontrado.group(1) if encontrado else None
+
+def _data_version(conexao):
+    return conexao.execute('PRAGMA data_version').fetchone()[0]
+
+class _VigiaArquivo:
+    """
+    Detecta commits feitos fora desta engine (outro worker, um script,
+    sqlite3 direto) pelo PRAGMA data_version de uma conexão dedicada, que muda
+    sempre que outra conexão grava no arquivo. Como não dá para saber quais
+    tabelas mudaram, a detecção invalida o cache inteiro.
+
+    Os commits da própria engine também mudam o valor e são descontados: no
+    evento de commit a conexão que escreveu ainda segura o lock de escrita,
+    então nenhum outro commit acontece até o COMMIT; depois dele, o
+    data_version da própria conexão (que não muda com os próprios commits) diz
+    se mais alguém gravou até a conexão voltar ao pool. Na dúvida (dois commits
+    locais simultâneos), invalida tudo.
+    """
+    def __init__(self, arquivo):
+        import sqlite3
+        self._conexao = sqlite3.connect(arquivo, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._versao = _data_version(self._conexao)
+        self._commits_em_andamento = 0
+
+    def _atualizar(self, externo):
+        versao = _data_version(self._conexao)
+        if versao != self._versao:
+            self._versao = versao
+            if externo:
+                incrementar_versao()
+
+    def verificar(self):
+        """
+        A cada consulta ao cache. Com um commit local entre o COMMIT e a
+        devolução da conexão, a mudança fica para depois_commit avaliar.
+        """
+        with self._lock:
+            if not self._commits_em_andamento:
+                self._atualizar(externo=True)
+
+    def antes_commit(self, dbapi_connection, info):
+        with self._lock:
+            if not self._commits_em_andamento:
+                self._atualizar(externo=True)
+            self._commits_em_andamento += 1
+            if 'commits_vigia' not in info:
+                info['commits_vigia'] = [0, _data_version(dbapi_connection)]
+            info['commits_vigia'][0] += 1
+
+    def depois_commit(self, dbapi_connection, info):
+        proprios, versao_conexao = info.pop('commits_vigia')
+        with self._lock:
+            self._commits_em_andamento -= proprios
+            # Lê o vigia antes da própria conexão: um commit alheio entre as duas
+            # leituras aparece na segunda e só causa uma invalidação a mais
+            self._versao = _data_version(self._conexao)
+            # Alguém gravou depois do COMMIT: também cobre o que as retiradas
+            # ignoraram enquanto este commit estava em andamento
+            if _data_version(dbapi_connection) != versao_conexao:
+                incrementar_versao()
+
+def monitorar_escritas(engine):
+    """
+    Registra na engine os eventos que incrementam a versão das tabelas escritas.
+    A versão só muda quando a conexão volta ao pool, ou seja, depois do commit
+    (ou rollback): uma leitura concorrente nunca guarda dados antigos sob a
+    versão nova. Em banco SQLite em arquivo, escritas de outros processos são
+    detectadas pelo _VigiaArquivo a cada consulta ao cache (versoes).
+    """
+    from sqlalchemy import event
+
+    arquivo = engine.url.database
+    vigia = _VigiaArquivo(arquivo) if engine.dialect.name == 'sqlite' and arquivo and arquivo != ':memory:' else None
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _anotar_escrita(conn, cursor, statement, parameters, context, executemany):
+        tabela = tabela_escrita(statement)
+        if tabela:
+            conn.info.setdefault('tabelas_alteradas', set()).add(tabela)
+
+    @event.listens_for(engine.pool, 'checkin')
+    def _publicar_escritas(dbapi_connection, connection_record):
+        if connection_record is None:
+            return
+        if vigia is not None and 'commits_vigia' in connection_record.info:
+            vigia.depois_commit(dbapi_connection, connection_record.info)
+        for tabela in connection_record.info.pop('tabelas_alteradas', ()):
+            incrementar_versao(tabela)
+
+    if vigia is None:
+        return
+
+    @event.listens_for(engine, 'commit')
+    def _antes_commit(conn):
+        # Só transações que escreveram seguram o lock de escrita até o COMMIT
+        if conn.info.get('tabelas_alteradas'):
+            vigia.antes_commit(conn.connection.dbapi_connection, conn.info)
+
+    _vigias.append(vigia)
+
+
+# Cache LRU ==============================================
+def _tamanho(valor):
+    """
+    Estimativa do tamanho em bytes de um resultado.
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return int(valor.memory_usage(deep=True).sum()) if isinstance(valor, pd.DataFrame) else int(valor.memory_usage(deep=True))
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(_tamanho(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(_tamanho(v) for v in valor)
+    return sys.getsizeof(valor)
+
+def _copiar(valor):
+    """
+    Cópia defensiva: quem recebe o resultado pode alterá-lo sem afetar o cache.
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return valor.copy()
+    if isinstance(valor, dict):
+        return {k: _copiar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_copiar(v) for v in valor]
+    if isinstance(valor, tuple):
+        return tuple(_copiar(v) for v in valor)
+    return valor
+
+class CacheConsultas:
+    """
+    Cache LRU limitado por quantidade de itens e por bytes estimados.
+    As chaves já devem conter as versões das tabelas lidas.
+    """
+    def __init__(self, max_itens=256, max_bytes=256 * 1024 * 1024):
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+    def obter(self, chave, tabelas, carregar):
+        """
+        Retorna o resultado em cache para (chave, versões de tabelas) ou
+        executa carregar() e guarda o resultado.
+        """
+        # Versões lidas antes da consulta: se houver escrita durante a carga,
+        # o resultado fica sob a versão antiga e não é reaproveitado.
+        chave_completa = (chave, versoes(tabelas))
+        with self._lock:
+            item = self._itens.get(chave_completa)
+            if item is not None:
+                self._itens.move_to_end(chave_completa)
+                self.acertos += 1
+                return _copiar(item[0])
+            self.falhas += 1
+
+        erros_antes = _total_erros()
+        valor = carregar()
+        if _total_erros() != erros_antes:
+            return valor
+        tamanho = _tamanho(valor)
+        if tamanho <= self.max_bytes:
+            with self._lock:
+                antigo = self._itens.pop(chave_completa, None)
+                if antigo is not None:
+                    self._bytes -= antigo[1]
+                self._itens[chave_completa] = (valor, tamanho)
+                self._bytes += tamanho
+                self._remover_excesso()
+        return _copiar(valor)
+
+    def _remover_excesso(self):
+        while self._itens and (len(self._itens) > self.max_itens or self._bytes > self.max_bytes):
+            _, (_, tamanho) = self._itens.popitem(last=False)
+            self._bytes -= tamanho
+            self.remocoes += 1
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'itens': len(self._itens),
+                'bytes': self._bytes,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'remocoes': self.remocoes,
+                'taxa_acerto': (self.acertos / total) if total else 0.0,
+            }
+
+cache_consultas = CacheConsultas()
+
+def em_cache(*tabelas):
+    """
+    Decorador para funções de leitura: o resultado é reaproveitado enquanto
+    nenhuma das tabelas informadas for alterada. Os argumentos fazem parte da
+    chave; chamadas com argumentos não hasheáveis vão direto ao banco.
+    """
+    def decorador(funcao):
+        nome = f"{funcao.__module__}.{funcao.__qualname__}"
+
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            chave = (nome, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(chave)
+            except TypeError:
+                return funcao(*args, **kwargs)
+            return cache_consultas.obter(chave, tabelas, lambda: funcao(*args, **kwargs))
+
+        envoltorio.sem_cache = funcao
+        return envoltorio
+    return decorador
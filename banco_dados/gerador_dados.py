@@ -0,0 +1,494 @@
+"""
+Gerador de dados sintéticos para todas as tabelas do banco PCP.
+
+Popula clientes, produtos (com partes_produto), anos de pcp, planejamento com
+plano_setor, baixa/retirada, producao em slots de uma hora com apontamento e
+apontamento_produto, compras (ordem_compra, cotacao, carregamento), qualidade
+(inspeções, laudos, retrabalho), logística e os cadastros auxiliares, com as
+chaves estrangeiras consistentes entre si.
+
+A escala é dada pela quantidade de pedidos (linhas de pcp); as demais tabelas
+crescem proporcionalmente. Mesma semente e mesma data final geram exatamente
+o mesmo banco.
+
+Uso (a partir da raiz do projeto):
+    python -m banco_dados.gerador_dados --banco /tmp/bd_100k.sqlite --pedidos 100000
+    python -m banco_dados.gerador_dados --pedidos 10000 --semente 7 --data-final 2025-06-30 --limpar
+
+Pela API (no banco configurado no processo, ver PCP_BD_ARQUIVO):
+    from banco_dados.gerador_dados import gerar_dados
+    gerar_dados(pedidos=10000, semente=42)
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+import argparse
+import json
+import os
+import random
+import sys
+
+TAMANHO_LOTE = 5000
+
+SETORES = [  # nome, tipo_plano (1 = folhas, 2 = unidades)
+    ('IMPRESSAO', 1), ('CORTE E VINCO', 1), ('COLAGEM', 2), ('ACABAMENTO', 2), ('EXPEDICAO', 2),
+]
+CATEGORIAS_PCP = ['CAIXA 5L', 'CAIXA 10L', 'CAIXA 7L', 'TAMPA 10L', 'TAMPA 5L', 'ESPECIAL', 'CINTA', 'PIZZA',
+                  'POTE 500ML', 'POTE 480ML', 'POTE 240ML', 'POTE 250ML', 'POTE 1L', 'POTE 360ML',
+                  'COPO 360ML', 'COPO 200ML', 'COPO 100ML']
+TIPOS_RAZAO = ['PARADA REGISTRADA', 'DISPONIBILIDADE', 'PERFORMANCE']
+STATUS_OC = ['Aguardando Aprovação', 'Aguardando Recebimento', 'Entregue Parcial', 'Entregue Total', 'Cancelado']
+PRAZOS = ['0', '30', '28,56', '30,60,90', '15,30,45']
+FORMAS_PAGAMENTO = ['Boleto', 'PIX', 'Transferência', 'à vista']
+PARTES = ['FUNDO', 'TAMPA', 'CINTA', 'LATERAL', 'BERCO']
+STATUS_AGENDAMENTO = ['AGENDADO', 'EM_ANDAMENTO', 'CONCLUIDO', 'CANCELADO', 'ATRASADO']
+
+
+def _rng(semente, nome):
+    # Um gerador por tabela: mudar uma tabela não desloca os valores das outras
+    return random.Random(f"{semente}:{nome}")
+
+def _inserir(conn, tabela, linhas):
+    """
+    Insere as linhas (iterável de dicts) em lotes de TAMANHO_LOTE. Retorna o total.
+    """
+    total = 0
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= TAMANHO_LOTE:
+            conn.execute(tabela.insert(), lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        conn.execute(tabela.insert(), lote)
+        total += len(lote)
+    return total
+
+def _dia_util(dia):
+    # Segunda a sábado
+    return dia.weekday() < 6
+
+
+class GeradorDados:
+    """
+    Monta e grava o conjunto de dados. Os IDs são atribuídos aqui (1..n por
+    tabela), o que mantém as referências determinísticas e dispensa reler o banco.
+    """
+    def __init__(self, pedidos=10000, semente=42, anos=3, data_final=None):
+        if pedidos < 1:
+            raise ValueError("A quantidade de pedidos deve ser positiva.")
+        self.pedidos = pedidos
+        self.semente = semente
+        self.data_final = data_final or date.today()
+        self.data_inicial = self.data_final - timedelta(days=int(365 * anos))
+        self.dias = (self.data_final - self.data_inicial).days
+
+        self.n_clientes = max(20, pedidos // 500)
+        self.n_produtos = max(50, pedidos // 200)
+        self.n_partes = 10
+        self.n_chapas = max(20, pedidos // 20)
+        self.n_facas = max(30, self.n_produtos // 5)
+        self.n_fornecedores = max(15, pedidos // 2000)
+        self.n_produtos_compras = max(40, pedidos // 500)
+        self.n_ocs = max(50, pedidos // 4)
+
+    # Cadastros ======================================
+    def _cadastros(self, conn, t):
+        rng = _rng(self.semente, 'cadastros')
+        n = {}
+        n['clientes'] = _inserir(conn, t['clientes'], (
+            {'cliente_id': i, 'nome': f"CLIENTE {i:05d}", 'cli_prazo': rng.choice(PRAZOS),
+             'cli_forma_pagamento': rng.choice(FORMAS_PAGAMENTO)}
+            for i in range(1, self.n_clientes + 1)))
+        n['partes_produto'] = _inserir(conn, t['partes_produto'], (
+            {'pap_id': i, 'pap_nome': f"CONFIGURACAO {i}",
+             'pap_parte': json.dumps({parte: rng.randint(1, 4) for parte in rng.sample(PARTES, rng.randint(1, 3))})}
+            for i in range(1, self.n_partes + 1)))
+        n['produtos'] = _inserir(conn, t['produtos'], (
+            {'produto_id': i, 'nome': f"PRODUTO {i:05d}", 'pedido_mensal': rng.randrange(0, 50000, 500),
+             'tipo_trabalho': rng.choice(['Caixa', 'Pote', 'Copo', 'Tampa']),
+             'fluxo_producao': rng.choice(['Puxado', 'Empurrado']), 'dia_entrega': rng.randint(2, 7),
+             'pap_id': rng.randint(1, self.n_partes) if rng.random() < 0.7 else None}
+            for i in range(1, self.n_produtos + 1)))
+        n['chapa'] = _inserir(conn, t['chapa'], (
+            {'ch_codigo': i, 'ch_semana': rng.randint(1, 52), 'ch_tamanho': rng.choice(['660x960', '770x1100', '890x1280']),
+             'ch_folhas': rng.randrange(500, 20000, 100)}
+            for i in range(1, self.n_chapas + 1)))
+        n['faca'] = _inserir(conn, t['faca'], (
+            {'fac_id': i, 'fac_cod': f"F{i:04d}", 'fac_medida': f"{rng.randint(300, 900)}x{rng.randint(400, 1200)}",
+             'fac_status': rng.choice(['ATIVA', 'MANUTENCAO', 'INATIVA']), 'fac_localizacao': f"ESTANTE {rng.randint(1, 20)}"}
+            for i in range(1, self.n_facas + 1)))
+
+        # Chão de fábrica: setores, máquinas, categorias de produto e razões de parada
+        self.maquinas_setor = {}
+        maquinas, categorias, razoes = [], [], []
+        self.razoes_setor = {}
+        for setor_id, (nome, tipo_plano) in enumerate(SETORES, start=1):
+            for _ in range(rng.randint(2, 4)):
+                maquina_id = len(maquinas) + 1
+                maquinas.append({'maquina_id': maquina_id, 'maquina_nome': f"{nome[:4]}-{maquina_id:02d}",
+                                 'maquina_custo': round(rng.uniform(80, 400), 2), 'setor_id': setor_id})
+                self.maquinas_setor.setdefault(setor_id, []).append(maquina_id)
+                for _ in range(3):
+                    categorias.append({'cp_id': len(categorias) + 1, 'cp_nome': f"CAT {len(categorias) + 1}",
+                                       'cp_meta': rng.randrange(1000, 8000, 100), 'c_maq_id': maquina_id})
+            for _ in range(8):
+                razoes.append({'ra_id': len(razoes) + 1, 'ra_razao': f"RAZAO {len(razoes) + 1}", 'ra_level': '1',
+                               'ra_sub': 'GERAL', 'ra_tipo': rng.choice(TIPOS_RAZAO), 'setor_id': setor_id})
+                self.razoes_setor.setdefault(setor_id, []).append(len(razoes))
+        n['setor'] = _inserir(conn, t['setor'], (
+            {'setor_id': i, 'setor_nome': nome, 'tipo_plano': tipo_plano, 'set_padrao': 1 if i == 1 else 0}
+            for i, (nome, tipo_plano) in enumerate(SETORES, start=1)))
+        n['maquina'] = _inserir(conn, t['maquina'], maquinas)
+        n['categoria_produto'] = _inserir(conn, t['categoria_produto'], categorias)
+        n['razao'] = _inserir(conn, t['razao'], razoes)
+        self.categorias_maquina = {}
+        for categoria in categorias:
+            self.categorias_maquina.setdefault(categoria['c_maq_id'], []).append(categoria['cp_id'])
+
+        # Compras e estoque
+        n['fornecedores'] = _inserir(conn, t['fornecedores'], (
+            {'for_id': i, 'for_nome': f"FORNECEDOR {i:03d}", 'for_prazo': rng.choice([7, 15, 30]),
+             'for_forma_pagamento': rng.choice(FORMAS_PAGAMENTO)}
+            for i in range(1, self.n_fornecedores + 1)))
+        n['grupo_categoria'] = _inserir(conn, t['grupo_categoria'], (
+            {'id_grupo': i, 'nome_grupo': nome, 'unidade': unidade}
+            for i, (nome, unidade) in enumerate([('PAPEL', 'kg'), ('TINTA', 'kg'), ('COLA', 'kg'), ('EMBALAGEM', 'un')], start=1)))
+        n['categoria_compras'] = _inserir(conn, t['categoria_compras'], (
+            {'id_categoria': i, 'categoria_nome': f"CATEGORIA COMPRA {i}", 'conversao': round(rng.uniform(0.5, 3), 3),
+             'grupo_id': rng.randint(1, 4)}
+            for i in range(1, 21)))
+        n['valor_alvo'] = _inserir(conn, t['valor_alvo'], (
+            {'preco': round(rng.uniform(1, 50), 2), 'categoria_id': i, 'custo': round(rng.uniform(1, 40), 2),
+             'data': self.data_inicial + timedelta(days=rng.randrange(self.dias))}
+            for i in range(1, 21)))
+        n['produto_compras'] = _inserir(conn, t['produto_compras'], (
+            {'prod_comp_id': i, 'nome': f"INSUMO {i:04d}"} for i in range(1, self.n_produtos_compras + 1)))
+        n['categoria_estoque'] = _inserir(conn, t['categoria_estoque'], (
+            {'cae_id': i, 'cae_linha': f"LINHA {i}", 'cae_consumo_mensal': round(rng.uniform(100, 5000), 1)}
+            for i in range(1, 9)))
+        n['estudo_estoque'] = _inserir(conn, t['estudo_estoque'], (
+            {'ese_cae_id': rng.randint(1, 8), 'ese_subtipo': f"SUBTIPO {i}",
+             'ese_peso_medio': round(rng.uniform(0.01, 2), 3)}
+            for i in range(1, 31)))
+        n['valor_produto'] = _inserir(conn, t['valor_produto'], (
+            {'produto_id': produto_id, 'valor': round(rng.uniform(0.05, 3), 4), 'orcamento': rng.randint(1000, 9999),
+             'data': self.data_inicial + timedelta(days=rng.randrange(self.dias))}
+            for produto_id in range(1, self.n_produtos + 1) for _ in range(rng.randint(1, 4))))
+        n['produto_espec'] = _inserir(conn, t['produto_espec'], (
+            {'id': i, 'categoria': rng.choice(CATEGORIAS_PCP), 'unidade_medida': 'un', 'grupo': rng.choice(['POTE', 'CAIXA']),
+             'substrato': 'Papel cartão', 'acabamento': rng.choice(['Verniz', 'Laminação', 'Sem acabamento'])}
+            for i in range(1, 41)))
+        n['lembretes'] = _inserir(conn, t['lembretes'], (
+            {'lembrete': f"Lembrete {i}", 'data': self.data_final - timedelta(days=rng.randrange(60)),
+             'status': rng.choice(['pendente', 'feito', 'cancelado'])}
+            for i in range(1, 51)))
+        return n
+
+    # Pedidos ========================================
+    def _pcp(self, conn, t):
+        """
+        Pedidos em ordem de emissão. Guarda em arrays compactos o que as outras
+        tabelas precisam (emissão, entrega, quantidade e produto de cada pcp_id).
+        """
+        rng = _rng(self.semente, 'pcp')
+        self.emissao = array('i')
+        self.entrega = array('i')
+        self.qtd = array('i')
+        self.produto = array('i')
+        inicio = self.data_inicial.toordinal()
+        emissoes = sorted(inicio + rng.randrange(self.dias) for _ in range(self.pedidos))
+
+        def linhas():
+            for pcp_id, emissao in enumerate(emissoes, start=1):
+                entrega = emissao + rng.randint(7, 45)
+                qtd = rng.randrange(1000, 100000, 100)
+                produto_id = rng.randint(1, self.n_produtos)
+                self.emissao.append(emissao)
+                self.entrega.append(entrega)
+                self.qtd.append(qtd)
+                self.produto.append(produto_id)
+                yield {
+                    'pcp_id': pcp_id, 'pcp_oc': f"OC{rng.randint(10000, 99999)}", 'pcp_pcp': 100000 + pcp_id,
+                    'pcp_categoria': rng.choice(CATEGORIAS_PCP), 'pcp_cliente_id': rng.randint(1, self.n_clientes),
+                    'pcp_produto_id': produto_id, 'pcp_qtd': qtd,
+                    'pcp_entrega': date.fromordinal(entrega), 'pcp_primiera_entrega': date.fromordinal(entrega),
+                    'pcp_emissao': date.fromordinal(emissao),
+                    'pcp_correncia': rng.choice([0, 1, 2, 3]) if rng.random() < 0.03 else None,
+                    'pcp_chapa_id': rng.randint(1, self.n_chapas) if rng.random() < 0.6 else None,
+                    'pcp_faca_id': rng.randint(1, self.n_facas) if rng.random() < 0.6 else None,
+                    'pcp_retrabalho': 1 if rng.random() < 0.01 else None,
+                }
+        return _inserir(conn, t['pcp'], linhas())
+
+    def _ids_ativos(self, dia_ordinal):
+        """
+        Faixa (inicio, fim) de pcp_id com emissão até o dia e nos 45 dias anteriores:
+        os candidatos a estarem em produção nessa data.
+        """
+        return bisect_left(self.emissao, dia_ordinal - 45) + 1, bisect_right(self.emissao, dia_ordinal)
+
+    def _movimentos(self, conn, t):
+        rng = _rng(self.semente, 'movimentos')
+        hoje = self.data_final.toordinal()
+        n = {}
+
+        def planejamento():
+            setores = range(1, len(SETORES) + 1)
+            for i in range(self.pedidos):
+                if rng.random() >= 0.7:
+                    continue
+                dia = min(self.emissao[i] + rng.randint(1, 10), self.entrega[i])
+                plano = {parte: {str(setor): self.qtd[i] for setor in rng.sample(setores, rng.randint(1, 3))}
+                         for parte in rng.sample(PARTES, rng.randint(1, 2))}
+                yield {'id_pcp': i + 1, 'quantidade': self.qtd[i], 'data_programacao': date.fromordinal(dia),
+                       'etiqueta': rng.choice([None, 'URGENTE', 'REPOSICAO']), 'plano_setor': json.dumps(plano),
+                       'planejamento_partes': rng.randint(1, 3)}
+        n['planejamento'] = _inserir(conn, t['planejamento'], planejamento())
+
+        # Baixas e retiradas: pedidos vencidos quase sempre produzidos; futuros, às vezes em parte
+        produzido_pcp = array('i', bytes(4 * self.pedidos))
+        rng_ajuste = _rng(self.semente, 'ajuste')  # à parte, para não deslocar os demais valores
+        def baixas():
+            for i in range(self.pedidos):
+                fator = rng.uniform(0.85, 1.05) if self.entrega[i] <= hoje else rng.uniform(0, 0.6)
+                total = int(self.qtd[i] * fator) // 100 * 100
+                partes = rng.randint(1, 4)
+                produzido = 0
+                for _ in range(partes):
+                    qtd = total // partes
+                    if qtd <= 0:
+                        continue
+                    dia = min(rng.randint(self.emissao[i], self.entrega[i] + 5), hoje)
+                    produzido += qtd
+                    yield {'pcp_id': i + 1, 'qtd': qtd, 'pallets': max(1, qtd // 5000), 'turno': rng.choice(['A', 'B', 'C']),
+                           'maquina': f"MAQ-{rng.randint(1, 12):02d}", 'data': date.fromordinal(dia),
+                           'categoria_qualidade': rng.choice([1, 1, 1, 2, 3]),
+                           'ajuste': 1 if rng_ajuste.random() < 0.02 else 0}
+                produzido_pcp[i] = produzido
+        n['baixa'] = _inserir(conn, t['baixa'], baixas())
+
+        def retiradas():
+            for i in range(self.pedidos):
+                if produzido_pcp[i] and self.entrega[i] <= hoje:
+                    yield {'ret_id_pcp': i + 1, 'ret_qtd': int(produzido_pcp[i] * rng.uniform(0.7, 1.0)),
+                           'ret_data': date.fromordinal(min(self.entrega[i] + rng.randint(0, 10), hoje))}
+        n['retirada'] = _inserir(conn, t['retirada'], retiradas())
+
+        n['saida_notas'] = _inserir(conn, t['saida_notas'], (
+            {'produto_id': rng.randint(1, self.n_produtos), 'quantidade': rng.randrange(100, 20000, 100),
+             'numero_nfe': str(rng.randint(100000, 999999))}
+            for _ in range(max(10, self.pedidos // 2))))
+        n['retirada_exp'] = _inserir(conn, t['retirada_exp'], (
+            {'ret_exp_produto_id': rng.randint(1, self.n_produtos), 'ret_exp_qtd': rng.randrange(100, 5000, 100),
+             'ret_exp_data': self.data_inicial + timedelta(days=rng.randrange(self.dias)), 'ret_exp_usuario': 'gerador'}
+            for _ in range(max(10, self.pedidos // 20))))
+        n['pedidos_em_aberto'] = _inserir(conn, t['pedidos_em_aberto'], (
+            {'produto_id': rng.randint(1, self.n_produtos), 'quantidade': rng.randrange(1000, 50000, 500),
+             'data_entrega': (self.data_final + timedelta(days=rng.randint(1, 60))).isoformat(),
+             'situacao': rng.choice(['Em aberto', 'Faturado parcialmente']), 'id_pedido': str(rng.randint(10000, 99999))}
+            for _ in range(max(10, self.pedidos // 20))))
+        return n
+
+    # Produção (OEE) =================================
+    def _producao(self, conn, t):
+        """
+        Slots de uma hora (06h às 22h) por máquina e dia útil, do mais recente
+        para o mais antigo, até cerca de 2 slots por pedido.
+        """
+        rng = _rng(self.semente, 'producao')
+        alvo = self.pedidos * 2
+        maquinas = [(setor_id, maquina_id) for setor_id, ids in self.maquinas_setor.items() for maquina_id in ids]
+        apontamentos, apontamentos_produto = [], []
+        n = {'producao': 0, 'apontamento': 0, 'apontamento_produto': 0}
+        pr_id = 0
+        dia = self.data_final
+        while dia > self.data_inicial and pr_id < alvo:
+            if _dia_util(dia):
+                inicio_ativos, fim_ativos = self._ids_ativos(dia.toordinal())
+                slots = []
+                for setor_id, maquina_id in maquinas:
+                    for hora in range(6, 22):
+                        pr_id += 1
+                        slots.append({'pr_id': pr_id, 'pr_setor_id': setor_id, 'pr_data': dia, 'pr_inicio': time(hora),
+                                      'pr_termino': time(hora + 1), 'pr_maquina_id': maquina_id,
+                                      'pr_categoria_produto_id': rng.choice(self.categorias_maquina[maquina_id]),
+                                      'pr_fechado': 1})
+                        for _ in range(rng.choice([0, 0, 1, 2])):
+                            apontamentos.append({'ap_tempo': rng.randint(5, 40), 'ap_pr': pr_id,
+                                                 'ap_lv1': rng.choice(self.razoes_setor[setor_id])})
+                        if fim_ativos >= inicio_ativos:
+                            apontamentos_produto.append({
+                                'atp_producao': pr_id, 'atp_pcp': rng.randint(inicio_ativos, fim_ativos),
+                                'atp_qtd': rng.randrange(500, 6000, 50), 'atp_data': dia,
+                                'atp_refugos': rng.randint(0, 120), 'atp_custo': round(rng.uniform(50, 400), 2),
+                                'atp_plano': rng.randint(1, 3), 'atp_repeticoes': 1})
+                n['producao'] += _inserir(conn, t['producao'], slots)
+                if len(apontamentos) >= TAMANHO_LOTE:
+                    n['apontamento'] += _inserir(conn, t['apontamento'], apontamentos)
+                    apontamentos = []
+                if len(apontamentos_produto) >= TAMANHO_LOTE:
+                    n['apontamento_produto'] += _inserir(conn, t['apontamento_produto'], apontamentos_produto)
+                    apontamentos_produto = []
+            dia -= timedelta(days=1)
+        n['apontamento'] += _inserir(conn, t['apontamento'], apontamentos)
+        n['apontamento_produto'] += _inserir(conn, t['apontamento_produto'], apontamentos_produto)
+        return n
+
+    # Compras, qualidade e logística =================
+    def _compras(self, conn, t):
+        rng = _rng(self.semente, 'compras')
+        hoje = self.data_final.toordinal()
+        status_oc = {}
+
+        def ordens():
+            for oc_id in range(1, self.n_ocs + 1):
+                emissao = self.data_inicial.toordinal() + rng.randrange(self.dias)
+                entrega = emissao + rng.randint(3, 40)
+                status = rng.choice(STATUS_OC) if entrega > hoje else rng.choice(['Entregue Total', 'Entregue Total', 'Entregue Parcial', 'Cancelado'])
+                status_oc[oc_id] = (status, entrega)
+                qtd = round(rng.uniform(10, 5000), 1)
+                yield {'oc_id': oc_id, 'oc_nome_solicitacao': f"SOLICITACAO {oc_id}", 'oc_solicitacao': oc_id,
+                       'oc_qtd_solicitada': qtd, 'oc_unid_compra': rng.choice(['kg', 'un', 'cx']),
+                       'oc_solicitante': rng.choice(['PCP', 'PRODUCAO', 'QUALIDADE']), 'oc_setor': rng.choice(SETORES)[0],
+                       'oc_data_emissao': date.fromordinal(emissao), 'oc_data_necessaria': date.fromordinal(entrega),
+                       'oc_data_entrega': date.fromordinal(entrega),
+                       'oc_produto_id': rng.randint(1, self.n_produtos_compras),
+                       'oc_fornecedor_id': rng.randint(1, self.n_fornecedores), 'oc_categoria_id': rng.randint(1, 20),
+                       'oc_qtd_recebida': qtd if status == 'Entregue Total' else None,
+                       'oc_numero': date.fromordinal(emissao).strftime('%d%m%y') + f"{rng.randint(1, 99):02d}",
+                       'oc_ipi': rng.choice([0, 5, 10]), 'oc_icms': rng.choice([0, 12, 18]), 'oc_frete': round(rng.uniform(0, 300), 2),
+                       'oc_status': status, 'oc_valor_unit': round(rng.uniform(0.5, 80), 2),
+                       'oc_pcp_id': rng.randint(1, self.pedidos) if rng.random() < 0.3 else None}
+        n = {'ordem_compra': _inserir(conn, t['ordem_compra'], ordens())}
+        n['cotacao'] = _inserir(conn, t['cotacao'], (
+            {'oc_id': oc_id, 'fornecedor_id': rng.randint(1, self.n_fornecedores), 'valor_unit': round(rng.uniform(0.5, 80), 2),
+             'ipi': rng.choice([0, 5, 10]), 'icms': rng.choice([0, 12, 18]), 'condicao_pagamento': rng.choice(PRAZOS),
+             'forma_pagamento': rng.choice(FORMAS_PAGAMENTO)}
+            for oc_id in range(1, self.n_ocs + 1) if rng.random() < 0.3 for _ in range(rng.randint(1, 3))))
+        n['carregamento'] = _inserir(conn, t['carregamento'], (
+            {'car_oc_id': oc_id, 'car_qtd': round(rng.uniform(10, 2000), 1),
+             'car_data': date.fromordinal(min(entrega + rng.randint(0, 5), hoje))}
+            for oc_id, (status, entrega) in status_oc.items() if status.startswith('Entregue')
+            for _ in range(rng.randint(1, 2))))
+        return n
+
+    def _qualidade_logistica(self, conn, t):
+        rng = _rng(self.semente, 'qualidade')
+        hoje = self.data_final.toordinal()
+        maquinas = [(setor_id, maquina_id) for setor_id, ids in self.maquinas_setor.items() for maquina_id in ids]
+        n = {}
+
+        def inspecoes():
+            for _ in range(max(10, self.pedidos // 5)):
+                pcp_id = rng.randint(1, self.pedidos)
+                setor_id, maquina_id = rng.choice(maquinas)
+                yield {'setor_id': setor_id, 'maquina_id': maquina_id, 'pcp_id': pcp_id,
+                       'data': date.fromordinal(min(self.emissao[pcp_id - 1] + rng.randint(1, 20), hoje)),
+                       'qtd_inspecionada': rng.randrange(50, 1000, 10), 'tipo_produto': rng.choice(['Pote', 'Copo', 'Caixa']),
+                       'checklist': {'cor': rng.random() < 0.95, 'corte': rng.random() < 0.95, 'colagem': rng.random() < 0.9}}
+        n['inspecao_processo'] = _inserir(conn, t['inspecao_processo'], inspecoes())
+        n['apontamento_retrabalho'] = _inserir(conn, t['apontamento_retrabalho'], (
+            {'pcp_id': rng.randint(1, self.pedidos), 'quantidade_verificada': rng.randrange(100, 5000, 100),
+             'quantidade_nao_conforme': rng.randint(0, 300),
+             'data_hora': datetime.combine(self.data_inicial + timedelta(days=rng.randrange(self.dias)), time(rng.randint(6, 21))),
+             'status': rng.choice([0, 1])}
+            for _ in range(max(5, self.pedidos // 50))))
+        n['laudos'] = _inserir(conn, t['laudos'], (
+            {'id_pcp': rng.randint(1, self.pedidos), 'nota_fiscal': rng.randint(100000, 999999),
+             'qtd_por_plano': {str(plano): rng.randrange(100, 5000, 100) for plano in range(1, rng.randint(2, 4))},
+             'produto_espec_id': rng.randint(1, 40)}
+            for _ in range(max(10, self.pedidos // 10))))
+
+        historicos = []
+        def agendamentos():
+            for agend_id in range(1, max(10, self.pedidos // 20) + 1):
+                dia = self.data_inicial + timedelta(days=rng.randrange(self.dias + 30))
+                agendado = datetime.combine(dia, time(rng.randint(7, 17)))
+                status = rng.choice(STATUS_AGENDAMENTO) if dia >= self.data_final else rng.choice(['CONCLUIDO', 'CONCLUIDO', 'CANCELADO'])
+                historicos.append({'hist_agend_id': agend_id, 'hist_acao': 'CRIADO', 'hist_status_anterior': None, 'hist_status_novo': 'AGENDADO',
+                                   'hist_data_acao': agendado - timedelta(days=rng.randint(1, 7)), 'hist_usuario': 'gerador'})
+                if status != 'AGENDADO':
+                    historicos.append({'hist_agend_id': agend_id, 'hist_acao': status, 'hist_status_anterior': 'AGENDADO',
+                                       'hist_status_novo': status, 'hist_data_acao': agendado, 'hist_usuario': 'gerador'})
+                concluido = status == 'CONCLUIDO'
+                yield {'agend_id': agend_id, 'agend_numero': f"AG{agend_id:08d}",
+                       'agend_tipo': rng.choice(['CARREGAMENTO', 'DESCARREGAMENTO']), 'agend_data_agendada': agendado,
+                       'agend_data_inicio': agendado if concluido else None,
+                       'agend_data_fim': agendado + timedelta(hours=rng.randint(1, 4)) if concluido else None,
+                       'agend_status': status, 'agend_prioridade': rng.choice(['BAIXA', 'MEDIA', 'ALTA', 'URGENTE']),
+                       'transp_nome': f"TRANSPORTADORA {rng.randint(1, 30)}",
+                       'veic_placa': f"{''.join(rng.choice('ABCDEFGHIJ') for _ in range(3))}{rng.randint(1000, 9999)}",
+                       'mot_nome': f"MOTORISTA {rng.randint(1, 200)}",
+                       'agend_itens': [{'produto_id': rng.randint(1, self.n_produtos), 'quantidade': rng.randrange(100, 10000, 100)}
+                                       for _ in range(rng.randint(1, 3))]}
+        n['agendamento_logistica'] = _inserir(conn, t['agendamento_logistica'], agendamentos())
+        n['agendamento_historico'] = _inserir(conn, t['agendamento_historico'], historicos)
+        return n
+
+    def gravar(self, limpar=False):
+        """
+        Grava tudo em uma única transação. Os triggers de pcp_saldo são
+        removidos durante a carga e recriados no final, com o saldo
+        reconstruído de uma vez. Retorna {tabela: linhas inseridas}.
+        """
+        from banco_dados.banco import Base, TRIGGERS_PCP_SALDO, engine, garantir_pcp_saldo, invalidar_cache
+
+        tabelas = Base.metadata.tables
+        with engine.begin() as conn:
+            if limpar:
+                # Usuários e logs de auditoria são preservados
+                for tabela in reversed(Base.metadata.sorted_tables):
+                    if tabela.name not in ('users', 'logs'):
+                        conn.execute(tabela.delete())
+            elif conn.execute(tabelas['pcp'].select().limit(1)).first() is not None:
+                raise ValueError("O banco já possui pedidos; use limpar=True (--limpar) para substituí-los.")
+
+            for nome in TRIGGERS_PCP_SALDO:
+                conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS {nome}")
+
+            contagem = {}
+            for etapa in (self._cadastros, self._pcp, self._movimentos, self._producao, self._compras, self._qualidade_logistica):
+                resultado = etapa(conn, tabelas)
+                contagem.update(resultado if isinstance(resultado, dict) else {'pcp': resultado})
+        garantir_pcp_saldo()
+        with engine.begin() as conn:
+            conn.exec_driver_sql("ANALYZE")
+        invalidar_cache()
+        return contagem
+
+
+def gerar_dados(pedidos=10000, semente=42, anos=3, data_final=None, limpar=False):
+    """
+    Popula o banco configurado no processo com dados sintéticos. Retorna
+    {tabela: linhas inseridas}.
+    """
+    return GeradorDados(pedidos=pedidos, semente=semente, anos=anos, data_final=data_final).gravar(limpar=limpar)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um banco PCP sintético em escala de produção")
+    parser.add_argument('--pedidos', type=int, default=10000, help="Quantidade de pedidos (linhas de pcp)")
+    parser.add_argument('--semente', type=int, default=42, help="Semente dos geradores aleatórios")
+    parser.add_argument('--anos', type=float, default=3, help="Anos de histórico até a data final")
+    parser.add_argument('--data-final', type=date.fromisoformat, default=None, help="Último dia do histórico (AAAA-MM-DD, padrão hoje)")
+    parser.add_argument('--banco', help="Arquivo SQLite de destino (padrão: PCP_BD_ARQUIVO ou banco_dados/bd_pcp.sqlite)")
+    parser.add_argument('--limpar', action='store_true', help="Apagar os dados existentes antes de gerar")
+    args = parser.parse_args(argv)
+
+    # O caminho precisa estar definido antes de banco_dados.banco criar a engine
+    if args.banco:
+        os.environ['PCP_BD_ARQUIVO'] = args.banco
+
+    inicio = datetime.now()
+    contagem = gerar_dados(pedidos=args.pedidos, semente=args.semente, anos=args.anos,
+                           data_final=args.data_final, limpar=args.limpar)
+    for tabela, linhas in contagem.items():
+        print(f"{tabela:<25} {linhas:>12,}".replace(',', '.'))
+    print(f"Concluído em {(datetime.now() - inicio).total_seconds():.1f} s.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
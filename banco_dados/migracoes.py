@@ -0,0 +1,42 @@
+"""
+Migrações de banco executáveis pela linha de comando.
+
+Uso (a partir da raiz do projeto):
+    python -m banco_dados.migracoes                      # cria índices faltantes e roda ANALYZE
+    python -m banco_dados.migracoes --sem-analyze
+    python -m banco_dados.migracoes --verificar-saldo    # compara pcp_saldo com baixa/retirada
+    python -m banco_dados.migracoes --reconstruir-saldo  # recalcula pcp_saldo do zero
+"""
+import argparse
+import sys
+
+from banco_dados.banco import migrar_indices, reconstruir_pcp_saldo, verificar_pcp_saldo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrações do banco PCP")
+    parser.add_argument('--sem-analyze', action='store_true', help="Não rodar ANALYZE se nenhum índice for criado")
+    parser.add_argument('--verificar-saldo', action='store_true', help="Listar divergências entre pcp_saldo e baixa/retirada")
+    parser.add_argument('--reconstruir-saldo', action='store_true', help="Recalcular pcp_saldo a partir de baixa/retirada")
+    args = parser.parse_args(argv)
+
+    if args.verificar_saldo or args.reconstruir_saldo:
+        if args.reconstruir_saldo:
+            total = reconstruir_pcp_saldo()
+            print(f"pcp_saldo reconstruída: {total} PCPs com saldo.")
+        divergencias = verificar_pcp_saldo()
+        if divergencias.empty:
+            print("pcp_saldo consistente com baixa e retirada.")
+            return 0
+        print(f"{len(divergencias)} PCPs com saldo divergente:")
+        print(divergencias.to_string(index=False))
+        return 1
+
+    criados = migrar_indices(analisar=not args.sem_analyze)
+    if not criados:
+        print("Nenhum índice novo; esquema já está atualizado.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
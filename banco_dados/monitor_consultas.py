@@ -0,0 +1,239 @@
+"""
+Instrumentação das consultas SQL da engine compartilhada.
+
+Para cada comando executado registra duração (execução + leitura das linhas),
+quantidade de linhas, módulo/função de origem e o SQL normalizado. Comandos
+acima do limite vão para um log rotativo de consultas lentas e todos entram
+nas estatísticas agregadas por impressão digital (SQL sem literais), exibidas
+na página /desempenhoconsultas.
+
+Configuração por variável de ambiente:
+    PCP_CONSULTA_LENTA_MS      limite em milissegundos (padrão 200)
+    PCP_LOG_CONSULTAS_LENTAS   caminho do arquivo (padrão banco_dados/consultas_lentas.log)
+"""
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import pandas as pd
+
+LIMITE_LENTA_MS = float(os.environ.get('PCP_CONSULTA_LENTA_MS', 200))
+ARQUIVO_LOG = Path(os.environ.get('PCP_LOG_CONSULTAS_LENTAS', Path(__file__).resolve().parent / 'consultas_lentas.log'))
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+# Amostras guardadas por impressão digital para os percentis
+AMOSTRAS_POR_CONSULTA = 500
+MAX_IMPRESSOES = 2000
+
+# Normalização de SQL ====================================
+_padrao_texto = re.compile(r"'(?:[^']|'')*'")
+_padrao_numero = re.compile(r'\b\d+(?:\.\d+)?\b')
+_padrao_lista = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_padrao_espacos = re.compile(r'\s+')
+
+def normalizar_sql(statement):
+    """
+    Troca literais por ?, colapsa listas IN e espaços: consultas que só
+    diferem nos valores ficam com o mesmo texto.
+    """
+    sql = _padrao_texto.sub('?', statement)
+    sql = _padrao_numero.sub('?', sql)
+    sql = _padrao_lista.sub('(?...)', sql)
+    return _padrao_espacos.sub(' ', sql).strip()
+
+def impressao_digital(sql_normalizado):
+    return hashlib.md5(sql_normalizado.encode('utf-8')).hexdigest()[:12]
+
+# Origem da consulta =====================================
+_pastas_ignoradas = (str(RAIZ_PROJETO / 'banco_dados'), str(RAIZ_PROJETO / 'desempenho'))
+
+def origem_chamada():
+    """
+    Primeiro 'modulo.funcao' do projeto na pilha, fora da camada de banco.
+    Se a chamada vier só de banco_dados (ex.: listar_pcp), usa essa função.
+    """
+    raiz = str(RAIZ_PROJETO)
+    quadro = sys._getframe(1)
+    interna = None
+    while quadro is not None:
+        arquivo = quadro.f_code.co_filename
+        if arquivo.startswith(raiz) and not arquivo.endswith('monitor_consultas.py'):
+            nome = f"{Path(arquivo).relative_to(raiz).with_suffix('').as_posix().replace('/', '.')}.{quadro.f_code.co_name}"
+            if not arquivo.startswith(_pastas_ignoradas):
+                return nome
+            if interna is None:
+                interna = nome
+        quadro = quadro.f_back
+    return interna or '?'
+
+# Log de consultas lentas ================================
+_log_lentas = logging.getLogger('pcp.consultas_lentas')
+_log_lentas.propagate = False
+
+def _configurar_log():
+    if not _log_lentas.handlers:
+        handler = RotatingFileHandler(ARQUIVO_LOG, maxBytes=5 * 1024 * 1024, backupCount=5, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        _log_lentas.addHandler(handler)
+        _log_lentas.setLevel(logging.INFO)
+
+# Estatísticas agregadas =================================
+class EstatisticasConsultas:
+    """
+    Contadores por impressão digital: execuções, tempo total/máximo, linhas e
+    as últimas AMOSTRAS_POR_CONSULTA durações para calcular percentis.
+    """
+    def __init__(self):
+        self._dados = {}
+        self._lock = threading.Lock()
+        self.descartadas = 0
+
+    def registrar(self, sql_normalizado, duracao_ms, linhas, origem):
+        chave = impressao_digital(sql_normalizado)
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                if len(self._dados) >= MAX_IMPRESSOES:
+                    self.descartadas += 1
+                    return
+                item = self._dados[chave] = {
+                    'sql': sql_normalizado, 'execucoes': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'linhas': 0, 'origens': set(), 'amostras': deque(maxlen=AMOSTRAS_POR_CONSULTA),
+                }
+            item['execucoes'] += 1
+            item['total_ms'] += duracao_ms
+            item['max_ms'] = max(item['max_ms'], duracao_ms)
+            item['linhas'] += linhas or 0
+            item['origens'].add(origem)
+            item['amostras'].append(duracao_ms)
+
+    def resumo(self):
+        """
+        DataFrame com uma linha por impressão digital, ordenado pelo tempo total.
+        """
+        with self._lock:
+            linhas = [(chave, dict(item, amostras=list(item['amostras']), origens=sorted(item['origens'])))
+                      for chave, item in self._dados.items()]
+        registros = []
+        for chave, item in linhas:
+            amostras = pd.Series(item['amostras'])
+            registros.append({
+                'impressao': chave,
+                'sql': item['sql'],
+                'origem': ', '.join(item['origens']),
+                'execucoes': item['execucoes'],
+                'total_ms': round(item['total_ms'], 1),
+                'media_ms': round(item['total_ms'] / item['execucoes'], 2),
+                'p50_ms': round(amostras.quantile(0.50), 2),
+                'p95_ms': round(amostras.quantile(0.95), 2),
+                'p99_ms': round(amostras.quantile(0.99), 2),
+                'max_ms': round(item['max_ms'], 2),
+                'linhas_media': round(item['linhas'] / item['execucoes'], 1),
+            })
+        colunas = ['impressao', 'sql', 'origem', 'execucoes', 'total_ms', 'media_ms',
+                   'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'linhas_media']
+        return pd.DataFrame(registros, columns=colunas).sort_values('total_ms', ascending=False, ignore_index=True)
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+            self.descartadas = 0
+
+estatisticas_consultas = EstatisticasConsultas()
+
+def _finalizar(cursor):
+    """
+    Fecha a medição de um comando: chamado quando o cursor é fechado.
+    """
+    medicao = cursor.__dict__.pop('_medicao', None)
+    if medicao is None:
+        return
+    statement, origem, duracao = medicao
+    duracao_ms = (duracao + cursor._tempo_leitura) * 1000
+    linhas = cursor._linhas_lidas if cursor._linhas_lidas else max(cursor.rowcount, 0)
+    sql = normalizar_sql(statement)
+    estatisticas_consultas.registrar(sql, duracao_ms, linhas, origem)
+    if duracao_ms >= LIMITE_LENTA_MS:
+        _configurar_log()
+        _log_lentas.info(f"{duracao_ms:.1f}ms linhas={linhas} origem={origem} [{impressao_digital(sql)}] {sql}")
+
+# Cursor/conexão SQLite com medição da leitura ===========
+# No SQLite boa parte do custo de um SELECT acontece durante o fetch, não no
+# execute; por isso o tempo de leitura das linhas é somado ao do execute.
+class CursorMonitorado(sqlite3.Cursor):
+    _tempo_leitura = 0.0
+    _linhas_lidas = 0
+
+    def _medir(self, metodo, *args):
+        inicio = time.perf_counter()
+        linhas = metodo(*args)
+        self._tempo_leitura += time.perf_counter() - inicio
+        return linhas
+
+    def fetchone(self):
+        linha = self._medir(super().fetchone)
+        if linha is not None:
+            self._linhas_lidas += 1
+        return linha
+
+    def fetchmany(self, *args):
+        linhas = self._medir(super().fetchmany, *args)
+        self._linhas_lidas += len(linhas)
+        return linhas
+
+    def fetchall(self):
+        linhas = self._medir(super().fetchall)
+        self._linhas_lidas += len(linhas)
+        return linhas
+
+    def close(self):
+        _finalizar(self)
+        super().close()
+
+class ConexaoMonitorada(sqlite3.Connection):
+    def cursor(self, factory=CursorMonitorado):
+        return super().cursor(factory)
+
+def monitorar_consultas(engine):
+    """
+    Registra os eventos before/after_cursor_execute na engine. A engine deve
+    ter sido criada com connect_args={'factory': ConexaoMonitorada} para que a
+    leitura das linhas entre na medição.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _inicio(conn, cursor, statement, parameters, context, executemany):
+        conn.info['inicio_consulta'] = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _fim(conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info.pop('inicio_consulta', None)
+        if inicio is None:
+            return
+        duracao = time.perf_counter() - inicio
+        if isinstance(cursor, CursorMonitorado):
+            # Conclui no close(), depois da leitura das linhas
+            cursor._medicao = (statement, origem_chamada(), duracao)
+        else:
+            cursor_simples = _CursorConcluido(cursor.rowcount)
+            cursor_simples._medicao = (statement, origem_chamada(), duracao)
+            _finalizar(cursor_simples)
+
+class _CursorConcluido:
+    """
+    Medição de cursores que não são CursorMonitorado (só o tempo do execute).
+    """
+    _tempo_leitura = 0.0
+    _linhas_lidas = 0
+
+    def __init__(self, rowcount):
+        self.rowcount = rowcount
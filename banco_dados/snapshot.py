@@ -0,0 +1,153 @@
+"""
+Cópia somente leitura do banco para os painéis pesados.
+
+Com o modo ligado, uma thread copia bd_pcp.sqlite a cada N segundos pela API
+de backup online do SQLite (cópia consistente, sem bloquear quem escreve no
+WAL) e as consultas dos painéis (dashboard_dre, dashboard_oee_geral,
+dashboard_pcp) passam a usar engine_leitura(). Formulários e o CRUD do Banco
+continuam na engine principal e sempre enxergam as próprias escritas; só quem
+pede engine_leitura() ou Banco(somente_leitura=True) lê do snapshot.
+
+Se o snapshot ainda não existe ou ficou velho demais (thread parada, erro na
+cópia), engine_leitura() volta para o banco principal.
+
+Configuração por variável de ambiente:
+    PCP_SNAPSHOT_INTERVALO   segundos entre cópias; 0 (padrão) desliga o modo
+    PCP_SNAPSHOT_ARQUIVO     caminho da cópia (padrão banco_dados/bd_pcp_snapshot.sqlite)
+"""
+from datetime import datetime
+from pathlib import Path
+import atexit
+import os
+import sqlite3
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from banco_dados.banco import PATH_TO_BD, engine
+from banco_dados.cache import incrementar_versao
+from banco_dados.monitor_consultas import ConexaoMonitorada, monitorar_consultas
+
+INTERVALO_SNAPSHOT = float(os.environ.get('PCP_SNAPSHOT_INTERVALO', 0))
+ARQUIVO_SNAPSHOT = Path(os.environ.get('PCP_SNAPSHOT_ARQUIVO', Path(__file__).resolve().parent / 'bd_pcp_snapshot.sqlite'))
+
+# Acima desta idade o snapshot é ignorado e as leituras vão ao banco principal
+IDADE_MAXIMA_S = max(3 * INTERVALO_SNAPSHOT, 60)
+
+# Pseudo-tabela do cache de consultas: incrementada a cada cópia, para que
+# resultados lidos do snapshot (em_cache) não sobrevivam a ele
+TABELA_SNAPSHOT = '_snapshot'
+
+_estado = {'atualizado_em': None, 'instante': None, 'duracao_ms': None, 'erro': None}
+_engine_snapshot = None
+_SessionSnapshot = None
+_lock = threading.Lock()
+_thread = None
+_parar = threading.Event()
+
+def snapshot_ativo():
+    return INTERVALO_SNAPSHOT > 0
+
+def atualizar_snapshot():
+    """
+    Copia o banco principal para ARQUIVO_SNAPSHOT em um único passo da API de
+    backup. Leitores do snapshot esperam (busy_timeout) enquanto a cópia grava.
+    """
+    inicio = time.perf_counter()
+    origem = sqlite3.connect(PATH_TO_BD, timeout=15)
+    destino = sqlite3.connect(ARQUIVO_SNAPSHOT, timeout=30)
+    try:
+        origem.backup(destino)
+        # A cópia herda o modo WAL do principal; leitores mode=ro não criam o -shm
+        destino.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        destino.close()
+        origem.close()
+    with _lock:
+        _estado.update(atualizado_em=datetime.now(), instante=time.time(),
+                       duracao_ms=(time.perf_counter() - inicio) * 1000, erro=None)
+    incrementar_versao(TABELA_SNAPSHOT)
+
+def idade_snapshot():
+    """
+    Segundos desde a última cópia concluída, ou None se ainda não houve cópia.
+    """
+    instante = _estado['instante']
+    return None if instante is None else time.time() - instante
+
+def _obter_engine_snapshot():
+    global _engine_snapshot, _SessionSnapshot
+    if _engine_snapshot is None:
+        with _lock:
+            if _engine_snapshot is None:
+                engine_snapshot = create_engine(
+                    f'sqlite:///file:{ARQUIVO_SNAPSHOT.resolve().as_posix()}?mode=ro&uri=true',
+                    connect_args={"check_same_thread": False, "factory": ConexaoMonitorada, "timeout": 30},
+                    pool_size=10,
+                    max_overflow=20
+                )
+                monitorar_consultas(engine_snapshot)
+                _SessionSnapshot = sessionmaker(bind=engine_snapshot)
+                _engine_snapshot = engine_snapshot
+    return _engine_snapshot
+
+def usando_snapshot():
+    idade = idade_snapshot()
+    return snapshot_ativo() and idade is not None and idade <= IDADE_MAXIMA_S
+
+def engine_leitura():
+    """
+    Engine para consultas somente leitura dos painéis: o snapshot quando
+    ativo e recente, senão a engine principal.
+    """
+    return _obter_engine_snapshot() if usando_snapshot() else engine
+
+def sessao_leitura():
+    """
+    Fábrica de sessões correspondente a engine_leitura().
+    """
+    if usando_snapshot():
+        _obter_engine_snapshot()
+        return _SessionSnapshot
+    from banco_dados.banco import SessionLocal
+    return SessionLocal
+
+def _laco_snapshot():
+    while not _parar.wait(INTERVALO_SNAPSHOT):
+        try:
+            atualizar_snapshot()
+        except Exception as e:
+            _estado['erro'] = str(e)
+            print(f"Erro ao atualizar o snapshot de leitura: {e}")
+
+def iniciar_snapshot():
+    """
+    Faz a primeira cópia e inicia a thread de atualização. Sem efeito se o
+    modo estiver desligado ou a thread já estiver rodando.
+    """
+    global _thread
+    if not snapshot_ativo() or _thread is not None:
+        return False
+    try:
+        atualizar_snapshot()
+        print(f"Snapshot de leitura em {ARQUIVO_SNAPSHOT} "
+              f"({_estado['duracao_ms']:.0f} ms), atualizado a cada {INTERVALO_SNAPSHOT:.0f} s.")
+    except Exception as e:
+        _estado['erro'] = str(e)
+        print(f"Erro ao criar o snapshot de leitura: {e}. Painéis lendo do banco principal.")
+    _thread = threading.Thread(target=_laco_snapshot, name='snapshot-leitura', daemon=True)
+    _thread.start()
+    atexit.register(_parar.set)
+    return True
+
+def estado_snapshot():
+    """
+    Situação atual para o indicador da interface.
+    """
+    with _lock:
+        estado = dict(_estado)
+    estado.update(ativo=snapshot_ativo(), idade_s=idade_snapshot(), usando_snapshot=usando_snapshot(),
+                  intervalo_s=INTERVALO_SNAPSHOT)
+    return estado
@@ -0,0 +1,85 @@
+"""
+Tipos (dtypes) aplicados aos DataFrames lidos do banco.
+
+Os tipos de cada coluna saem do esquema da tabela: Date/DateTime viram
+datetime64, inteiros viram Int32 anulável (Int64 se algum valor não couber).
+Não se desce abaixo de 32 bits: somas e diferenças de quantidades entre
+colunas Int8/Int16 estourariam sem aviso. Colunas de texto com poucos valores
+distintos são declaradas como categoria em TIPOS_TABELAS, que também
+sobrescreve o tipo derivado quando necessário.
+
+Uso: banco.ler_tabela('pcp', tipado=True), listar_pcp(tipado=True).
+"""
+from sqlalchemy import Date, DateTime, Integer
+import pandas as pd
+
+# Sobrescritas por tabela: coluna -> 'categoria' | 'data' | 'inteiro' | None (não converter)
+TIPOS_TABELAS = {
+    # Indicadores e chaves opcionais do PCP ficam como vêm: as telas comparam
+    # linha a linha (`row[col] == 1 or ...`) e pd.NA de um Int32 quebraria isso
+    'pcp': {'pcp_categoria': 'categoria', 'pcp_correncia': None, 'pcp_bopp': None, 'pcp_terceirizacao': None,
+            'pcp_retrabalho': None, 'pcp_perdida_retrabalho': None, 'pcp_chapa_id': None, 'pcp_faca_id': None},
+    'ordem_compra': {'oc_status': 'categoria'},
+    'setor': {'setor_nome': 'categoria', 'tipo_plano': 'categoria'},
+    'maquina': {'maquina_nome': 'categoria'},
+    'baixa': {'turno': 'categoria', 'maquina': 'categoria'},
+    # Colunas extras de listar_pcp (junção de pcp com clientes e produtos)
+    'listar_pcp': {'cliente_nome': 'categoria', 'produto_nome': 'categoria'},
+}
+
+LIMITE_INT32 = (-2**31, 2**31 - 1)
+
+def tipos_colunas(tabela, nome_tabela=None):
+    """
+    Mapa coluna -> tipo para uma Table do SQLAlchemy, com as sobrescritas de
+    TIPOS_TABELAS (nome_tabela permite usar uma entrada diferente de tabela.name).
+    """
+    tipos = {}
+    for coluna in tabela.columns:
+        if isinstance(coluna.type, (Date, DateTime)):
+            tipos[coluna.name] = 'data'
+        elif isinstance(coluna.type, Integer):
+            tipos[coluna.name] = 'inteiro'
+    tipos.update(TIPOS_TABELAS.get(tabela.name, {}))
+    if nome_tabela and nome_tabela != tabela.name:
+        tipos.update(TIPOS_TABELAS.get(nome_tabela, {}))
+    return tipos
+
+def _para_inteiro(serie):
+    """
+    Converte para Int32 (ou Int64) anulável. Se a conversão perder algum valor
+    (texto não numérico, casas decimais), devolve a série original.
+    """
+    serie_limpa = serie.where(serie != '')  # texto vazio conta como nulo
+    numeros = pd.to_numeric(serie_limpa, errors='coerce')
+    if numeros.isna().sum() != serie_limpa.isna().sum():
+        return serie
+    validos = numeros.dropna()
+    if not (validos % 1 == 0).all():
+        return serie
+    tipo = 'Int32'
+    if not validos.empty and (validos.min() < LIMITE_INT32[0] or validos.max() > LIMITE_INT32[1]):
+        tipo = 'Int64'
+    return numeros.astype(tipo)
+
+def _converter(serie, tipo):
+    if tipo == 'data':
+        if pd.api.types.is_datetime64_any_dtype(serie):
+            return serie
+        return pd.to_datetime(serie, errors='coerce', format='ISO8601')
+    if tipo == 'inteiro':
+        if pd.api.types.is_extension_array_dtype(serie) and pd.api.types.is_integer_dtype(serie):
+            return serie
+        return _para_inteiro(serie)
+    if tipo == 'categoria':
+        return serie.astype('category')
+    return serie
+
+def aplicar_tipos(df, tabela, nome_tabela=None):
+    """
+    Aplica os tipos da tabela às colunas presentes no DataFrame (in place) e o retorna.
+    """
+    for coluna, tipo in tipos_colunas(tabela, nome_tabela).items():
+        if tipo and coluna in df.columns:
+            df[coluna] = _converter(df[coluna], tipo)
+    return df
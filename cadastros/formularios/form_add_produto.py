@@ -293,9 +293,7 @@ def manage_produto(n_add, n_delete, n_edit, is_open, prod_id_edit, valor_update_
        
         # Buscar produtos com join para mostrar nome do cliente e último valor
         try:
-            from sqlalchemy import create_engine
-            engine = create_engine("sqlite:///banco_dados/bd_pcp.sqlite")
-            with engine.connect() as conn:
+            with banco.engine.connect() as conn:
                 query = """
                 SELECT
                     p.*,
@@ -439,9 +437,7 @@ def manage_valores_produto(n_add, is_open, active_cell, produto_id, valor, orcam
     
     # Carregar valores existentes (filtrar por produto se selecionado)
     try:
-        from sqlalchemy import create_engine
-        engine = create_engine("sqlite:///banco_dados/bd_pcp.sqlite")
-        with engine.connect() as conn:
+        with banco.engine.connect() as conn:
             if produto_id:
                 # Filtrar por produto específico
                 query = """
@@ -494,8 +490,7 @@ def manage_valores_produto(n_add, is_open, active_cell, produto_id, valor, orcam
             trigger_output = trigger_count + 1
 
             # Recarregar valores após inserção (mantendo o filtro)
-            engine = create_engine("sqlite:///banco_dados/bd_pcp.sqlite")
-            with engine.connect() as conn:
+            with banco.engine.connect() as conn:
                 if produto_id:
                     query = """
                     SELECT vp.*, p.nome as produto_nome
@@ -539,8 +534,7 @@ def manage_valores_produto(n_add, is_open, active_cell, produto_id, valor, orcam
                     trigger_output = trigger_count + 1
                     
                     # Recarregar valores após exclusão (mantendo o filtro)
-                    engine = create_engine("sqlite:///banco_dados/bd_pcp.sqlite")
-                    with engine.connect() as conn:
+                    with banco.engine.connect() as conn:
                         if produto_id:
                             query = """
                             SELECT vp.*, p.nome as produto_nome
@@ -2,108 +2,145 @@ from banco_dados.banco import *
 from dash import dash_table
 from datetime import datetime, timedelta
 import pandas as pd
+import numpy as np
+import operator
 from dash import html
 import dash_bootstrap_components as dbc
 import json
+from formatacao import formatar_numeros, formatar_datas
 
 class Filtros:
+    """
+    Filtros declarativos sobre DataFrames. Cada critério vira uma máscara
+    booleana; as máscaras são combinadas e aplicadas uma única vez, sem copiar
+    nem alterar o DataFrame de entrada.
+
+    filtros: {coluna: (tipo, valor)} ou {coluna: [(tipo, valor), ...]} para
+    mais de um critério na mesma coluna. Tipos: 'contem' (texto, sem
+    diferenciar maiúsculas), 'multi' (lista de valores), 'comparar_num'
+    ((operador, número)) e exato (qualquer outro).
+    datas: {coluna: (tipo, valor)} ou lista de regras, com tipos 'acima',
+    'abaixo' e 'entre' ((inicio, fim)), como em filtrar_datas.
+    """
+    _operadores = {'==': operator.eq, '>=': operator.ge, '<=': operator.le, '>': operator.gt, '<': operator.lt}
+
+    # Versões minúsculas dos textos já vistos em filtros 'contem', compartilhadas
+    # entre chamadas (a chave é o próprio texto, então nunca ficam desatualizadas)
+    _minusculas = {}
+    _max_minusculas = 200_000
+
     @staticmethod
-    def filtrar(df: pd.DataFrame, filtros: dict) -> pd.DataFrame:
-        df_filtrado = df.copy()
+    def filtrar(df: pd.DataFrame, filtros: dict, datas: dict = None) -> pd.DataFrame:
+        return df[Filtros.mascara(df, filtros, datas)]
 
-        for coluna, filtro in filtros.items():
-            if coluna in df_filtrado.columns and filtro is not None:
-                tipo, valor = filtro
+    @staticmethod
+    def filtrar_datas(df: pd.DataFrame, filtros: dict) -> pd.DataFrame:
+        return df[Filtros.mascara(df, {}, filtros)]
 
-                # Ignora filtros com valor None ou string vazia (exceto para 'contem')
+    @staticmethod
+    def mascara(df: pd.DataFrame, filtros: dict, datas: dict = None) -> np.ndarray:
+        """
+        Máscara booleana (numpy, uma posição por linha de df) com todos os critérios.
+        """
+        mascara = np.ones(len(df), dtype=bool)
+
+        for coluna, criterios in filtros.items():
+            if coluna not in df.columns or criterios is None:
+                continue
+            for tipo, valor in (criterios if isinstance(criterios, list) else [criterios]):
+                # Ignora filtros com valor None ou string/lista vazia ('contem' vazio casa com tudo)
                 if valor is None or (isinstance(valor, (str, list)) and not valor):
-                    # Allow empty string for 'contem' if needed, otherwise skip
-                    if tipo != 'contem' or valor is None: 
-                       continue 
-
-                try: # Add error handling for robustness
-                    if tipo == 'contem' and isinstance(valor, str):
-                        df_filtrado = df_filtrado[df_filtrado[coluna].astype(str).str.contains(valor, case=False, na=False)]
-                    
-                    elif tipo == 'multi' and isinstance(valor, list):
-                        # No need for is not valor check here, already handled above
-                        df_filtrado = df_filtrado[df_filtrado[coluna].isin(valor)]
-                    
-                    # --- New Filter Type: 'comparar_num' --- 
-                    elif tipo == 'comparar_num' and isinstance(valor, tuple) and len(valor) == 2:
-                        operador, num_valor = valor
-                        allowed_ops = ['==', '>=', '<=', '>', '<']
-                        if operador not in allowed_ops:
-                            print(f"Warning: Operador de comparação inválido '{operador}' para a coluna '{coluna}'. Pulando filtro.")
-                            continue
-                        
-                        if num_valor is None or str(num_valor).strip() == '':
-                             print(f"Warning: Valor numérico inválido para comparação na coluna '{coluna}'. Pulando filtro.")
-                             continue
-
-                        # Convert column and value to numeric, handling errors
-                        df_filtrado[coluna] = pd.to_numeric(df_filtrado[coluna], errors='coerce')
-                        num_valor_numeric = pd.to_numeric(num_valor, errors='coerce')
-
-                        if pd.isna(num_valor_numeric):
-                            print(f"Warning: Não foi possível converter '{num_valor}' para número na coluna '{coluna}'. Pulando filtro.")
-                            continue
-                        
-                        # Drop rows where column conversion failed before querying
-                        df_filtrado = df_filtrado.dropna(subset=[coluna])
-
-                        # Use query for dynamic comparison
-                        # Note: Ensure column names don't have spaces or special chars for query
-                        safe_coluna = f"`{coluna}`" # Backticks for safety if col name has spaces/special chars
-                        query_str = f"{safe_coluna} {operador} @num_valor_numeric"
-                        df_filtrado = df_filtrado.query(query_str, engine='python')
-                    # --- End New Filter Type --- 
-                    
-                    else:  # Filtro exato (padrão)
-                        # Attempt conversion for comparison if types might differ, e.g., int vs str
-                        try:
-                            col_type = df_filtrado[coluna].dtype
-                            if pd.api.types.is_numeric_dtype(col_type):
-                                valor_convertido = pd.to_numeric(valor, errors='ignore')
-                            elif pd.api.types.is_string_dtype(col_type):
-                                valor_convertido = str(valor)
-                            else:
-                                valor_convertido = valor # Use original value if type is unknown/mixed
-                            
-                            df_filtrado = df_filtrado[df_filtrado[coluna] == valor_convertido]
-                        except Exception as e_conv:
-                            print(f"Warning: Erro na comparação exata para coluna '{coluna}' com valor '{valor}': {e_conv}. Usando comparação direta.")
-                            df_filtrado = df_filtrado[df_filtrado[coluna] == valor] # Fallback
-                            
+                    continue
+                try:
+                    criterio = Filtros._criterio(df[coluna], coluna, tipo, valor)
                 except Exception as e:
                     print(f"Erro ao aplicar filtro na coluna '{coluna}' com tipo '{tipo}' e valor '{valor}': {e}")
-                    # Decide whether to continue or stop based on the error
-                    continue # Example: Skip this filter and continue with others
-                    
-        return df_filtrado
-    
-    @staticmethod
-    def filtrar_datas(df: pd.DataFrame, filtros: dict) -> pd.DataFrame:
-        df_filtrado = df.copy()
-        
-        for coluna, regras in filtros.items():
-            if coluna in df_filtrado.columns and pd.api.types.is_datetime64_any_dtype(df_filtrado[coluna]):
-                df_filtrado[coluna] = pd.to_datetime(df_filtrado[coluna], errors='coerce')
-
-                # Se regras não for uma lista, transforma em lista para múltiplos filtros
-                if not isinstance(regras, list):
-                    regras = [regras]
-
-                for tipo, valor in regras:
-                    if tipo == 'acima':  # Filtrar datas acima de um valor
-                        df_filtrado = df_filtrado[df_filtrado[coluna] >= pd.to_datetime(valor)]
-                    elif tipo == 'abaixo':  # Filtrar datas abaixo de um valor
-                        df_filtrado = df_filtrado[df_filtrado[coluna] <= pd.to_datetime(valor)]
+                    continue
+                if criterio is not None:
+                    mascara &= criterio
+
+        for coluna, regras in (datas or {}).items():
+            if coluna in df.columns and pd.api.types.is_datetime64_any_dtype(df[coluna]):
+                for tipo, valor in (regras if isinstance(regras, list) else [regras]):
+                    if tipo == 'acima':  # Datas a partir de um valor
+                        mascara &= Filtros._booleano(df[coluna] >= pd.to_datetime(valor))
+                    elif tipo == 'abaixo':  # Datas até um valor
+                        mascara &= Filtros._booleano(df[coluna] <= pd.to_datetime(valor))
                     elif tipo == 'entre' and isinstance(valor, tuple) and len(valor) == 2:  # Intervalo de datas
-                        df_filtrado = df_filtrado[(df_filtrado[coluna] >= pd.to_datetime(valor[0])) & 
-                                                  (df_filtrado[coluna] <= pd.to_datetime(valor[1]))]
+                        mascara &= Filtros._booleano(df[coluna].between(pd.to_datetime(valor[0]), pd.to_datetime(valor[1])))
 
-        return df_filtrado
+        return mascara
+
+    @staticmethod
+    def _booleano(condicao) -> np.ndarray:
+        # Comparações com tipos anuláveis devolvem pd.NA: contam como falso
+        if isinstance(condicao, pd.Series):
+            return condicao.to_numpy(dtype=bool, na_value=False)
+        return np.asarray(condicao, dtype=bool)
+
+    @staticmethod
+    def _criterio(serie: pd.Series, coluna, tipo, valor):
+        """
+        Máscara de um critério, ou None se ele deve ser ignorado.
+        """
+        if tipo == 'contem' and isinstance(valor, str):
+            return Filtros._contem(serie, valor)
+
+        if tipo == 'multi' and isinstance(valor, list):
+            return Filtros._booleano(serie.isin(valor))
+
+        if tipo == 'comparar_num' and isinstance(valor, tuple) and len(valor) == 2:
+            operador, num_valor = valor
+            if operador not in Filtros._operadores:
+                print(f"Warning: Operador de comparação inválido '{operador}' para a coluna '{coluna}'. Pulando filtro.")
+                return None
+            if num_valor is None or str(num_valor).strip() == '':
+                print(f"Warning: Valor numérico inválido para comparação na coluna '{coluna}'. Pulando filtro.")
+                return None
+            num_valor_numeric = pd.to_numeric(num_valor, errors='coerce')
+            if pd.isna(num_valor_numeric):
+                print(f"Warning: Não foi possível converter '{num_valor}' para número na coluna '{coluna}'. Pulando filtro.")
+                return None
+            # Valores não numéricos da coluna viram NaN e ficam de fora
+            numeros = serie if pd.api.types.is_numeric_dtype(serie.dtype) else pd.to_numeric(serie, errors='coerce')
+            return Filtros._booleano(Filtros._operadores[operador](numeros, num_valor_numeric))
+
+        # Filtro exato (padrão): converte o valor para o tipo da coluna quando possível
+        valor_convertido = valor
+        if pd.api.types.is_numeric_dtype(serie.dtype):
+            try:
+                valor_convertido = pd.to_numeric(valor)
+            except (ValueError, TypeError):
+                pass
+        elif pd.api.types.is_string_dtype(serie.dtype):
+            valor_convertido = str(valor)
+        try:
+            return Filtros._booleano(serie == valor_convertido)
+        except Exception as e_conv:
+            print(f"Warning: Erro na comparação exata para coluna '{coluna}' com valor '{valor}': {e_conv}. Usando comparação direta.")
+            return Filtros._booleano(serie == valor)
+
+    @staticmethod
+    def _contem(serie: pd.Series, texto: str) -> np.ndarray:
+        """
+        Busca de texto sem diferenciar maiúsculas. Só os valores distintos da
+        coluna são convertidos e comparados; valores vazios nunca casam.
+        """
+        codigos, unicos = pd.factorize(serie)
+        if len(unicos) == 0:
+            return np.zeros(len(serie), dtype=bool)
+
+        minusculas = Filtros._minusculas
+        if len(minusculas) > Filtros._max_minusculas:
+            minusculas.clear()
+        textos = pd.Index(unicos).astype(str)
+        texto = texto.lower()
+        casam = np.fromiter(
+            (texto in (minusculas.get(t) or minusculas.setdefault(t, t.lower())) for t in textos),
+            dtype=bool, count=len(textos)
+        )
+        # Código -1 marca valores vazios (NaN/None)
+        return np.where(codigos >= 0, casam[codigos], False)
 
 class Formulario:
 
@@ -150,27 +187,6 @@ class Formulario:
         return not is_open, store_intermedio
 
 
-def formatar_data(val):
-    if isinstance(val, pd.Timestamp):  # Verifica se o valor é um Timestamp
-        return val.strftime('%d/%m/%Y')  # Converte para o formato desejado
-    elif isinstance(val, str):  # Caso já seja uma string
-        return datetime.strptime(val, '%Y-%m-%dT%H:%M:%S').strftime('%d/%m/%Y')
-    return val  # Reto
-
-def calcular_soma_qtd_baixa(pcp_pcp: int):
-    with Session(engine) as session:
-        soma_qtd = session.query(func.sum(BAIXA.qtd)).filter(BAIXA.pcp_id == pcp_pcp).scalar()
-        return soma_qtd or 0
-    
-def formatar_numero(val):
-    if val is not None:
-        return '{:,.0f}'.format(val).replace(',', '.')  # Substitui vírgula por ponto
-    return val
-
-def calcular_soma_qtd_retirada(pcp_id: int):
-    with Session(engine) as session:
-        soma_qtd = session.query(func.sum(RETIRADA.ret_qtd)).filter(RETIRADA.ret_id_pcp == pcp_id).scalar()
-        return soma_qtd or 0
 #==================
 def format_date(date_value, include_time=False):
     try:
@@ -201,17 +217,13 @@ def relatorio_tabela(df, status=None, semana=None):
     df_produtos = banco.ler_tabela("produtos")
 
 
-    # Converter colunas 'pcp_entrega' e 'pcp_emissao' para datetime para comparações corretas
+    # df vem de listar_pcp(tipado=True): as datas já são datetime64
     df_filtrado = df.copy()
     df_filtrado = df_filtrado.merge(df_produtos[['produto_id', 'nome', 'pedido_mensal', 'fluxo_producao']], 
                                          left_on='pcp_produto_id', 
                                          right_on='produto_id', 
                                          how='left')
     
-    df_filtrado['pcp_entrega'] = pd.to_datetime(df_filtrado['pcp_entrega'], format='%Y-%m-%d', errors='coerce')
-    df_filtrado['pcp_emissao'] = pd.to_datetime(df_filtrado['pcp_emissao'], format='%Y-%m-%d', errors='coerce')
-    df_filtrado['pcp_primiera_entrega'] = pd.to_datetime(df_filtrado['pcp_primiera_entrega'], format='%Y-%m-%d', errors='coerce')
-
     df_filtrado['pcp_semana'] = df_filtrado['pcp_entrega'].dt.isocalendar().week
     df_filtrado['pcp_semana_primeira'] = df_filtrado['pcp_primiera_entrega'].dt.isocalendar().week
 
@@ -222,22 +234,19 @@ def relatorio_tabela(df, status=None, semana=None):
 
     hoje = datetime.now()
 
-    # Adicionar coluna 'qtd_baixa' com a soma das baixas por pcp_id
-    df_filtrado['qtd_baixa'] = df_filtrado['pcp_id'].apply(calcular_soma_qtd_baixa)
-    df_filtrado['qtd_retirada'] = df_filtrado['pcp_id'].apply(calcular_soma_qtd_retirada)
+    # Somas de baixas e retiradas por pcp_id, lidas de pcp_saldo em uma única consulta
+    saldos = ler_saldos_pcp(df_filtrado['pcp_id'].dropna()).set_index('pcp_id')
+    df_filtrado['qtd_baixa'] = df_filtrado['pcp_id'].map(saldos['qtd_baixa']).fillna(0).astype(int)
+    df_filtrado['qtd_retirada'] = df_filtrado['pcp_id'].map(saldos['qtd_retirada']).fillna(0).astype(int)
 
     # Calcular o status com base na comparação de 'qtd_baixa' e 'pcp_qtd'
-    def calcular_status(row):
-        if row['qtd_baixa'] == 0:
-            return 'PENDENTE'
-        elif row['qtd_baixa'] > 0 and row['qtd_baixa'] < 0.9 * row['pcp_qtd']:
-            return 'PARCIAL'
-        elif row['qtd_baixa'] >= 0.9 * row['pcp_qtd']:
-            return 'FEITO'
-        else:
-            return 'PENDENTE'
-
-    df_filtrado['status_baixa'] = df_filtrado.apply(calcular_status, axis=1)
+    qtd_baixa = df_filtrado['qtd_baixa']
+    limite_feito = 0.9 * pd.to_numeric(df_filtrado['pcp_qtd'], errors='coerce')
+    df_filtrado['status_baixa'] = np.select(
+        [qtd_baixa == 0, (qtd_baixa > 0) & (qtd_baixa < limite_feito), qtd_baixa >= limite_feito],
+        ['PENDENTE', 'PARCIAL', 'FEITO'],
+        default='PENDENTE',
+    )
 
     # Filtrar pelo status, se fornecido
     if status:
@@ -247,15 +256,13 @@ def relatorio_tabela(df, status=None, semana=None):
     df_filtrado['saldo_em_estoque'] = (df_filtrado['qtd_baixa'] - df_filtrado['qtd_retirada']).clip(lower=0)
 
     # Formatar as colunas 'qtd_baixa' e 'pcp_qtd' para exibição
-    df_filtrado['saldo_em_estoque'] = df_filtrado['saldo_em_estoque'].apply(formatar_numero)
-    df_filtrado['pcp_qtd'] = df_filtrado['pcp_qtd'].apply(formatar_numero)
-    df_filtrado['saldo_em_processo'] = df_filtrado['saldo_em_processo'].apply(formatar_numero)
-    df_filtrado['qtd_retirada'] = df_filtrado['qtd_retirada'].apply(formatar_numero)
+    for coluna in ['saldo_em_estoque', 'pcp_qtd', 'saldo_em_processo', 'qtd_retirada']:
+        df_filtrado[coluna] = formatar_numeros(df_filtrado[coluna])
 
     # Criar colunas formatadas para exibição no DataTable
-    df_filtrado['pcp_entrega_formatada'] = df_filtrado['pcp_entrega'].apply(lambda x: x.strftime('%d/%m/%Y') if pd.notnull(x) else '')
-    df_filtrado['pcp_emissao_formatada'] = df_filtrado['pcp_emissao'].apply(lambda x: x.strftime('%d/%m/%Y') if pd.notnull(x) else '')
-    df_filtrado['pcp_primiera_entrega'] = df_filtrado['pcp_primiera_entrega'].apply(lambda x: x.strftime('%d/%m/%Y') if pd.notnull(x) else '')
+    df_filtrado['pcp_entrega_formatada'] = formatar_datas(df_filtrado['pcp_entrega'])
+    df_filtrado['pcp_emissao_formatada'] = formatar_datas(df_filtrado['pcp_emissao'])
+    df_filtrado['pcp_primiera_entrega'] = formatar_datas(df_filtrado['pcp_primiera_entrega'])
     # Ordenar as linhas com base em 'pcp_entrega'
     df_filtrado = df_filtrado.sort_values(by='pcp_entrega', ascending=True)
     
@@ -264,12 +271,52 @@ def relatorio_tabela(df, status=None, semana=None):
     return df_filtrado
 
 
-def relatorio_planejamento(semana=None, comparacao_semana='=='):
+def somar_baixas_na_semana(df, df_baixas, coluna_data='data_programacao', coluna_pcp='pcp_id'):
+    """
+    Para cada linha de df, soma das baixas do mesmo PCP feitas na semana ISO
+    (ano e semana) de coluna_data. As baixas são agregadas uma única vez por
+    (pcp_id, ano, semana) e ligadas por merge; linhas sem baixa ficam com 0.
+
+    O ano é o ISO: 29/12/2025 cai na semana 1 de 2026, junto com 01/01/2026.
+    """
+    if df.empty or df_baixas.empty:
+        return pd.Series(0, index=df.index, dtype='int64')
+
+    baixas = df_baixas.dropna(subset=['pcp_id', 'data'])
+    iso_baixas = baixas['data'].dt.isocalendar()
+    somas = (
+        pd.DataFrame({
+            'pcp_id': baixas['pcp_id'].astype('int64').to_numpy(),
+            'ano': iso_baixas['year'].astype('int64').to_numpy(),
+            'semana': iso_baixas['week'].astype('int64').to_numpy(),
+            'qtd': pd.to_numeric(baixas['qtd'], errors='coerce').fillna(0).to_numpy(),
+        })
+        .groupby(['pcp_id', 'ano', 'semana'], as_index=False)['qtd'].sum()
+    )
+
+    iso = pd.to_datetime(df[coluna_data], errors='coerce').dt.isocalendar()
+    chaves = pd.DataFrame({
+        'pcp_id': pd.to_numeric(df[coluna_pcp], errors='coerce').astype('Int64').to_numpy(),
+        'ano': iso['year'].astype('Int64').to_numpy(),
+        'semana': iso['week'].astype('Int64').to_numpy(),
+    })
+    somas = somas.astype({'pcp_id': 'Int64', 'ano': 'Int64', 'semana': 'Int64'})
+    qtd = chaves.merge(somas, on=['pcp_id', 'ano', 'semana'], how='left')['qtd']
+    return pd.Series(qtd.fillna(0).astype('int64').to_numpy(), index=df.index)
+
+def relatorio_planejamento(semana=None, comparacao_semana='==', qtd_feita=True, colunas=None):
+    """
+    Programações com os dados do PCP, filtradas pela semana ISO.
+
+    qtd_feita=False não lê as baixas nem cria a coluna 'Qtd Feita'. colunas
+    ({coluna: título}) troca o relatório padrão, ordenado e com a data em
+    texto, por essas colunas na ordem dada, como na exportação do PCP.
+    """
     try:
         banco = Banco()
-        df_plan = banco.ler_tabela('planejamento')
-        df_pcp_full = listar_pcp()
-        df_baixas = banco.ler_tabela('baixa')
+        # Leituras tipadas: datas já chegam como datetime64
+        df_plan = banco.ler_tabela('planejamento', tipado=True)
+        df_pcp_full = listar_pcp(tipado=True)
 
         if df_plan.empty or df_pcp_full.empty:
             return pd.DataFrame()
@@ -283,8 +330,7 @@ def relatorio_planejamento(semana=None, comparacao_semana='=='):
             how='left'
         )
 
-        # Converter e processar datas
-        df_merged['data_programacao'] = pd.to_datetime(df_merged['data_programacao'], errors='coerce')
+        # Descartar programações sem data
         df_merged = df_merged.dropna(subset=['data_programacao'])
         
         # Adicionar semana ao DataFrame
@@ -296,22 +342,13 @@ def relatorio_planejamento(semana=None, comparacao_semana='=='):
                 'semana_prog': ('comparar_num', (comparacao_semana, semana))
             })
 
-        # Processar baixas
-        if not df_baixas.empty:
-            df_baixas['data'] = pd.to_datetime(df_baixas['data'], errors='coerce')
-            df_merged['Qtd Feita'] = 0
-            
-            for idx, row in df_merged.iterrows():
-                pcp_id = row['pcp_id']
-                data_prog = row['data_programacao']
-                
-                baixas_pcp = df_baixas[
-                    (df_baixas['pcp_id'] == pcp_id) & 
-                    (df_baixas['data'].dt.isocalendar().week == data_prog.isocalendar().week) &
-                    (df_baixas['data'].dt.year == data_prog.year)
-                ]
-                
-                df_merged.at[idx, 'Qtd Feita'] = baixas_pcp['qtd'].sum()
+        # Baixas do PCP feitas na semana da programação
+        if qtd_feita:
+            df_baixas = banco.ler_tabela('baixa', colunas=['pcp_id', 'qtd', 'data'], tipado=True)
+            df_merged['Qtd Feita'] = somar_baixas_na_semana(df_merged, df_baixas)
+
+        if colunas is not None:
+            return df_merged.rename(columns=colunas)[list(colunas.values())]
 
         # Organizar e renomear colunas
         df_final = df_merged[[
@@ -132,7 +132,7 @@ layout = html.Div([
                                 dbc.Label("Ordem de Compra *", html_for="carregamento-oc-id"),
                                 dcc.Dropdown(
                                     id="carregamento-oc-id",
-                                    options=get_ordem_compra_options(),
+                                    options=[],  # preenchidas por carregar_opcoes_ordem_compra
                                     placeholder="Selecione uma Ordem de Compra",
                                     clearable=True,
                                 ),
@@ -217,6 +217,16 @@ def carregar_tabela_carregamentos(tab_ativo, n_clicks):
         return get_tabela_carregamentos()
     return dash.no_update
 
+# Callback para carregar as ordens de compra abertas ao exibir o formulário
+@callback(
+    Output("carregamento-oc-id", "options"),
+    Input("tabs-carregamento", "active_tab"),
+)
+def carregar_opcoes_ordem_compra(tab_ativo):
+    if tab_ativo == "tab-cadastro-carregamento":
+        return get_ordem_compra_options()
+    return dash.no_update
+
 # Callback para salvar carregamento
 @callback(
     [Output("carregamento-message", "children"),
@@ -245,9 +245,8 @@ def manage_categoria(n_add, n_delete, n_edit, is_open, categoria_id_edit,
         
         # Buscar categorias com join para mostrar nome do grupo e último preço
         try:
-            from sqlalchemy import create_engine, text
-            engine = create_engine("sqlite:///banco_dados/bd_pcp.sqlite")
-            with engine.connect() as conn:
+            from sqlalchemy import text
+            with banco.engine.connect() as conn:
                 query = """
                 WITH LatestValorAlvo AS (
                     SELECT
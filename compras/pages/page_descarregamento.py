@@ -7,6 +7,7 @@ from banco_dados.banco import Banco
 from dash.dependencies import Input, Output
 from dash.exceptions import PreventUpdate
 import io
+from formatacao import formatar_numeros, formatar_moedas
 
 def to_excel(df):
     output = io.BytesIO()
@@ -262,21 +263,17 @@ def exportar_excel_descarregamento(n_clicks):
         df_final.sort_values(by=['Fornecedor', 'OC ID', 'Data'], inplace=True)
         
         # Formatação final
-        df_final['Quantidade'] = df_final['Quantidade'].apply(lambda x: f"{x:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+        df_final['Quantidade'] = formatar_numeros(df_final['Quantidade'], casas=2)
         df_final['OC ID'] = df_final['OC ID'].astype(int)
         df_final['Carregamento ID'] = df_final['Carregamento ID'].apply(lambda x: int(x) if pd.notna(x) else '')
 
         # Formatação das novas colunas
-        def format_currency(x):
-            if pd.isna(x): return ''
-            return f"R$ {pd.to_numeric(x, errors='coerce'):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-
         def format_percent(x):
             if pd.isna(x): return ''
             return f"{pd.to_numeric(x, errors='coerce'):.2f}%"
 
-        df_final['Valor Unitário'] = df_final['Valor Unitário'].apply(format_currency)
-        df_final['Frete (R$)'] = df_final['Frete (R$)'].apply(format_currency)
+        df_final['Valor Unitário'] = formatar_moedas(df_final['Valor Unitário'])
+        df_final['Frete (R$)'] = formatar_moedas(df_final['Frete (R$)'])
         df_final['IPI (%)'] = df_final['IPI (%)'].apply(format_percent)
         df_final['ICMS (%)'] = df_final['ICMS (%)'].apply(format_percent)
 
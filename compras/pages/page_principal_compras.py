@@ -24,9 +24,6 @@ from compras.formularios.form_ordem_compra import get_form as get_form_ordem_com
 # Instanciar o banco de dados
 banco = Banco()
 
-df_categorias = banco.ler_tabela("categoria_compras")
-categoria_options = [{"label": row['categoria_nome'], "value": row['id_categoria']} for _, row in df_categorias.iterrows()] if not df_categorias.empty else []
-
 # Status possíveis para ordens de compra
 STATUS_OPTIONS = [
     "Solicitar ao Fornecedor",
@@ -96,10 +93,7 @@ layout = html.Div([
                 dbc.Col([
                     dbc.Label("Fornecedor"),
                     dcc.Dropdown(id="filtro-fornecedor", placeholder="Fornecedor", 
-                                 options=[{"label": "Todos", "value": ""}, 
-                                *[{"label": row["for_nome"], "value": int(row["for_id"])} 
-                                for _, row in banco.ler_tabela("fornecedores").sort_values("for_nome").iterrows()]]
-                        if not banco.ler_tabela("fornecedores").empty else [{"label": "Todos", "value": ""}],
+                                 options=[{"label": "Todos", "value": ""}],  # fornecedores em carregar_opcoes_compras
                         clearable=True,
                         )
                 ], xl=2, lg=4, md=6, sm=12, xs=12, className="mb-2"),
@@ -219,7 +213,7 @@ layout = html.Div([
                             dbc.Label("Nova Categoria"),
                             dbc.Select(
                                 id="lote-categoria",
-                                options=[{"label": "Manter atual", "value": ""}] + categoria_options,
+                                options=[{"label": "Manter atual", "value": ""}],  # categorias em carregar_opcoes_compras
                                 value="",
                                 size="sm"
                             ),
@@ -231,10 +225,7 @@ layout = html.Div([
                             dbc.Label("Novo Fornecedor"),
                             dcc.Dropdown(
                                 id="lote-fornecedor",
-                                options=[{"label": "Manter atual", "value": ""}] + [
-                                    {"label": row["for_nome"], "value": int(row["for_id"])} 
-                                    for _, row in banco.ler_tabela("fornecedores").sort_values("for_nome").iterrows()
-                                ] if not banco.ler_tabela("fornecedores").empty else [{"label": "Manter atual", "value": ""}],
+                                options=[{"label": "Manter atual", "value": ""}],  # fornecedores em carregar_opcoes_compras
                                 value="",
                                 placeholder="Selecione para alterar",
                                 clearable=True
@@ -846,6 +837,29 @@ def carregar_ordens_agrupadas(n_filtrar, feedback, n_limpar, feedback_lote, prev
             html.H5(f"Erro ao carregar ordens de compra: {str(e)}"),
         ], className="text-center p-5 text-danger"), dash.no_update
 
+# Callback para carregar fornecedores e categorias dos filtros e da edição em lote
+# uma vez por abertura da página (compras-interval-once), e não na importação
+@app.callback(
+    [
+        Output('filtro-fornecedor', 'options'),
+        Output('lote-fornecedor', 'options'),
+        Output('lote-categoria', 'options')
+    ],
+    Input('compras-interval-once', 'n_intervals')
+)
+def carregar_opcoes_compras(n_intervals):
+    df_fornecedores = banco.ler_tabela("fornecedores")
+    fornecedores = [{"label": row["for_nome"], "value": int(row["for_id"])}
+                    for _, row in df_fornecedores.sort_values("for_nome").iterrows()] if not df_fornecedores.empty else []
+    df_categorias = banco.ler_tabela("categoria_compras")
+    categorias = [{"label": row['categoria_nome'], "value": row['id_categoria']}
+                  for _, row in df_categorias.iterrows()] if not df_categorias.empty else []
+    return (
+        [{"label": "Todos", "value": ""}] + fornecedores,
+        [{"label": "Manter atual", "value": ""}] + fornecedores,
+        [{"label": "Manter atual", "value": ""}] + categorias,
+    )
+
 # Callback para limpar filtros
 @app.callback(
     [
@@ -1369,10 +1383,9 @@ def aplicar_edicao_lote(n_aplicar, n_gerar_oc, ordens_selecionadas, novo_status,
             proximo_seq = max(numeros_existentes) + 1 if numeros_existentes else 1
             novo_numero_oc = f"{hoje}{proximo_seq:02d}"
 
-            # Aplicar o novo número a todas as ordens selecionadas
+            # Aplicar o novo número a todas as ordens selecionadas (tudo ou nada)
             ids_para_atualizar = [ordem['oc_id'] for ordem in ordens_selecionadas]
-            for oc_id in ids_para_atualizar:
-                banco.editar_dado("ordem_compra", oc_id, oc_numero=novo_numero_oc)
+            banco.editar_em_lote("ordem_compra", {oc_id: {'oc_numero': novo_numero_oc} for oc_id in ids_para_atualizar})
 
             return [dbc.Alert(f"✅ OC {novo_numero_oc} gerada e aplicada a {len(ids_para_atualizar)} itens.", color="success")]
 
@@ -1408,32 +1421,31 @@ def aplicar_edicao_lote(n_aplicar, n_gerar_oc, ordens_selecionadas, novo_status,
             if novo_icms is not None:
                 dados_atualizacao["oc_icms"] = novo_icms
                 
-            # Processar cada ordem selecionada
-            ordens_atualizadas = 0
+            # Montar as alterações de cada ordem selecionada
+            alteracoes = {}
             erros = []
             
             for ordem in ordens_selecionadas:
-                try:
-                    oc_id = ordem.get('oc_id')
-                    if not oc_id:
-                        continue
-                    
-                    dados_ordem = dados_atualizacao.copy()
-                    
-                    if observacao_adicional and observacao_adicional.strip():
-                        observacao_atual = ordem.get('oc_observacao', '') or ''
-                        nova_observacao = f"{observacao_atual}\n{observacao_adicional.strip()}" if observacao_atual else observacao_adicional.strip()
-                        dados_ordem["oc_observacao"] = nova_observacao
-                    
-                    if dados_ordem:
-                        resultado = banco.editar_dado("ordem_compra", oc_id, **dados_ordem)
-                        if resultado:
-                            ordens_atualizadas += 1
-                        else:
-                            erros.append(f"Erro ao atualizar ordem ID {oc_id}")
-                    
-                except Exception as e:
-                    erros.append(f"Erro ao processar ordem ID {ordem.get('oc_id', 'N/A')}: {str(e)}")
+                oc_id = ordem.get('oc_id')
+                if not oc_id:
+                    continue
+                
+                dados_ordem = dados_atualizacao.copy()
+                
+                if observacao_adicional and observacao_adicional.strip():
+                    observacao_atual = ordem.get('oc_observacao', '') or ''
+                    nova_observacao = f"{observacao_atual}\n{observacao_adicional.strip()}" if observacao_atual else observacao_adicional.strip()
+                    dados_ordem["oc_observacao"] = nova_observacao
+                
+                if dados_ordem:
+                    alteracoes[oc_id] = dados_ordem
+            
+            # Uma única transação para todas as ordens
+            try:
+                ordens_atualizadas = banco.editar_em_lote("ordem_compra", alteracoes)
+            except Exception as e:
+                ordens_atualizadas = 0
+                erros.append(f"Erro ao atualizar as ordens: {str(e)}")
             
             if ordens_atualizadas > 0:
                 mensagem = f"✅ {ordens_atualizadas} ordem(ns) atualizada(s) com sucesso!"
@@ -1441,7 +1453,7 @@ def aplicar_edicao_lote(n_aplicar, n_gerar_oc, ordens_selecionadas, novo_status,
                     mensagem += f"\n⚠️ {len(erros)} erro(s) encontrado(s)."
                 feedback = dbc.Alert(mensagem, color="success" if not erros else "warning")
             else:
-                feedback = dbc.Alert("❌ Nenhuma ordem foi atualizada. Verifique os dados.", color="danger")
+                feedback = dbc.Alert("❌ Nenhuma ordem foi atualizada. " + (erros[0] if erros else "Verifique os dados."), color="danger")
             
             return [feedback]
             
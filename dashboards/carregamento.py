@@ -221,13 +221,10 @@ def salvar_agendamento(dados):
         }
         
         # Inserir no banco usando SQLAlchemy ORM para obter o ID
-        from sqlalchemy.orm import sessionmaker
         from banco_dados.banco import AGENDAMENTO_LOGISTICA, AGENDAMENTO_HISTORICO
         
-        SessionFactory = sessionmaker(bind=banco.engine)
-        session = SessionFactory()
-        
-        try:
+        # Agendamento e histórico são confirmados juntos (commit único em transacao())
+        with banco.transacao() as session:
             # Verificar se é edição (tem agend_id) ou criação nova
             agend_id = dados.get('agend_id')
             
@@ -250,7 +247,6 @@ def salvar_agendamento(dados):
                     )
                     session.add(novo_historico)
                     
-                    session.commit()
                     return True, "Agendamento atualizado com sucesso!"
                 else:
                     return False, "Agendamento não encontrado para edição!"
@@ -272,15 +268,7 @@ def salvar_agendamento(dados):
                 )
                 session.add(novo_historico)
                 
-                # Fazer commit de tudo
-                session.commit()
                 return True, "Agendamento salvo com sucesso!"
-            
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
         
     except Exception as e:
         print(f"Erro ao salvar agendamento: {e}")
@@ -616,7 +604,8 @@ layout = dbc.Container([
             ], className="mb-4"),
             
             # Agenda semanal
-            html.Div(id="agenda-semanal", children=criar_agenda_semanal(carregar_agendamentos()))
+            # Montada por atualizar_agenda_semanal quando a página abre
+            html.Div(id="agenda-semanal")
         ])
     ]),
     
@@ -1143,7 +1132,7 @@ def salvar_agendamento_callback(n_clicks, numero, tipo, data, prioridade, status
         return dbc.Alert(mensagem, color="danger", dismissable=True), dash.no_update, dash.no_update
 
 @app.callback(
-    Output("agenda-semanal", "children", allow_duplicate=True),
+    Output("agenda-semanal", "children"),
     [Input("btn-atualizar-agenda", "n_clicks"),
      Input("btn-limpar-filtros", "n_clicks"),
      Input("filtro-status-agenda", "value"),
@@ -1152,16 +1141,13 @@ def salvar_agendamento_callback(n_clicks, numero, tipo, data, prioridade, status
      Input("filtro-modelo", "value"),
      Input("filtro-tipo-veiculo", "value"),
      Input("filtro-doca", "value"),
-     Input("filtro-semana", "value")],
-    prevent_initial_call=True
+     Input("filtro-semana", "value")]
 )
 def atualizar_agenda_semanal(n_clicks_atualizar, n_clicks_limpar, status, tipo, transportadora, modelo, tipo_veiculo, doca, semana):
     ctx = callback_context
-    if not ctx.triggered:
-        return dash.no_update
     
-    # Verificar qual input foi acionado
-    triggered_id = ctx.triggered[0]["prop_id"].split('.')[0]
+    # Verificar qual input foi acionado; sem gatilho (abertura da página), carrega como o Atualizar
+    triggered_id = ctx.triggered[0]["prop_id"].split('.')[0] if ctx.triggered else "btn-atualizar-agenda"
     
     # Se foi o botão limpar filtros
     if triggered_id == "btn-limpar-filtros":
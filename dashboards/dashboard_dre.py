@@ -1,15 +1,18 @@
 from dash import html, dcc, Input, Output, State
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 import datetime
 import pandas as pd
 import numpy as np
 from sqlalchemy.orm import Session
-from banco_dados.banco import engine, PCP, PRODUTO, CLIENTE, BAIXA, RETIRADA, VALOR_PRODUTO, Base, ORDEM_COMPRA, FORNECEDORES
+from banco_dados.banco import engine, PCP, PRODUTO, CLIENTE, BAIXA, RETIRADA, PCP_SALDO, VALOR_PRODUTO, Base, ORDEM_COMPRA, FORNECEDORES
 from sqlalchemy import func, or_
+from banco_dados.snapshot import engine_leitura
 from pcp.tabela_principal import obter_dados_em_lote
 from app import app
 import io
 from dash.exceptions import PreventUpdate
+from formatacao import formatar_moeda
 
 def calculate_payment_schedule(base_date, total_value, prazo_str):
     """
@@ -51,9 +54,7 @@ def calculate_payment_schedule(base_date, total_value, prazo_str):
 
 def format_currency(value):
     """Formats a float into a Brazilian currency string."""
-    if pd.isna(value):
-        value = 0
-    return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return formatar_moeda(0 if pd.isna(value) else value)
 
 def get_daily_headers(num_weeks=9):
     """Generates headers for a daily DRE view over several weeks."""
@@ -81,7 +82,7 @@ def get_dre_entradas_data(view_mode: str):
     """
     Calculates the 'Entradas' values for the DRE dashboard, with a daily client breakdown.
     """
-    with Session(engine) as session:
+    with Session(engine_leitura()) as session:
         _, _, target_days = get_daily_headers()
         start_date = target_days[0]
         num_days = len(target_days)
@@ -115,9 +116,12 @@ def get_dre_entradas_data(view_mode: str):
             PCP.pcp_entrega,
             CLIENTE.nome.label('cliente_nome'),
             CLIENTE.cli_prazo,
-            CLIENTE.cli_forma_pagamento
+            CLIENTE.cli_forma_pagamento,
+            func.coalesce(PCP_SALDO.qtd_baixa, 0).label('qtd_baixa'),
+            func.coalesce(PCP_SALDO.qtd_retirada, 0).label('qtd_retirada')
         ).join(PRODUTO, PCP.pcp_produto_id == PRODUTO.produto_id)\
          .join(CLIENTE, PCP.pcp_cliente_id == CLIENTE.cliente_id)\
+         .outerjoin(PCP_SALDO, PCP.pcp_id == PCP_SALDO.pcp_id)\
          .filter(
             PRODUTO.fluxo_producao == 'Puxado',
             PCP.pcp_correncia.is_(None)
@@ -128,21 +132,7 @@ def get_dre_entradas_data(view_mode: str):
             zeros = {"totals": ["R$ 0,00"] * (num_days + 1), "by_client": {}}
             return {"pedidos_firmados": zeros, "estoque_pedidos": zeros}
 
-        pcp_ids = df_pcp['pcp_id'].tolist()
-
-        # Get Baixas and Retiradas
-        baixas_q = session.query(BAIXA.pcp_id, func.sum(BAIXA.qtd).label('qtd_baixa'))\
-            .filter(BAIXA.pcp_id.in_(pcp_ids)).group_by(BAIXA.pcp_id)
-        df_baixas = pd.read_sql(baixas_q.statement, session.bind).set_index('pcp_id')
-
-        retiradas_q = session.query(RETIRADA.ret_id_pcp, func.sum(RETIRADA.ret_qtd).label('qtd_retirada'))\
-            .filter(RETIRADA.ret_id_pcp.in_(pcp_ids)).group_by(RETIRADA.ret_id_pcp)
-        df_retiradas = pd.read_sql(retiradas_q.statement, session.bind).set_index('ret_id_pcp')
-        
-        # Map data and perform calculations
-        df_pcp['qtd_baixa'] = df_pcp['pcp_id'].map(df_baixas['qtd_baixa']).fillna(0)
-        df_pcp['qtd_retirada'] = df_pcp['pcp_id'].map(df_retiradas['qtd_retirada']).fillna(0)
-        
+        # Baixas and Retiradas come joined from pcp_saldo
         df_pcp['saldo_em_processo'] = (df_pcp['pcp_qtd'] - df_pcp['qtd_baixa']).clip(lower=0)
         df_pcp['saldo_em_estoque'] = (df_pcp['qtd_baixa'] - df_pcp['qtd_retirada']).clip(lower=0)
 
@@ -290,7 +280,7 @@ def get_empurrado_data(dia_entrega_is_none: bool, view_mode: str):
     Calculates projected values for products with 'Empurrado' flow for a daily view,
     with a breakdown by client.
     """
-    with Session(engine) as session:
+    with Session(engine_leitura()) as session:
         _, _, target_days = get_daily_headers()
         num_days = len(target_days)
 
@@ -394,7 +384,7 @@ def get_compras_data(view_mode: str):
     """
     Calculates the 'Compras' values for the DRE dashboard with a daily breakdown.
     """
-    with Session(engine) as session:
+    with Session(engine_leitura()) as session:
         _, _, target_days = get_daily_headers()
         start_date = target_days[0]
         num_days = len(target_days)
@@ -825,7 +815,7 @@ def get_raw_cash_flow_events():
     _, _, target_days = get_daily_headers()
     start_date = target_days[0] if target_days else datetime.date.today()
 
-    with Session(engine) as session:
+    with Session(engine_leitura()) as session:
         # --- 1. Entradas from 'Puxado' products (Pedidos Firmados & Estoque) ---
         latest_value_subq = session.query(
             VALOR_PRODUTO.produto_id, func.max(VALOR_PRODUTO.data).label('max_data')
@@ -841,23 +831,16 @@ def get_raw_cash_flow_events():
 
         pcp_data_q = session.query(
             PCP.pcp_id, PCP.pcp_produto_id, PCP.pcp_qtd, PCP.pcp_entrega,
-            CLIENTE.nome.label('cliente_nome'), CLIENTE.cli_prazo, CLIENTE.cli_forma_pagamento
+            CLIENTE.nome.label('cliente_nome'), CLIENTE.cli_prazo, CLIENTE.cli_forma_pagamento,
+            func.coalesce(PCP_SALDO.qtd_baixa, 0).label('qtd_baixa'),
+            func.coalesce(PCP_SALDO.qtd_retirada, 0).label('qtd_retirada')
         ).join(PRODUTO, PCP.pcp_produto_id == PRODUTO.produto_id)\
          .join(CLIENTE, PCP.pcp_cliente_id == CLIENTE.cliente_id)\
+         .outerjoin(PCP_SALDO, PCP.pcp_id == PCP_SALDO.pcp_id)\
          .filter(PRODUTO.fluxo_producao == 'Puxado', PCP.pcp_correncia.is_(None))
         df_pcp = pd.read_sql(pcp_data_q.statement, session.bind)
 
         if not df_pcp.empty:
-            pcp_ids = df_pcp['pcp_id'].tolist()
-            baixas_q = session.query(BAIXA.pcp_id, func.sum(BAIXA.qtd).label('qtd_baixa'))\
-                .filter(BAIXA.pcp_id.in_(pcp_ids)).group_by(BAIXA.pcp_id)
-            df_baixas = pd.read_sql(baixas_q.statement, session.bind).set_index('pcp_id')
-            retiradas_q = session.query(RETIRADA.ret_id_pcp, func.sum(RETIRADA.ret_qtd).label('qtd_retirada'))\
-                .filter(RETIRADA.ret_id_pcp.in_(pcp_ids)).group_by(RETIRADA.ret_id_pcp)
-            df_retiradas = pd.read_sql(retiradas_q.statement, session.bind).set_index('ret_id_pcp')
-
-            df_pcp['qtd_baixa'] = df_pcp['pcp_id'].map(df_baixas['qtd_baixa']).fillna(0)
-            df_pcp['qtd_retirada'] = df_pcp['pcp_id'].map(df_retiradas['qtd_retirada']).fillna(0)
             df_pcp['saldo_em_processo'] = (df_pcp['pcp_qtd'] - df_pcp['qtd_baixa']).clip(lower=0)
             df_pcp['saldo_em_estoque'] = (df_pcp['qtd_baixa'] - df_pcp['qtd_retirada']).clip(lower=0)
             df_pcp['valor_unitario'] = df_pcp['pcp_produto_id'].map(df_valores['valor']).fillna(0)
@@ -988,13 +971,9 @@ def cash_flow_to_excel(df_events):
 # --- Main Layout and Callbacks ---
 # (The rest of the file remains largely the same)
 
-initial_data = get_dre_entradas_data('competencia')
-initial_data['retirada_franquias'] = get_empurrado_data(dia_entrega_is_none=True, view_mode='competencia')
-initial_data['retirada_estoque'] = get_empurrado_data(dia_entrega_is_none=False, view_mode='competencia')
-initial_data['compras'] = get_compras_data('competencia')
-
+# Os dados do DRE são carregados por update_dre_data quando a página abre
 layout = dbc.Container([
-    dcc.Store(id='dre-data-store', data=initial_data),
+    dcc.Store(id='dre-data-store'),
     dcc.Download(id="download-dre-excel"),
     dcc.Download(id="download-cashflow-excel"),
     dbc.Row([
@@ -1021,7 +1000,7 @@ layout = dbc.Container([
     ], align="center", justify="center", className="mb-4"),
     dbc.Row(html.Hr()),
     dbc.Row([
-        dbc.Col(id='dre-table-container', children=create_data_table(initial_data))
+        dbc.Col(id='dre-table-container', children=dbc.Spinner(color="primary"))
     ])
 ], fluid=True, className="py-4")
 
@@ -1029,10 +1008,9 @@ layout = dbc.Container([
     Output('dre-data-store', 'data'),
     Input('dre-view-selector', 'value'),
     Input('refresh-dre-data', 'n_clicks'),
-    prevent_initial_call=True
 )
 def update_dre_data(view_mode, n_clicks):
-    # This will re-run the data fetching functions when the button is clicked or the view mode changes
+    # Runs when the page opens and again when the button is clicked or the view mode changes
     data = get_dre_entradas_data(view_mode)
     data['retirada_franquias'] = get_empurrado_data(dia_entrega_is_none=True, view_mode=view_mode)
     data['retirada_estoque'] = get_empurrado_data(dia_entrega_is_none=False, view_mode=view_mode)
@@ -1126,5 +1104,7 @@ def toggle_compras_details(n_clicks):
     Input('dre-data-store', 'data')
 )
 def update_dre_table(data):
+    if not data:
+        raise PreventUpdate
     return create_data_table(data)
 
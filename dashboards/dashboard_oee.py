@@ -2,11 +2,15 @@ from dash import html, dcc, Input, Output, dash_table, State, callback_context
 import dash_bootstrap_components as dbc
 from app import app
 from banco_dados.banco import Banco
+from banco_dados.cache import em_cache
 from sqlalchemy import text
 import pandas as pd
 from datetime import datetime, date, timedelta
 import plotly.graph_objects as go
 
+# Tabelas lidas pelas consultas de OEE (o cache é invalidado quando qualquer uma muda)
+TABELAS_OEE = ('producao', 'apontamento_produto', 'apontamento', 'razao', 'maquina', 'categoria_produto', 'setor')
+
 def create_metric_card(title, body_id):
     return dbc.Card([
         dbc.CardHeader(title),
@@ -85,14 +89,39 @@ def get_product_summary_data(start_date, end_date, setor_id, maquina_id):
         
     return df_summary
 
+@em_cache(*TABELAS_OEE)
 def calculate_oee_metrics(start_date, end_date, setor_id, maquina_id):
     if not start_date or not end_date:
         return {'availability': 0, 'performance': 0, 'quality': 0, 'custo_oee': 0, 'custo_extra': 0, 'dataframe': pd.DataFrame()}
 
     banco = Banco()
-    
-    query = """
+
+    # Filtro das produções, aplicado também dentro das CTEs: os apontamentos são
+    # somados só para as produções do período, pelos índices de atp_producao/ap_pr
+    filtros = ""
+    params = {}
+    if setor_id:
+        filtros += " AND p.pr_setor_id = :setor_id"
+        params['setor_id'] = setor_id
+    if maquina_id:
+        filtros += " AND p.pr_maquina_id = :maquina_id"
+        params['maquina_id'] = maquina_id
+    if start_date and end_date:
+        filtros += " AND p.pr_data BETWEEN :start_date AND :end_date"
+        params['start_date'] = start_date
+        params['end_date'] = end_date
+    elif start_date:
+        filtros += " AND p.pr_data >= :start_date"
+        params['start_date'] = start_date
+    elif end_date:
+        filtros += " AND p.pr_data <= :end_date"
+        params['end_date'] = end_date
+
+    query = f"""
     WITH 
+        ProducaoFiltrada AS (
+            SELECT p.pr_id FROM producao p WHERE 1=1{filtros}
+        ),
         SomaApontamentoProduto AS (
             SELECT
                 atp_producao,
@@ -101,6 +130,8 @@ def calculate_oee_metrics(start_date, end_date, setor_id, maquina_id):
                 SUM(COALESCE(atp_custo, 0)) AS soma_atp_custo
             FROM 
                 apontamento_produto
+            WHERE 
+                atp_producao IN (SELECT pr_id FROM ProducaoFiltrada)
             GROUP BY 
                 atp_producao
         ),
@@ -114,6 +145,8 @@ def calculate_oee_metrics(start_date, end_date, setor_id, maquina_id):
                 apontamento ap
             JOIN 
                 razao r ON ap.ap_lv1 = r.ra_id
+            WHERE 
+                ap.ap_pr IN (SELECT pr_id FROM ProducaoFiltrada)
             GROUP BY 
                 ap.ap_pr
         )
@@ -143,27 +176,9 @@ def calculate_oee_metrics(start_date, end_date, setor_id, maquina_id):
         SomaApontamentoProduto sap ON p.pr_id = sap.atp_producao
     LEFT JOIN 
         SomaApontamentoParadas spp ON p.pr_id = spp.ap_pr
-    WHERE 1=1
+    WHERE 1=1{filtros}
     """
 
-    params = {}
-    if setor_id:
-        query += " AND p.pr_setor_id = :setor_id"
-        params['setor_id'] = setor_id
-    if maquina_id:
-        query += " AND p.pr_maquina_id = :maquina_id"
-        params['maquina_id'] = maquina_id
-    if start_date and end_date:
-        query += " AND p.pr_data BETWEEN :start_date AND :end_date"
-        params['start_date'] = start_date
-        params['end_date'] = end_date
-    elif start_date:
-        query += " AND p.pr_data >= :start_date"
-        params['start_date'] = start_date
-    elif end_date:
-        query += " AND p.pr_data <= :end_date"
-        params['end_date'] = end_date
-    
     with banco.engine.connect() as conn:
         df = pd.read_sql(text(query), conn, params=params)
 
@@ -3,13 +3,19 @@ from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 from app import app
 from banco_dados.banco import Banco
+from banco_dados.cache import em_cache
+from banco_dados.snapshot import TABELA_SNAPSHOT
+from dashboards.dashboard_oee import TABELAS_OEE
 from sqlalchemy import text
 import pandas as pd
 from datetime import datetime, date, timedelta
 import plotly.graph_objects as go
 
+# Lê do snapshot: o cache também é invalidado quando a cópia é atualizada
+TABELAS_OEE_GERAL = TABELAS_OEE + (TABELA_SNAPSHOT,)
+
 def get_stop_data_lv2_for_sector(start_date, end_date, setor_id, maquina_id=None):
-    banco = Banco()
+    banco = Banco(somente_leitura=True)
     df_razao = banco.ler_tabela('razao')
     if df_razao.empty:
         return pd.DataFrame()
@@ -52,7 +58,7 @@ def get_stop_data_lv2_for_sector(start_date, end_date, setor_id, maquina_id=None
     return df_grouped
 
 def get_product_summary_data(start_date, end_date, setor_id, maquina_id):
-    banco = Banco()
+    banco = Banco(somente_leitura=True)
     query = """
         SELECT
             pcp.pcp_pcp,
@@ -117,8 +123,9 @@ def create_stop_bar_chart(df, title):
     )
     return fig
 
+@em_cache(*TABELAS_OEE_GERAL)
 def calculate_oee_for_all_machines_in_sector(start_date, end_date, setor_id):
-    banco = Banco()
+    banco = Banco(somente_leitura=True)
     query = """
     WITH 
         apontamentos_producao AS (
@@ -207,6 +214,7 @@ def calculate_oee_for_all_machines_in_sector(start_date, end_date, setor_id):
         
     return pd.DataFrame(results)
 
+@em_cache(*TABELAS_OEE_GERAL)
 def calculate_oee_metrics_geral(start_date, end_date, setor_id, maquina_id=None):
     base_metrics = {
         'availability': 0, 'performance': 0, 'quality': 0, 'oee': 0, 
@@ -217,7 +225,7 @@ def calculate_oee_metrics_geral(start_date, end_date, setor_id, maquina_id=None)
     if not start_date or not end_date:
         return base_metrics
 
-    banco = Banco()
+    banco = Banco(somente_leitura=True)
     
     query = """
     WITH 
@@ -369,7 +377,7 @@ def calculate_oee_metrics_geral(start_date, end_date, setor_id, maquina_id=None)
     }
 
 def get_weekly_production_data(end_date, setor_id=None):
-    banco = Banco()
+    banco = Banco(somente_leitura=True)
     # The range should start 5 weeks before the end date's week start
     end_of_week = end_date
     start_of_week = end_of_week - timedelta(days=end_of_week.weekday())
@@ -475,7 +483,7 @@ def update_geral_oee_dashboard(start_date_str, end_date_str):
     start_date = datetime.strptime(start_date_str.split('T')[0], '%Y-%m-%d').date()
     end_date = datetime.strptime(end_date_str.split('T')[0], '%Y-%m-%d').date()
     
-    banco = Banco()
+    banco = Banco(somente_leitura=True)
     df_setores = banco.ler_tabela('setor')
     
     cols = []
@@ -617,7 +625,7 @@ def handle_machine_modal(open_clicks, close_click, start_date_str, end_date_str,
         start_date = datetime.strptime(start_date_str.split('T')[0], '%Y-%m-%d').date()
         end_date = datetime.strptime(end_date_str.split('T')[0], '%Y-%m-%d').date()
         
-        banco = Banco()
+        banco = Banco(somente_leitura=True)
         df_setor = banco.ler_tabela('setor')
         setor_nome = df_setor.query(f'setor_id == {setor_id}')['setor_nome'].iloc[0]
         
@@ -2,6 +2,8 @@ import dash_bootstrap_components as dbc
 from dash import html, dcc, Input, Output, State
 from app import app
 from banco_dados.banco import Banco
+from banco_dados.cache import em_cache
+from dashboards.dashboard_oee import TABELAS_OEE
 from sqlalchemy import text
 import pandas as pd
 from datetime import datetime, date, timedelta
@@ -134,6 +136,7 @@ def get_product_summary_data(start_date, end_date, setor_id):
         
     return df_summary
 
+@em_cache(*TABELAS_OEE)
 def calculate_oee_for_all_machines_in_sector(start_date, end_date, setor_id):
     banco = Banco()
     query = """
@@ -222,6 +225,7 @@ def calculate_oee_for_all_machines_in_sector(start_date, end_date, setor_id):
         
     return pd.DataFrame(results)
 
+@em_cache(*TABELAS_OEE)
 def calculate_oee_metrics_geral(start_date, end_date, setor_id):
     base_metrics = {'availability': 0, 'performance': 0, 'quality': 0, 'oee': 0, 'total_produzido': 0, 'total_refugo': 0, 'horas_produtivas': 0, 'produzido_por_hora': 0}
     if not start_date or not end_date or not setor_id:
@@ -6,6 +6,8 @@ import plotly.graph_objs as go
 import plotly.express as px
 from datetime import datetime, timedelta
 from banco_dados.banco import Banco, engine
+from banco_dados.cache import em_cache, nao_guardar_resultado
+from banco_dados.snapshot import engine_leitura, TABELA_SNAPSHOT
 from app import app
 import sqlite3
 import calendar
@@ -33,13 +35,14 @@ METAS_MENSAIS = {
     'TAMPA 5L': 0
 }
 
+@em_cache('planejamento', 'baixa', TABELA_SNAPSHOT)
 def calcular_aderencia_programacao():
     """
     Calcula a aderência à programação comparando planejamento vs baixas por semana
     """
     try:
         # Conectar ao banco de dados
-        with engine.connect() as conn:
+        with engine_leitura().connect() as conn:
             # Query para obter dados de planejamento com semana do ano
             query_planejamento = """
             SELECT 
@@ -137,6 +140,7 @@ def calcular_aderencia_programacao():
         
     except Exception as e:
         print(f"Erro ao calcular aderência: {e}")
+        nao_guardar_resultado()
         return pd.DataFrame()
 
 def calcular_dados_categoria_por_semana():
@@ -145,7 +149,7 @@ def calcular_dados_categoria_por_semana():
     """
     try:
         # Conectar ao banco de dados
-        with engine.connect() as conn:
+        with engine_leitura().connect() as conn:
             # Query para obter dados de planejamento com categoria
             query_planejamento = """
             SELECT 
@@ -500,7 +504,7 @@ def calcular_pedidos_atraso():
     - data menor que hoje
     """
     try:
-        with engine.connect() as conn:
+        with engine_leitura().connect() as conn:
             query = """
             SELECT 
                 p.pcp_id,
@@ -539,7 +543,7 @@ def calcular_pedidos_atraso():
 def calcular_metricas_mensais():
     try:
         # Conectar ao banco de dados
-        with engine.connect() as conn:
+        with engine_leitura().connect() as conn:
             # Obter mês atual e anterior
             hoje = datetime.now()
             primeiro_dia_mes_atual = hoje.replace(day=1)
@@ -1121,7 +1125,7 @@ def atualizar_dashboard(usar_semana_anterior, nf_cat):
         # Construir gráfico de atrasos por semana (horizontal)
         # Cálculo por fotografia semanal: para cada semana, quantidade de OS cujo prazo (pcp_entrega)
         # era até o fim daquela semana e cujo total baixado acumulado até aquela semana < 90% da quantidade planejada
-        with engine.connect() as conn:
+        with engine_leitura().connect() as conn:
             df_pcp_base = pd.read_sql(
                 """
                 SELECT p.pcp_id, p.pcp_qtd, p.pcp_entrega
@@ -1199,7 +1203,7 @@ def atualizar_dashboard(usar_semana_anterior, nf_cat):
 
         # Construir gráfico de pendências (status != FEITO): soma pcp_qtd por categoria e semana
         try:
-            with engine.connect() as conn:
+            with engine_leitura().connect() as conn:
                 df_nf = pd.read_sql(
                     """
                     SELECT p.pcp_id, p.pcp_pcp, p.pcp_categoria, p.pcp_qtd, p.pcp_entrega,
@@ -11,6 +11,7 @@ from banco_dados.banco import PCP, PRODUTO, CLIENTE, BAIXA, engine
 from dashboards.pages.integracoes import layout as integracoes_layout
 from dashboards.formulario.form_crud_notas import layout as crud_saidas_layout
 from dashboards.zerar_estoque import layout_zerar_estoque
+from formatacao import coluna_numerica
 
 # Layout do dashboard de produtos
 layout = dbc.Container([
@@ -171,14 +172,6 @@ layout = dbc.Container([
     
 ], fluid=True)
 
-def formatar_numero(val):
-    if pd.isna(val) or val is None:
-        return "0"
-    try:
-        return '{:,.0f}'.format(float(val)).replace(',', '.')
-    except (ValueError, TypeError):
-        return "0"
-
 def obter_dados_produtos_em_lote(produto_ids):
     """
     Obtém dados de baixas, pedidos em aberto e saídas para uma lista de produtos
@@ -387,10 +380,10 @@ def atualizar_tabela_produtos(n_clicks, produto, cliente, fluxo, status, busca):
         if df_agrupado.empty:
             return [html.P("Nenhum produto encontrado com os filtros aplicados.")]
         
-        # Formatar números
+        # Quantidades seguem numéricas; a tabela formata no navegador (ordenação correta)
         colunas_numericas = ['qtd_planejada', 'qtd_processo', 'qtd_estoque', 'qtd_pedidos_aberto', 'qtd_pedidos_fechado', 'qtd_pedidos_pronto']
         for col in colunas_numericas:
-            df_agrupado[col] = df_agrupado[col].apply(formatar_numero)
+            df_agrupado[col] = pd.to_numeric(df_agrupado[col], errors='coerce').fillna(0)
         
         # Remover coluna Ações se existir
         if 'Ações' in df_agrupado.columns:
@@ -435,11 +428,11 @@ def atualizar_tabela_produtos(n_clicks, produto, cliente, fluxo, status, busca):
             {"name": "Clientes", "id": "Clientes"},
             #{"name": "Fluxo de Produção", "id": "Fluxo de Produção"},
             #{"name": "Qtd Planejada", "id": "Qtd Planejada"},
-            {"name": "Produção", "id": "Produção"},
-            {"name": "Qtd em Estoque", "id": "Qtd em Estoque"},
-            {"name": "Pedidos Aberto", "id": "Pedidos Aberto"},
-            {"name": "Pedidos Fechado", "id": "Pedidos Fechado"},
-            {"name": "Pedidos Pronto", "id": "Pedidos Pronto"}
+            coluna_numerica("Produção", "Produção"),
+            coluna_numerica("Qtd em Estoque", "Qtd em Estoque"),
+            coluna_numerica("Pedidos Aberto", "Pedidos Aberto"),
+            coluna_numerica("Pedidos Fechado", "Pedidos Fechado"),
+            coluna_numerica("Pedidos Pronto", "Pedidos Pronto")
         ]
         
         # Verificar se todos os dados são válidos
@@ -454,6 +447,8 @@ def atualizar_tabela_produtos(n_clicks, produto, cliente, fluxo, status, busca):
                         value = item[col_id]
                         if pd.isna(value) or value is None:
                             item_valido[col_id] = ""
+                        elif col.get('type') == 'numeric':
+                            item_valido[col_id] = float(value)
                         else:
                             item_valido[col_id] = str(value)
                     else:
@@ -494,17 +489,17 @@ def atualizar_tabela_produtos(n_clicks, produto, cliente, fluxo, status, busca):
                 'cursor': 'pointer'
             },
             style_data_conditional=[
-                {'if': {'column_id': 'Produção', 'filter_query': '{Produção} > "0"'},
+                {'if': {'column_id': 'Produção', 'filter_query': '{Produção} > 0'},
                  'backgroundColor': 'rgba(255, 165, 0, 0.2)', 'color': 'black'},
-                {'if': {'column_id': 'Qtd em Estoque', 'filter_query': '{Qtd em Estoque} > "0"'},
+                {'if': {'column_id': 'Qtd em Estoque', 'filter_query': '{Qtd em Estoque} > 0'},
                  'backgroundColor': 'rgba(34, 139, 34, 0.2)', 'color': 'black'},
-                {'if': {'column_id': 'Qtd em Estoque', 'filter_query': '{Qtd em Estoque} <= "0"'},
+                {'if': {'column_id': 'Qtd em Estoque', 'filter_query': '{Qtd em Estoque} <= 0'},
                  'backgroundColor': 'rgba(220, 53, 69, 0.2)', 'color': 'white', 'fontWeight': 'bold'},
-                {'if': {'column_id': 'Pedidos Aberto', 'filter_query': '{Pedidos Aberto} > "0"'},
+                {'if': {'column_id': 'Pedidos Aberto', 'filter_query': '{Pedidos Aberto} > 0'},
                  'backgroundColor': 'rgba(0, 123, 255, 0.2)', 'color': 'black'},
-                {'if': {'column_id': 'Pedidos Fechado', 'filter_query': '{Pedidos Fechado} > "0"'},
+                {'if': {'column_id': 'Pedidos Fechado', 'filter_query': '{Pedidos Fechado} > 0'},
                  'backgroundColor': 'rgba(108, 117, 125, 0.2)', 'color': 'black'},
-                {'if': {'column_id': 'Pedidos Pronto', 'filter_query': '{Pedidos Pronto} > "0"'},
+                {'if': {'column_id': 'Pedidos Pronto', 'filter_query': '{Pedidos Pronto} > 0'},
                  'backgroundColor': 'rgba(52, 58, 64, 0.2)', 'color': 'black'},
                 {'if': {'state': 'selected'},
                  'backgroundColor': 'rgba(0, 123, 255, 0.3)', 'color': 'black'}
@@ -0,0 +1,48 @@
+from dash import html, dcc, Input, Output, dash_table
+import dash_bootstrap_components as dbc
+from app import app
+from banco_dados.monitor_consultas import estatisticas_consultas, LIMITE_LENTA_MS, ARQUIVO_LOG
+from banco_dados.cache import cache_consultas
+
+# Página administrativa (/desempenhoconsultas): percentis por consulta e uso do cache
+layout = dbc.Container([
+    dbc.Row([
+        dbc.Col(html.H4("Desempenho das Consultas"), md=8),
+        dbc.Col([
+            dbc.Button("Atualizar", id="btn-atualizar-consultas", color="primary", size="sm", className="me-2"),
+            dbc.Button("Zerar estatísticas", id="btn-zerar-consultas", color="secondary", size="sm"),
+        ], md=4, className="text-end"),
+    ], className="my-3"),
+    html.Div(id="resumo-cache-consultas", className="mb-3 small"),
+    html.Small(f"Consultas acima de {LIMITE_LENTA_MS:.0f} ms são gravadas em {ARQUIVO_LOG}", className="text-muted"),
+    dash_table.DataTable(
+        id="tabela-desempenho-consultas",
+        columns=[{"name": c, "id": c} for c in
+                 ['origem', 'execucoes', 'total_ms', 'media_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'linhas_media', 'sql']],
+        sort_action="native",
+        filter_action="native",
+        page_size=25,
+        style_table={'overflowX': 'auto'},
+        style_cell={'fontSize': '12px', 'textAlign': 'left', 'maxWidth': '600px',
+                    'whiteSpace': 'normal', 'height': 'auto'},
+        style_header={'fontWeight': 'bold', 'backgroundColor': '#f8f9fa'},
+    ),
+], fluid=True)
+
+@app.callback(
+    [Output("tabela-desempenho-consultas", "data"),
+     Output("resumo-cache-consultas", "children")],
+    [Input("btn-atualizar-consultas", "n_clicks"),
+     Input("btn-zerar-consultas", "n_clicks")],
+)
+def atualizar_desempenho_consultas(n_atualizar, n_zerar):
+    from dash import callback_context
+    if callback_context.triggered and callback_context.triggered[0]['prop_id'].startswith("btn-zerar-consultas") and n_zerar:
+        estatisticas_consultas.limpar()
+
+    df = estatisticas_consultas.resumo()
+    cache = cache_consultas.estatisticas()
+    resumo = (f"Cache de consultas: {cache['itens']} itens, {cache['bytes'] / 1024 / 1024:.1f} MB, "
+              f"{cache['acertos']} acertos / {cache['falhas']} falhas "
+              f"({cache['taxa_acerto']:.0%}), {cache['remocoes']} remoções")
+    return df.to_dict('records'), resumo
@@ -0,0 +1,30 @@
+from dash import html, dcc, Input, Output
+import dash_bootstrap_components as dbc
+from app import app
+from banco_dados.snapshot import estado_snapshot, snapshot_ativo
+
+# Indicador de defasagem dos painéis quando eles leem do snapshot (banco_dados/snapshot.py)
+layout = html.Div([
+    dcc.Interval(id="intervalo-indicador-snapshot", interval=15 * 1000, disabled=not snapshot_ativo()),
+    html.Div(id="indicador-snapshot", className="text-end small px-2"),
+])
+
+@app.callback(
+    Output("indicador-snapshot", "children"),
+    Input("intervalo-indicador-snapshot", "n_intervals"),
+)
+def atualizar_indicador_snapshot(n_intervals):
+    estado = estado_snapshot()
+    if not estado['ativo']:
+        return None
+    if not estado['usando_snapshot']:
+        texto = "Painéis lendo do banco principal (snapshot indisponível)"
+        if estado['erro']:
+            texto += f": {estado['erro']}"
+        return dbc.Badge(texto, color="warning", title=texto)
+
+    idade = estado['idade_s']
+    cor = "light" if idade <= 2 * estado['intervalo_s'] else "warning"
+    atualizado = estado['atualizado_em'].strftime('%H:%M:%S')
+    return dbc.Badge(f"Painéis: dados de {atualizado} (há {idade:.0f} s)", color=cor, text_color="dark",
+                     title="Dashboards leem uma cópia do banco; formulários sempre usam o banco principal.")
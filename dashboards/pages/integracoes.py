@@ -611,36 +611,27 @@ def salvar_pedidos_em_aberto_no_banco(dados_processados):
         
         banco = Banco()
         
-        # Contador de itens salvos
-        itens_salvos = 0
-        
-        # Salvar apenas itens com correspondência
+        # Monta o lote apenas com itens com correspondência
+        lote = []
         for item in dados_processados:
             # Verificar se o item tem correspondência (não é "❌ Sem correspondência")
             if item.get("Produto Correspondente") != "❌ Sem correspondência" and item.get("Produto ID") != "N/A":
-                try:
-                    # Preparar dados para inserção
-                    dados_insercao = {
-                        'descricao_item': item.get("Descrição do Item", ""),
-                        'produto_id': item.get("Produto ID"),
-                        'data_entrega': item.get("Data de Entrega", ""),
-                        'data_inicio': item.get("Data de Início", ""),
-                        'valor_faturamento': item.get("Valor de Faturamento", ""),
-                        'situacao': item.get("Situação", ""),
-                        'tipo_frete': item.get("Tipo de Frete", ""),
-                        'id_pedido': item.get("ID do Pedido", ""),
-                        'quantidade': item.get("Quantidade", 0),
-                        'codigo_produto': item.get("Código do Produto", ""),
-                        'status_mapeamento': item.get("Status Mapeamento", "")
-                    }
-                    
-                    # Inserir no banco
-                    banco.inserir_dados('pedidos_em_aberto', **dados_insercao)
-                    itens_salvos += 1
-                    
-                except Exception as e:
-                    print(f"Erro ao salvar item {item.get('Descrição do Item', '')}: {e}")
-                    continue
+                lote.append({
+                    'descricao_item': item.get("Descrição do Item", ""),
+                    'produto_id': item.get("Produto ID"),
+                    'data_entrega': item.get("Data de Entrega", ""),
+                    'data_inicio': item.get("Data de Início", ""),
+                    'valor_faturamento': item.get("Valor de Faturamento", ""),
+                    'situacao': item.get("Situação", ""),
+                    'tipo_frete': item.get("Tipo de Frete", ""),
+                    'id_pedido': item.get("ID do Pedido", ""),
+                    'quantidade': item.get("Quantidade", 0),
+                    'codigo_produto': item.get("Código do Produto", ""),
+                    'status_mapeamento': item.get("Status Mapeamento", "")
+                })
+        
+        # Inserir no banco em uma única transação
+        itens_salvos = len(banco.inserir_em_lote('pedidos_em_aberto', lote, tamanho_lote=500))
         
         return {
             "sucesso": True,
@@ -662,39 +653,24 @@ def salvar_nfe_itens_faturados_no_banco(dados_processados):
         print(f"🔍 DEBUG - Iniciando salvamento de {len(dados_processados)} itens NFE")
         banco = Banco()
         
-        # Contador de itens salvos
-        itens_salvos = 0
-        
-        # Salvar apenas itens com correspondência
+        # Monta o lote apenas com itens com correspondência
+        lote = []
         for i, item in enumerate(dados_processados):
-            print(f"🔍 DEBUG - Processando item {i+1}: {item.get('Descrição', '')[:50]}...")
-            print(f"🔍 DEBUG - Produto Correspondente: {item.get('Produto Correspondente', '')}")
-            print(f"🔍 DEBUG - Produto ID: {item.get('Produto ID', '')}")
             # Verificar se o item tem correspondência (não é "❌ Sem correspondência")
             if item.get("Produto Correspondente") != "❌ Sem correspondência" and item.get("Produto ID") != "N/A":
-                print(f"✅ DEBUG - Item tem correspondência, salvando...")
-                try:
-                    # Preparar dados para inserção
-                    dados_insercao = {
-                        'produto_id': item.get("Produto ID"),
-                        'descricao': item.get("Descrição", ""),
-                        'quantidade': item.get("Quantidade", 0),
-                        'numero_nfe': item.get("Numero_NFE", ""),
-                        'observacao': f"Data Emissão: {item.get('Data_Emissao', '')} | Cliente: {item.get('Cliente', '')} | Valor: {item.get('Valor_Total', '')}"
-                    }
-                    
-                    print(f"🔍 DEBUG - Dados para inserção: {dados_insercao}")
-                    
-                    # Inserir no banco
-                    banco.inserir_dados('saida_notas', **dados_insercao)
-                    itens_salvos += 1
-                    print(f"✅ DEBUG - Item salvo com sucesso! Total: {itens_salvos}")
-                    
-                except Exception as e:
-                    print(f"❌ DEBUG - Erro ao salvar item NFE {item.get('Descrição', '')}: {e}")
-                    continue
+                lote.append({
+                    'produto_id': item.get("Produto ID"),
+                    'descricao': item.get("Descrição", ""),
+                    'quantidade': item.get("Quantidade", 0),
+                    'numero_nfe': item.get("Numero_NFE", ""),
+                    'observacao': f"Data Emissão: {item.get('Data_Emissao', '')} | Cliente: {item.get('Cliente', '')} | Valor: {item.get('Valor_Total', '')}"
+                })
             else:
-                print(f"❌ DEBUG - Item sem correspondência, pulando...")
+                print(f"❌ DEBUG - Item {i+1} sem correspondência, pulando...")
+        
+        # Inserir no banco em uma única transação
+        itens_salvos = len(banco.inserir_em_lote('saida_notas', lote, tamanho_lote=500))
+        print(f"✅ DEBUG - {itens_salvos} itens NFE salvos")
         
         return {
             "sucesso": True,
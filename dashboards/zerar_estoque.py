@@ -6,7 +6,7 @@ Este script permite zerar o estoque de produtos selecionados criando registros d
 from dash import html, dcc, Input, Output, State, callback_context, ALL, no_update
 import dash_bootstrap_components as dbc
 import pandas as pd
-from banco_dados.banco import Banco, SAIDA_NOTAS, PRODUTO, PCP, BAIXA, engine
+from banco_dados.banco import Banco, SAIDA_NOTAS, PRODUTO, PCP, PCP_SALDO, engine
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime, date
@@ -124,12 +124,12 @@ def obter_produtos_com_estoque(filtro_nome=None, apenas_com_estoque=True):
         produto_ids = df_agrupado['produto_id'].unique().tolist()
         
         with Session(engine) as session:
-            # Baixas por produto
+            # Baixas por produto (totais por PCP mantidos em pcp_saldo)
             baixas = session.query(
                 PCP.pcp_produto_id,
-                func.sum(BAIXA.qtd).label("qtd_baixa")
+                func.sum(PCP_SALDO.qtd_baixa).label("qtd_baixa")
             ).join(
-                BAIXA, PCP.pcp_id == BAIXA.pcp_id
+                PCP_SALDO, PCP.pcp_id == PCP_SALDO.pcp_id
             ).filter(
                 PCP.pcp_produto_id.in_(produto_ids)
             ).group_by(PCP.pcp_produto_id).all()
@@ -386,64 +386,67 @@ def executar_zeramento_estoque(n_confirmar, selected_rows, data):
                 quantidade = int(qtd_estoque_str.replace('.', ''))
             
             try:
-                if quantidade > 0:
-                    # Estoque positivo: criar saída para zerar
-                    dados_saida = {
-                        'produto_id': produto_id,
-                        'quantidade': quantidade,
-                        'descricao': f'Zeramento automático de estoque - {datetime.now().strftime("%d/%m/%Y %H:%M")}',
-                        'numero_nfe': f'AUTO-ZERO-{datetime.now().strftime("%Y%m%d%H%M%S")}-{produto_id}',
-                        'observacao': f'Zeramento automático do estoque do produto ID {produto_id} executado em {datetime.now().strftime("%d/%m/%Y às %H:%M")}'
-                    }
+                # Cada produto em uma única transação: as saídas removidas/ajustadas
+                # são confirmadas juntas ou nenhuma é aplicada
+                with banco.transacao():
+                    if quantidade > 0:
+                        # Estoque positivo: criar saída para zerar
+                        dados_saida = {
+                            'produto_id': produto_id,
+                            'quantidade': quantidade,
+                            'descricao': f'Zeramento automático de estoque - {datetime.now().strftime("%d/%m/%Y %H:%M")}',
+                            'numero_nfe': f'AUTO-ZERO-{datetime.now().strftime("%Y%m%d%H%M%S")}-{produto_id}',
+                            'observacao': f'Zeramento automático do estoque do produto ID {produto_id} executado em {datetime.now().strftime("%d/%m/%Y às %H:%M")}'
+                        }
                     
-                    banco.inserir_dados("saida_notas", **dados_saida)
-                    acoes_realizadas.append(f"ID {produto_id}: Adicionada saída de {quantidade:,} unidades".replace(',', '.'))
+                        banco.inserir_dados("saida_notas", **dados_saida)
+                        acoes_realizadas.append(f"ID {produto_id}: Adicionada saída de {quantidade:,} unidades".replace(',', '.'))
                     
-                elif quantidade < 0:
-                    # Estoque negativo: remover saídas existentes para equilibrar
-                    qtd_para_remover = abs(quantidade)
+                    elif quantidade < 0:
+                        # Estoque negativo: remover saídas existentes para equilibrar
+                        qtd_para_remover = abs(quantidade)
                     
-                    # Buscar saídas existentes do produto
-                    df_saidas = banco.ler_tabela("saida_notas")
-                    saidas_produto = df_saidas[df_saidas['produto_id'] == produto_id].sort_values('id', ascending=False)
+                        # Buscar saídas existentes do produto
+                        df_saidas = banco.ler_tabela("saida_notas")
+                        saidas_produto = df_saidas[df_saidas['produto_id'] == produto_id].sort_values('id', ascending=False)
                     
-                    if saidas_produto.empty:
-                        erros.append(f"Produto ID {produto_id}: Nenhuma saída encontrada para remover")
-                        continue
+                        if saidas_produto.empty:
+                            erros.append(f"Produto ID {produto_id}: Nenhuma saída encontrada para remover")
+                            continue
                     
-                    # Remover saídas até equilibrar
-                    qtd_removida = 0
-                    saidas_removidas = 0
+                        # Remover saídas até equilibrar
+                        qtd_removida = 0
+                        saidas_removidas = 0
                     
-                    for _, saida in saidas_produto.iterrows():
-                        if qtd_removida >= qtd_para_remover:
-                            break
+                        for _, saida in saidas_produto.iterrows():
+                            if qtd_removida >= qtd_para_remover:
+                                break
                             
-                        saida_id = saida['id']
-                        qtd_saida = saida['quantidade']
+                            saida_id = saida['id']
+                            qtd_saida = saida['quantidade']
                         
-                        if qtd_removida + qtd_saida <= qtd_para_remover:
-                            # Remover saída completa
-                            banco.deletar_dado("saida_notas", saida_id)
-                            qtd_removida += qtd_saida
-                            saidas_removidas += 1
-                        else:
-                            # Reduzir quantidade da saída
-                            qtd_restante = qtd_para_remover - qtd_removida
-                            nova_quantidade = qtd_saida - qtd_restante
+                            if qtd_removida + qtd_saida <= qtd_para_remover:
+                                # Remover saída completa
+                                banco.deletar_dado("saida_notas", saida_id)
+                                qtd_removida += qtd_saida
+                                saidas_removidas += 1
+                            else:
+                                # Reduzir quantidade da saída
+                                qtd_restante = qtd_para_remover - qtd_removida
+                                nova_quantidade = qtd_saida - qtd_restante
                             
-                            banco.editar_dado("saida_notas", saida_id, quantidade=nova_quantidade)
-                            qtd_removida += qtd_restante
+                                banco.editar_dado("saida_notas", saida_id, quantidade=nova_quantidade)
+                                qtd_removida += qtd_restante
                     
-                    if qtd_removida > 0:
-                        acoes_realizadas.append(f"ID {produto_id}: Removidas {qtd_removida:,} unidades de {saidas_removidas} saída(s)".replace(',', '.'))
-                    else:
-                        erros.append(f"Produto ID {produto_id}: Não foi possível remover saídas suficientes")
-                        continue
+                        if qtd_removida > 0:
+                            acoes_realizadas.append(f"ID {produto_id}: Removidas {qtd_removida:,} unidades de {saidas_removidas} saída(s)".replace(',', '.'))
+                        else:
+                            erros.append(f"Produto ID {produto_id}: Não foi possível remover saídas suficientes")
+                            continue
                 
-                else:
-                    # Estoque zero: não fazer nada
-                    acoes_realizadas.append(f"ID {produto_id}: Estoque já está zerado")
+                    else:
+                        # Estoque zero: não fazer nada
+                        acoes_realizadas.append(f"ID {produto_id}: Estoque já está zerado")
                 
                 produtos_processados += 1
                 
@@ -0,0 +1,422 @@
+"""
+Benchmarks das funções de dados mais usadas, sobre bancos sintéticos
+(banco_dados.gerador_dados) em várias escalas.
+
+Para cada escala o banco é gerado uma vez em desempenho/dados/ (reaproveitado
+enquanto semente e data final forem as mesmas) e os casos rodam em um
+subprocesso apontado para ele por PCP_BD_ARQUIVO. Cada caso é medido com o
+cache de consultas vazio (execução fria): mediana/mínimo/máximo do tempo em
+N repetições, pico de memória (tracemalloc) em uma execução separada e a
+quantidade de comandos SQL emitidos.
+
+Uso (a partir da raiz do projeto):
+    python -m desempenho.benchmarks
+    python -m desempenho.benchmarks --escalas 1000,10000,100000 --repeticoes 5
+    python -m desempenho.benchmarks --salvar-base principal
+    python -m desempenho.benchmarks --comparar principal --tolerancia 0.25
+    python -m desempenho.benchmarks --banco /tmp/bd_100k.sqlite --casos listar_pcp,relatorio_tabela
+
+As bases ficam em desempenho/bases/<nome>.json. Com --comparar, retorna código
+de saída 1 se algum caso ficar mais lento (ou usar mais memória) que a base
+além da tolerância.
+"""
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+PASTA_DADOS = Path(__file__).resolve().parent / 'dados'
+PASTA_BASES = Path(__file__).resolve().parent / 'bases'
+
+# Diferenças abaixo destes valores são ruído, qualquer que seja a variação relativa
+MINIMO_MS = 5.0
+MINIMO_MB = 1.0
+
+
+# Casos ==================================================
+# Cada caso recebe o contexto (datas de referência do banco), faz a preparação
+# fora da medição e devolve a função sem argumentos que será cronometrada.
+# As funções medidas capturam os próprios erros e devolvem vazio; por isso o
+# resultado passa por uma verificação (texto do problema ou None) antes de medir.
+CASOS = {}
+VERIFICACOES = {}
+
+def _com_dados(resultado):
+    import pandas as pd
+
+    if resultado is None:
+        return "nenhum resultado"
+    if isinstance(resultado, (pd.DataFrame, pd.Series)):
+        return "DataFrame vazio" if resultado.empty else None
+    if isinstance(resultado, dict) and 'dataframe' in resultado:
+        return _com_dados(resultado['dataframe'])
+    if isinstance(resultado, (list, tuple, dict)) and not resultado:
+        return "resultado vazio"
+    return None
+
+def caso(nome, verificar=_com_dados):
+    def registrar(funcao):
+        CASOS[nome] = funcao
+        VERIFICACOES[nome] = verificar
+        return funcao
+    return registrar
+
+def _pcp_como_na_tela(df=None):
+    """
+    listar_pcp(tipado=True) (ou df, já lido assim) com as colunas derivadas que
+    pcp/pag_principal.py monta antes de chamar relatorio_tabela e personalizar_tabela.
+    """
+    from banco_dados.banco import listar_pcp
+
+    df = listar_pcp.sem_cache(tipado=True) if df is None else df
+    df = df.dropna(subset=['pcp_entrega'])
+    df['pcp_ano'] = df['pcp_entrega'].dt.year.astype(int)
+    df['pcp_sem'] = df['pcp_entrega'].dt.isocalendar().week.astype(int)
+    return df
+
+@caso('listar_pcp')
+def _caso_listar_pcp(contexto):
+    from banco_dados.banco import listar_pcp
+    return lambda: listar_pcp.sem_cache(tipado=True)
+
+@caso('relatorio_tabela')
+def _caso_relatorio_tabela(contexto):
+    from calculos import relatorio_tabela
+    df = _pcp_como_na_tela()
+    return lambda: relatorio_tabela(df)
+
+@caso('relatorio_planejamento')
+def _caso_relatorio_planejamento(contexto):
+    from calculos import relatorio_planejamento
+    return lambda: relatorio_planejamento(semana=contexto['semana'], comparacao_semana='==')
+
+@caso('personalizar_tabela', verificar=lambda resultado: _com_dados(resultado[0].data))
+def _caso_personalizar_tabela(contexto):
+    from pcp.tabela_principal import personalizar_tabela
+    df = _pcp_como_na_tela()
+    return lambda: personalizar_tabela(df, None, None, None)
+
+def _planejamento_com_blocos(resultado):
+    import dash_bootstrap_components as dbc
+
+    # Em caso de erro, planejamento devolve um alerta no lugar dos blocos por dia
+    if isinstance(resultado, dbc.Alert):
+        return f"alerta: {resultado.children}"
+    return None if isinstance(resultado, dbc.Container) else f"retorno inesperado ({type(resultado).__name__})"
+
+@caso('planejamento', verificar=_planejamento_com_blocos)
+def _caso_planejamento(contexto):
+    from pcp.planejamento import planejamento
+    return lambda: planejamento(semana=contexto['semana'], comparacao_semana='==')
+
+@caso('calculate_oee_metrics')
+def _caso_oee(contexto):
+    from dashboards.dashboard_oee import calculate_oee_metrics
+    fim = contexto['data_final']
+    return lambda: calculate_oee_metrics.sem_cache(fim - timedelta(days=30), fim, None, None)
+
+def _dre_com_clientes(resultado):
+    if not any(resultado[bloco]['by_client'] for bloco in ('pedidos_firmados', 'estoque_pedidos')):
+        return "nenhum cliente nas entradas"
+    return None
+
+@caso('get_dre_entradas_data', verificar=_dre_com_clientes)
+def _caso_dre(contexto):
+    from dashboards.dashboard_dre import get_dre_entradas_data
+    return lambda: get_dre_entradas_data('competencia')
+
+@caso('calcular_aderencia_programacao')
+def _caso_aderencia(contexto):
+    from dashboards.dashboard_pcp import calcular_aderencia_programacao
+    return calcular_aderencia_programacao.sem_cache
+
+
+# Medição ================================================
+def _limpar_caches():
+    from banco_dados.banco import invalidar_cache
+    from banco_dados.cache import cache_consultas
+    cache_consultas.limpar()
+    invalidar_cache()
+
+def medir(funcao, repeticoes=5, aquecimento=1):
+    """
+    Executa funcao com os caches limpos: aquecimento + repeticoes cronometradas,
+    e mais uma execução sob tracemalloc para o pico de memória.
+    """
+    comandos = []
+
+    def _contar(conn, cursor, statement, parameters, context, executemany):
+        comandos.append(statement)
+
+    for _ in range(aquecimento):
+        _limpar_caches()
+        funcao()
+
+    tempos = []
+    event.listen(Engine, 'before_cursor_execute', _contar)
+    try:
+        for _ in range(repeticoes):
+            _limpar_caches()
+            comandos.clear()
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', _contar)
+
+    _limpar_caches()
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'mediana_ms': statistics.median(tempos),
+        'minimo_ms': min(tempos),
+        'maximo_ms': max(tempos),
+        'pico_mb': pico / 1024 / 1024,
+        'consultas': len(comandos),
+    }
+
+def contexto_banco():
+    """
+    Datas de referência do banco atual: o dia da última baixa faz o papel de
+    "hoje" dos dados gerados.
+    """
+    from sqlalchemy import text
+    from banco_dados.banco import engine
+
+    with engine.connect() as conn:
+        pedidos = conn.execute(text("SELECT COUNT(*) FROM pcp")).scalar()
+        ultima = conn.execute(text("SELECT MAX(data) FROM baixa")).scalar()
+    data_final = date.fromisoformat(str(ultima)[:10]) if ultima else date.today()
+    return {'pedidos': pedidos, 'data_final': data_final, 'semana': data_final.isocalendar()[1]}
+
+def executar_casos(nomes, repeticoes, aquecimento):
+    """
+    Roda os casos no banco configurado neste processo. Retorna {caso: medidas}.
+    """
+    if str(RAIZ_PROJETO) not in sys.path:
+        sys.path.insert(0, str(RAIZ_PROJETO))
+
+    contexto = contexto_banco()
+    resultados = {}
+    for nome in nomes:
+        try:
+            funcao = CASOS[nome](contexto)
+            # A execução de verificação também serve de aquecimento
+            _limpar_caches()
+            problema = VERIFICACOES[nome](funcao())
+            if problema:
+                raise ValueError(f"resultado inválido ({problema}); a função provavelmente falhou internamente")
+            resultados[nome] = medir(funcao, repeticoes, max(aquecimento - 1, 0))
+        except Exception as e:
+            resultados[nome] = {'erro': f"{type(e).__name__}: {e}"}
+    return contexto['pedidos'], resultados
+
+
+# Bancos por escala ======================================
+def arquivo_banco(pedidos, semente, data_final):
+    return PASTA_DADOS / f"bd_{pedidos}_s{semente}_{data_final.isoformat()}.sqlite"
+
+def _banco_pronto(caminho):
+    if not caminho.exists():
+        return False
+    try:
+        conexao = sqlite3.connect(caminho)
+        try:
+            # Bancos gerados antes de baixa.ajuste entrar no modelo são refeitos
+            colunas_baixa = {linha[1] for linha in conexao.execute("PRAGMA table_info(baixa)")}
+            return 'ajuste' in colunas_baixa and conexao.execute("SELECT COUNT(*) FROM pcp").fetchone()[0] > 0
+        finally:
+            conexao.close()
+    except sqlite3.Error:
+        return False
+
+def garantir_banco(pedidos, semente, data_final):
+    """
+    Gera (se ainda não existir) o banco sintético da escala e devolve o caminho.
+    """
+    caminho = arquivo_banco(pedidos, semente, data_final)
+    if _banco_pronto(caminho):
+        return caminho
+    PASTA_DADOS.mkdir(parents=True, exist_ok=True)
+    print(f"Gerando banco com {pedidos} pedidos em {caminho} ...")
+    subprocess.run(
+        [sys.executable, '-m', 'banco_dados.gerador_dados', '--banco', str(caminho), '--pedidos', str(pedidos),
+         '--semente', str(semente), '--data-final', data_final.isoformat(), '--limpar'],
+        cwd=RAIZ_PROJETO, check=True, stdout=subprocess.DEVNULL
+    )
+    return caminho
+
+def executar_escala(caminho, nomes, repeticoes, aquecimento):
+    """
+    Roda os casos em um subprocesso apontado para o banco da escala (a engine
+    é criada na importação, então cada banco precisa de um processo novo).
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        saida = Path(pasta) / 'resultado.json'
+        ambiente = dict(os.environ, PCP_BD_ARQUIVO=str(caminho), PCP_SNAPSHOT_INTERVALO='0',
+                        PCP_LOG_CONSULTAS_LENTAS=str(Path(pasta) / 'consultas_lentas.log'))
+        processo = subprocess.run(
+            [sys.executable, '-m', 'desempenho.benchmarks', '--banco', str(caminho), '--saida', str(saida),
+             '--casos', ','.join(nomes), '--repeticoes', str(repeticoes), '--aquecimento', str(aquecimento)],
+            cwd=RAIZ_PROJETO, env=ambiente, capture_output=True, text=True
+        )
+        if processo.returncode != 0 or not saida.exists():
+            print(processo.stdout[-2000:])
+            print(processo.stderr[-2000:], file=sys.stderr)
+            raise RuntimeError(f"Falha ao executar os benchmarks em {caminho}")
+        # O subprocesso grava {pedidos: {caso: medidas}} com uma única escala
+        return next(iter(json.loads(saida.read_text(encoding='utf-8'))['resultados'].values()))
+
+
+# Relatórios =============================================
+def _variacao(atual, base):
+    return (atual - base) / base if base else 0.0
+
+def comparar(resultados, base, tolerancia):
+    """
+    Compara os resultados com uma base salva. Retorna uma lista de linhas
+    (escala, caso, medidas atuais, medidas da base, situação).
+    """
+    linhas = []
+    for escala, casos in resultados.items():
+        casos_base = base['resultados'].get(escala, {})
+        for nome, medidas in casos.items():
+            anterior = casos_base.get(nome)
+            if 'erro' in medidas:
+                situacao = 'ERRO'
+            elif not anterior or 'erro' in anterior:
+                situacao = 'NOVO'
+            else:
+                dif_ms = medidas['mediana_ms'] - anterior['mediana_ms']
+                dif_mb = medidas['pico_mb'] - anterior['pico_mb']
+                mais_lento = dif_ms > MINIMO_MS and _variacao(medidas['mediana_ms'], anterior['mediana_ms']) > tolerancia
+                mais_memoria = dif_mb > MINIMO_MB and _variacao(medidas['pico_mb'], anterior['pico_mb']) > tolerancia
+                mais_rapido = -dif_ms > MINIMO_MS and _variacao(medidas['mediana_ms'], anterior['mediana_ms']) < -tolerancia
+                if mais_lento or mais_memoria:
+                    situacao = 'REGRESSAO'
+                elif mais_rapido:
+                    situacao = 'MELHORA'
+                else:
+                    situacao = 'OK'
+            linhas.append((escala, nome, medidas, anterior, situacao))
+    return linhas
+
+def imprimir_resultados(resultados):
+    for escala, casos in resultados.items():
+        print(f"\nEscala: {escala} pedidos")
+        print(f"  {'caso':<32}{'mediana ms':>12}{'mín ms':>10}{'máx ms':>10}{'pico MB':>10}{'SQL':>6}")
+        for nome, medidas in casos.items():
+            if 'erro' in medidas:
+                print(f"  {nome:<32}  ERRO: {medidas['erro'][:100]}")
+                continue
+            print(f"  {nome:<32}{medidas['mediana_ms']:>12.1f}{medidas['minimo_ms']:>10.1f}"
+                  f"{medidas['maximo_ms']:>10.1f}{medidas['pico_mb']:>10.1f}{medidas['consultas']:>6}")
+
+def imprimir_comparacao(linhas, nome_base, tolerancia):
+    print(f"\nComparação com a base '{nome_base}' (tolerância {tolerancia:.0%})")
+    print(f"  {'escala':>8} {'caso':<32}{'base ms':>10}{'atual ms':>10}{'var':>8}{'base MB':>9}{'atual MB':>9}{'var':>8}  situação")
+    for escala, nome, medidas, anterior, situacao in linhas:
+        if situacao in ('ERRO', 'NOVO'):
+            print(f"  {escala:>8} {nome:<32}{'':>62}  {situacao}")
+            continue
+        print(f"  {escala:>8} {nome:<32}{anterior['mediana_ms']:>10.1f}{medidas['mediana_ms']:>10.1f}"
+              f"{_variacao(medidas['mediana_ms'], anterior['mediana_ms']):>+8.0%}"
+              f"{anterior['pico_mb']:>9.1f}{medidas['pico_mb']:>9.1f}"
+              f"{_variacao(medidas['pico_mb'], anterior['pico_mb']):>+8.0%}  {situacao}")
+
+
+# Linha de comando =======================================
+def _lista(texto):
+    return [item.strip() for item in texto.split(',') if item.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks das funções de dados do PCP")
+    parser.add_argument('--escalas', type=_lista, default=['1000', '10000'], help="Quantidades de pedidos, separadas por vírgula")
+    parser.add_argument('--casos', type=_lista, default=list(CASOS), help="Casos a executar, separados por vírgula")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--aquecimento', type=int, default=1)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--data-final', type=date.fromisoformat, default=None, help="Data final dos dados gerados (padrão hoje)")
+    parser.add_argument('--banco', help="Rodar neste processo sobre um banco existente, sem gerar escalas")
+    parser.add_argument('--saida', help="Gravar os resultados em JSON neste arquivo")
+    parser.add_argument('--salvar-base', metavar='NOME', help="Salvar os resultados em desempenho/bases/NOME.json")
+    parser.add_argument('--comparar', metavar='NOME', help="Comparar com desempenho/bases/NOME.json")
+    parser.add_argument('--tolerancia', type=float, default=0.25, help="Variação relativa aceita (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    desconhecidos = set(args.casos) - set(CASOS)
+    if desconhecidos:
+        parser.error(f"casos desconhecidos: {', '.join(sorted(desconhecidos))} (disponíveis: {', '.join(CASOS)})")
+
+    data_final = args.data_final or date.today()
+    if args.banco:
+        # O caminho precisa estar definido antes de banco_dados.banco criar a engine
+        os.environ['PCP_BD_ARQUIVO'] = args.banco
+        pedidos, casos = executar_casos(args.casos, args.repeticoes, args.aquecimento)
+        resultados = {str(pedidos): casos}
+    else:
+        resultados = {}
+        for escala in args.escalas:
+            caminho = garantir_banco(int(escala), args.semente, data_final)
+            print(f"Executando {len(args.casos)} casos com {escala} pedidos ...")
+            resultados[escala] = executar_escala(caminho, args.casos, args.repeticoes, args.aquecimento)
+
+    relatorio = {
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'maquina': platform.node(),
+        'python': platform.python_version(),
+        'semente': args.semente,
+        'data_final': data_final.isoformat(),
+        'repeticoes': args.repeticoes,
+        'resultados': resultados,
+    }
+    if args.saida:
+        Path(args.saida).write_text(json.dumps(relatorio, indent=2), encoding='utf-8')
+    if args.banco and args.saida:
+        return 0
+
+    imprimir_resultados(resultados)
+
+    codigo = 0
+    if args.comparar:
+        arquivo = PASTA_BASES / f"{args.comparar}.json"
+        if not arquivo.exists():
+            print(f"Base não encontrada: {arquivo}")
+            return 2
+        base = json.loads(arquivo.read_text(encoding='utf-8'))
+        linhas = comparar(resultados, base, args.tolerancia)
+        imprimir_comparacao(linhas, args.comparar, args.tolerancia)
+        if base.get('maquina') != relatorio['maquina']:
+            print(f"  Atenção: base gravada em outra máquina ({base.get('maquina')}).")
+        regressoes = [linha for linha in linhas if linha[4] in ('REGRESSAO', 'ERRO')]
+        print("FALHOU" if regressoes else "OK")
+        codigo = 1 if regressoes else 0
+
+    if args.salvar_base:
+        PASTA_BASES.mkdir(parents=True, exist_ok=True)
+        arquivo = PASTA_BASES / f"{args.salvar_base}.json"
+        arquivo.write_text(json.dumps(relatorio, indent=2), encoding='utf-8')
+        print(f"\nBase salva em {arquivo}")
+    return codigo
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,566 @@
+"""
+Teste de carga dos callbacks do Dash com usuários virtuais.
+
+Sobe o index.py (ou usa um servidor já rodando, --url) e executa sessões
+roteirizadas que imitam o uso na fábrica e no escritório: filtros da tabela do
+PCP, apontamento de parada no OEE, lista de compras e atualização dos painéis.
+Cada usuário virtual faz o papel do navegador: carrega o layout, guarda as
+propriedades dos componentes e chama /_dash-update-component para os
+callbacks disparados por cada ação (inclusive os encadeados e os iniciais de
+cada página), como o renderer do Dash faria.
+
+O relatório traz, por callback, quantidade de chamadas, percentis de
+latência e taxa de erro (HTTP 500 ou falha de conexão).
+
+Uso (a partir da raiz do projeto):
+    python -m desempenho.carga --usuarios 10 --duracao 60
+    python -m desempenho.carga --pedidos 100000 --usuarios 20 --mix pcp_filtros=3,oee_apontamento=5
+    python -m desempenho.carga --url http://127.0.0.1:8052 --usuarios 5
+
+Sem --url, o servidor roda sobre uma cópia de um banco sintético
+(desempenho/dados/, o mesmo dos benchmarks) ou de --banco: as sessões gravam
+apontamentos, então o banco de produção nunca é usado. Retorna código de
+saída 1 se a taxa de erro passar de --limite-erros.
+"""
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import argparse
+import copy
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+# Limite de ondas de callbacks encadeados disparadas por uma única ação
+MAX_ONDAS = 10
+
+
+# Sessões roteirizadas ===================================
+# Cada passo é (ação, argumentos...). Valores podem ser funções do usuário
+# virtual, avaliadas na hora (opções carregadas pela própria página, datas do banco).
+def opcao(id_componente, indice=0):
+    """
+    Valor da opção de índice `indice` de um dropdown, como carregada pela página.
+    """
+    def escolher(usuario):
+        opcoes = usuario.prop(id_componente, 'options') or []
+        if not opcoes:
+            return None
+        item = opcoes[min(indice, len(opcoes) - 1)]
+        return item.get('value') if isinstance(item, dict) else item
+    return escolher
+
+def contexto(chave):
+    return lambda usuario: usuario.contexto[chave]
+
+SESSOES = {
+    # Escritório: tabela completa do PCP com os filtros mais usados
+    'pcp_filtros': [
+        ('abrir', '/pcp'),
+        ('definir', 'status_produto', 'value', ['PENDENTE']),
+        ('definir', 'select_comparacao_semana', 'value', '>='),
+        ('definir', 'select_semana', 'value', contexto('semana')),
+        ('definir', 'procurar_produto', 'value', 'CAIXA'),
+        ('definir', 'procurar_produto', 'value', ''),
+        ('definir', 'select_semana', 'value', None),
+        ('definir', 'status_produto', 'value', ['PARCIAL', 'PENDENTE']),
+    ],
+    # Chão de fábrica: escolher máquina e dia, selecionar o slot e apontar uma parada
+    'oee_apontamento': [
+        ('abrir', '/oee'),
+        ('definir', 'dropdown-setor-filter', 'value', opcao('dropdown-setor-filter', 1)),
+        ('definir', 'dropdown-maquina-filter', 'value', opcao('dropdown-maquina-filter')),
+        ('definir', 'date-picker-filter', 'date', contexto('dia_producao')),
+        ('definir', 'production-table', 'selected_rows', [0]),
+        ('clicar', 'btn-add-parada'),
+        ('definir', 'parada-nivel1', 'value', opcao('parada-nivel1')),
+        ('definir', 'parada-tempo', 'value', 10),
+        ('clicar', 'btn-salvar-parada'),
+    ],
+    # Escritório: lista de ordens de compra
+    'compras_lista': [
+        ('abrir', '/compras'),
+        ('clicar', 'btn-filtrar'),
+        ('clicar', 'btn-limpar'),
+    ],
+    # Painéis abertos e atualizados ao longo do dia
+    'paineis': [
+        ('abrir', '/dashboard-oee'),
+        ('abrir', '/dashpcp'),
+        ('definir', 'usar-semana-anterior', 'value', True),
+        ('abrir', '/demonstrativo'),
+        ('definir', 'dre-view-selector', 'value', 'fluxo_caixa'),
+        ('clicar', 'refresh-dre-data'),
+        ('abrir', '/dashoeegeral'),
+    ],
+}
+
+MIX_PADRAO = {'pcp_filtros': 3, 'oee_apontamento': 4, 'compras_lista': 1, 'paineis': 2}
+
+
+# Dependências e layout ==================================
+def chave_id(id_componente):
+    """
+    Chave de um componente em UsuarioVirtual.props: o próprio id, ou o JSON
+    com chaves ordenadas para ids em dicionário (como o Dash os serializa).
+    """
+    if isinstance(id_componente, dict):
+        return json.dumps(id_componente, sort_keys=True, separators=(',', ':'))
+    return id_componente
+
+def _dependencia(id_texto, propriedade):
+    """
+    (id, propriedade, padrão): padrão é o dicionário do id quando ele usa ALL.
+    """
+    if id_texto.startswith('{'):
+        padrao = json.loads(id_texto)
+        return id_texto, propriedade, padrao
+    return id_texto, propriedade, None
+
+def _curinga(valor):
+    return isinstance(valor, list) and len(valor) == 1 and valor[0] in ('ALL', 'MATCH', 'ALLSMALLER')
+
+def _casa(padrao, id_componente):
+    if not isinstance(id_componente, dict) or set(padrao) != set(id_componente):
+        return False
+    return all(_curinga(valor) or id_componente[chave] == valor for chave, valor in padrao.items())
+
+def carregar_callbacks(dependencias):
+    """
+    Converte /_dash-dependencies na lista de callbacks atendidos pelo servidor.
+    Callbacks do lado do cliente e os que usam MATCH/ALLSMALLER (dependem do
+    item que disparou) são ignorados; ALL é suportado.
+    """
+    callbacks = []
+    for dep in dependencias:
+        saida = dep['output']
+        if dep.get('clientside_function') or '"MATCH"' in saida or '"ALLSMALLER"' in saida:
+            continue
+        itens = dep['inputs'] + dep['state']
+        if any('"MATCH"' in item['id'] or '"ALLSMALLER"' in item['id'] for item in itens):
+            continue
+        multipla = saida.startswith('..')
+        textos = saida[2:-2].split('...') if multipla else [saida]
+        saidas = [_dependencia(*texto.rsplit('.', 1)) for texto in textos]
+        primeira = f"{saidas[0][0]}.{saidas[0][1].split('@')[0]}"
+        callbacks.append({
+            'output': saida,
+            'multipla': multipla,
+            'saidas': saidas,
+            'entradas': [_dependencia(i['id'], i['property']) for i in dep['inputs']],
+            'estados': [_dependencia(i['id'], i['property']) for i in dep['state']],
+            'inicial': not dep.get('prevent_initial_call'),
+            'nome': primeira if len(saidas) == 1 else f"{primeira} (+{len(saidas) - 1})",
+        })
+    return callbacks
+
+def componentes(arvore, encontrados=None):
+    """
+    {chave do id: props} de todos os componentes com id em uma árvore de layout serializada.
+    """
+    if encontrados is None:
+        encontrados = {}
+    if isinstance(arvore, list):
+        for item in arvore:
+            componentes(item, encontrados)
+    elif isinstance(arvore, dict):
+        props = arvore.get('props')
+        if isinstance(props, dict) and 'type' in arvore:
+            if isinstance(props.get('id'), (str, dict)):
+                encontrados[chave_id(props['id'])] = props
+            for valor in props.values():
+                if isinstance(valor, (dict, list)):
+                    componentes(valor, encontrados)
+    return encontrados
+
+
+# Métricas ===============================================
+def percentil(ordenados, p):
+    if not ordenados:
+        return 0.0
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = {}
+        self.erros = {}
+        self.exemplos_erro = {}
+        self.sessoes = {}
+
+    def registrar(self, nome, ms, erro=None):
+        with self._lock:
+            self.latencias.setdefault(nome, []).append(ms)
+            if erro:
+                self.erros[nome] = self.erros.get(nome, 0) + 1
+                self.exemplos_erro.setdefault(nome, erro)
+
+    def registrar_sessao(self, nome, ms):
+        with self._lock:
+            self.sessoes.setdefault(nome, []).append(ms)
+
+    def resumo(self):
+        linhas = []
+        for nome, valores in self.latencias.items():
+            ordenados = sorted(valores)
+            linhas.append({
+                'callback': nome,
+                'chamadas': len(valores),
+                'erros': self.erros.get(nome, 0),
+                'taxa_erro': self.erros.get(nome, 0) / len(valores),
+                'p50_ms': percentil(ordenados, 50),
+                'p90_ms': percentil(ordenados, 90),
+                'p95_ms': percentil(ordenados, 95),
+                'p99_ms': percentil(ordenados, 99),
+                'max_ms': ordenados[-1],
+                'total_ms': sum(ordenados),
+                'exemplo_erro': self.exemplos_erro.get(nome),
+            })
+        return sorted(linhas, key=lambda linha: linha['total_ms'], reverse=True)
+
+
+# Usuário virtual ========================================
+class UsuarioVirtual:
+    """
+    Faz o papel do renderer do Dash para uma aba do navegador.
+    """
+    def __init__(self, url, callbacks, layout, contexto, metricas, semente, pausa):
+        self.url = url.rstrip('/')
+        self.callbacks = callbacks
+        self.contexto = contexto
+        self.metricas = metricas
+        self.rng = random.Random(semente)
+        self.pausa = pausa
+        self.props = copy.deepcopy(componentes(layout))
+        self._por_entrada = {}
+        self._por_padrao = []
+        for callback in callbacks:
+            for id_componente, propriedade, padrao in callback['entradas']:
+                if padrao is None:
+                    self._por_entrada.setdefault((id_componente, propriedade), []).append(callback)
+                else:
+                    self._por_padrao.append((padrao, propriedade, callback))
+
+    def prop(self, id_componente, propriedade):
+        return self.props.get(id_componente, {}).get(propriedade)
+
+    def _correspondentes(self, padrao):
+        return [(chave, props['id']) for chave, props in self.props.items() if _casa(padrao, props.get('id'))]
+
+    def _presente(self, callback):
+        """
+        O navegador só chama o callback se as entradas simples estão na página
+        e, quando todas são ALL, se ao menos um componente corresponde.
+        """
+        simples = [i for i, _, padrao in callback['entradas'] if padrao is None]
+        if simples:
+            return all(i in self.props for i in simples)
+        return any(self._correspondentes(padrao) for _, _, padrao in callback['entradas'])
+
+    def _callbacks_disparados(self, chave, propriedade):
+        disparados = list(self._por_entrada.get((chave, propriedade), ()))
+        id_componente = self.props.get(chave, {}).get('id')
+        if isinstance(id_componente, dict):
+            disparados += [cb for padrao, prop, cb in self._por_padrao if prop == propriedade and _casa(padrao, id_componente)]
+        return disparados
+
+    def _post(self, payload):
+        corpo = json.dumps(payload).encode('utf-8')
+        requisicao = urllib.request.Request(f"{self.url}/_dash-update-component", data=corpo,
+                                            headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(requisicao, timeout=120) as resposta:
+                conteudo = resposta.read()
+                return resposta.status, conteudo, None
+        except urllib.error.HTTPError as e:
+            return e.code, b'', f"HTTP {e.code}"
+        except (urllib.error.URLError, OSError) as e:
+            return None, b'', str(e)
+
+    def _chamar(self, callback, disparos):
+        def valor(item):
+            id_componente, propriedade, padrao = item
+            if padrao is None:
+                return {'id': id_componente, 'property': propriedade, 'value': self.prop(id_componente, propriedade)}
+            return [{'id': id_real, 'property': propriedade, 'value': self.prop(chave, propriedade)}
+                    for chave, id_real in self._correspondentes(padrao)]
+
+        def saida(item):
+            id_componente, propriedade, padrao = item
+            if padrao is None:
+                return {'id': id_componente, 'property': propriedade}
+            return [{'id': id_real, 'property': propriedade} for _, id_real in self._correspondentes(padrao)]
+
+        saidas = [saida(item) for item in callback['saidas']]
+        payload = {
+            'output': callback['output'],
+            'outputs': saidas if callback['multipla'] else saidas[0],
+            'inputs': [valor(e) for e in callback['entradas']],
+            'state': [valor(s) for s in callback['estados']],
+            'changedPropIds': [f"{chave}.{propriedade}" for chave, propriedade in disparos],
+        }
+        inicio = time.perf_counter()
+        status, conteudo, erro = self._post(payload)
+        self.metricas.registrar(callback['nome'], (time.perf_counter() - inicio) * 1000, erro)
+        if status != 200 or not conteudo:
+            return {}  # 204: PreventUpdate
+        try:
+            return json.loads(conteudo).get('response', {})
+        except ValueError:
+            return {}
+
+    def disparar(self, alterados=(), novos_ids=()):
+        """
+        Dispara os callbacks afetados pelas propriedades alteradas e os iniciais
+        dos componentes recém-inseridos, seguindo a cadeia em ondas.
+        """
+        alterados, novos_ids = set(alterados), set(novos_ids)
+        for _ in range(MAX_ONDAS):
+            fila = {}
+            for chave, propriedade in alterados:
+                for callback in self._callbacks_disparados(chave, propriedade):
+                    fila.setdefault(callback['output'], (callback, set()))[1].add((chave, propriedade))
+            if novos_ids:
+                novos_padroes = [self.props[c]['id'] for c in novos_ids if isinstance(self.props.get(c, {}).get('id'), dict)]
+                for callback in self.callbacks:
+                    if callback['inicial'] and any(
+                            i in novos_ids if padrao is None else any(_casa(padrao, n) for n in novos_padroes)
+                            for i, _, padrao in callback['entradas']):
+                        fila.setdefault(callback['output'], (callback, set()))
+            alterados, novos_ids = set(), set()
+            for callback, disparos in fila.values():
+                if not self._presente(callback):
+                    continue
+                for chave, valores in self._chamar(callback, disparos).items():
+                    for propriedade, novo in valores.items():
+                        componente = self.props.setdefault(chave, {})
+                        # Componentes da árvore substituída saem da página
+                        for removido in componentes(componente.get(propriedade)):
+                            self.props.pop(removido, None)
+                        componente[propriedade] = novo
+                        alterados.add((chave, propriedade))
+                        inseridos = componentes(novo)
+                        self.props.update(inseridos)
+                        novos_ids.update(inseridos)
+            if not alterados and not novos_ids:
+                break
+
+    def carregar_pagina(self):
+        self.disparar(novos_ids=list(self.props))
+
+    def executar_passo(self, passo):
+        acao, *argumentos = passo
+        if acao == 'abrir':
+            self.props.setdefault('url', {})['pathname'] = argumentos[0]
+            self.disparar(alterados=[('url', 'pathname')])
+        elif acao == 'definir':
+            id_componente, propriedade, valor = argumentos
+            if callable(valor):
+                valor = valor(self)
+            self.props.setdefault(id_componente, {})[propriedade] = valor
+            self.disparar(alterados=[(id_componente, propriedade)])
+        elif acao == 'clicar':
+            componente = self.props.setdefault(argumentos[0], {})
+            componente['n_clicks'] = (componente.get('n_clicks') or 0) + 1
+            self.disparar(alterados=[(argumentos[0], 'n_clicks')])
+        else:
+            raise ValueError(f"Ação desconhecida na sessão: {acao}")
+
+    def executar_sessao(self, nome):
+        inicio = time.perf_counter()
+        for passo in SESSOES[nome]:
+            self.executar_passo(passo)
+            if self.pausa:
+                time.sleep(self.rng.expovariate(1 / self.pausa))
+        self.metricas.registrar_sessao(nome, (time.perf_counter() - inicio) * 1000)
+
+
+def _laco_usuario(indice, args, url, callbacks, layout, contexto_dados, metricas, fim):
+    usuario = UsuarioVirtual(url, callbacks, layout, contexto_dados, metricas, args.semente + indice, args.pausa)
+    usuario.carregar_pagina()
+    nomes = list(args.mix)
+    pesos = [args.mix[nome] for nome in nomes]
+    while time.monotonic() < fim:
+        usuario.executar_sessao(usuario.rng.choices(nomes, pesos)[0])
+
+
+# Servidor e banco =======================================
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _obter_json(url, tentativas=1, intervalo=0.5):
+    for tentativa in range(tentativas):
+        try:
+            with urllib.request.urlopen(url, timeout=30) as resposta:
+                return json.loads(resposta.read())
+        except (urllib.error.URLError, OSError):
+            if tentativa == tentativas - 1:
+                raise
+            time.sleep(intervalo)
+
+def copiar_banco(origem, destino):
+    """
+    Cópia consistente pela API de backup: as sessões gravam no banco de teste.
+    """
+    conexao_origem = sqlite3.connect(origem)
+    conexao_destino = sqlite3.connect(destino)
+    try:
+        conexao_origem.backup(conexao_destino)
+    finally:
+        conexao_destino.close()
+        conexao_origem.close()
+
+def contexto_banco(caminho):
+    """
+    Semana e dia de produção mais recentes do banco, usados pelas sessões.
+    """
+    conexao = sqlite3.connect(caminho)
+    try:
+        dia = conexao.execute("SELECT MAX(pr_data) FROM producao WHERE pr_data <= date('now')").fetchone()[0]
+    finally:
+        conexao.close()
+    dia = date.fromisoformat(str(dia)[:10]) if dia else date.today() - timedelta(days=1)
+    return {'dia_producao': dia.isoformat(), 'semana': dia.isocalendar()[1]}
+
+def iniciar_servidor(banco, porta, pasta):
+    """
+    Sobe index.py em um subprocesso apontado para o banco de teste.
+    """
+    ambiente = dict(os.environ, PCP_BD_ARQUIVO=str(banco), PCP_SNAPSHOT_INTERVALO='0',
+                    PCP_LOG_CONSULTAS_LENTAS=str(Path(pasta) / 'consultas_lentas.log'))
+    log = open(Path(pasta) / 'servidor.log', 'w')
+    processo = subprocess.Popen(
+        [sys.executable, '-c',
+         f"import index; index.app.run(host='127.0.0.1', port={porta}, debug=False, threaded=True)"],
+        cwd=RAIZ_PROJETO, env=ambiente, stdout=log, stderr=subprocess.STDOUT
+    )
+    return processo, log
+
+
+# Relatório ==============================================
+def imprimir_relatorio(linhas, metricas, duracao, usuarios):
+    total = sum(linha['chamadas'] for linha in linhas)
+    erros = sum(linha['erros'] for linha in linhas)
+    print(f"\n{usuarios} usuários, {duracao:.0f} s: {total} chamadas ({total / duracao:.1f}/s), "
+          f"{erros} erros ({(erros / total if total else 0):.2%})")
+    print(f"\n  {'callback':<52}{'n':>6}{'erro%':>7}{'p50':>8}{'p90':>8}{'p95':>8}{'p99':>8}{'máx':>8}")
+    for linha in linhas:
+        print(f"  {linha['callback'][:51]:<52}{linha['chamadas']:>6}{linha['taxa_erro']:>7.1%}"
+              f"{linha['p50_ms']:>8.0f}{linha['p90_ms']:>8.0f}{linha['p95_ms']:>8.0f}"
+              f"{linha['p99_ms']:>8.0f}{linha['max_ms']:>8.0f}")
+    print(f"\n  {'sessão':<30}{'n':>6}{'p50 s':>9}{'p95 s':>9}")
+    for nome, valores in metricas.sessoes.items():
+        ordenados = sorted(valores)
+        print(f"  {nome:<30}{len(valores):>6}{percentil(ordenados, 50) / 1000:>9.1f}{percentil(ordenados, 95) / 1000:>9.1f}")
+    for linha in linhas:
+        if linha['exemplo_erro']:
+            print(f"  Erro em {linha['callback']}: {linha['exemplo_erro']}")
+
+
+# Linha de comando =======================================
+def _mix(texto):
+    mix = {}
+    for item in texto.split(','):
+        nome, _, peso = item.partition('=')
+        nome = nome.strip()
+        if nome not in SESSOES:
+            raise argparse.ArgumentTypeError(f"sessão desconhecida: {nome} (disponíveis: {', '.join(SESSOES)})")
+        mix[nome] = float(peso or 1)
+    return mix
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga dos callbacks do Dash")
+    parser.add_argument('--usuarios', type=int, default=10, help="Usuários virtuais simultâneos")
+    parser.add_argument('--duracao', type=float, default=60, help="Segundos de carga")
+    parser.add_argument('--pausa', type=float, default=1.0, help="Pausa média entre ações de um usuário (s)")
+    parser.add_argument('--mix', type=_mix, default=MIX_PADRAO, help="Pesos das sessões, ex.: pcp_filtros=3,paineis=1")
+    parser.add_argument('--url', help="Servidor já em execução (não sobe o index.py)")
+    parser.add_argument('--banco', help="Banco a copiar para o teste (padrão: banco sintético de --pedidos)")
+    parser.add_argument('--pedidos', type=int, default=10000, help="Escala do banco sintético")
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--limite-erros', type=float, default=0.01, help="Taxa de erro máxima aceita")
+    parser.add_argument('--saida', help="Gravar o resumo em JSON neste arquivo")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        processo = log = None
+        if args.url:
+            url = args.url
+            contexto_dados = {'dia_producao': (date.today() - timedelta(days=1)).isoformat(),
+                              'semana': date.today().isocalendar()[1]}
+        else:
+            if args.banco:
+                origem = Path(args.banco)
+            else:
+                from desempenho.benchmarks import garantir_banco
+                origem = garantir_banco(args.pedidos, args.semente, date.today())
+            banco = Path(pasta) / 'bd_carga.sqlite'
+            copiar_banco(origem, banco)
+            contexto_dados = contexto_banco(banco)
+            porta = _porta_livre()
+            url = f"http://127.0.0.1:{porta}"
+            print(f"Iniciando index.py em {url} sobre uma cópia de {origem} ...")
+            processo, log = iniciar_servidor(banco, porta, pasta)
+
+        try:
+            dependencias = _obter_json(f"{url}/_dash-dependencies", tentativas=240)
+            layout = _obter_json(f"{url}/_dash-layout")
+            callbacks = carregar_callbacks(dependencias)
+
+            print(f"{len(callbacks)} callbacks; {args.usuarios} usuários por {args.duracao:.0f} s ...")
+            metricas = Metricas()
+            inicio = time.monotonic()
+            fim = inicio + args.duracao
+            threads = [
+                threading.Thread(target=_laco_usuario, name=f"usuario-{i}", daemon=True,
+                                 args=(i, args, url, callbacks, layout, contexto_dados, metricas, fim))
+                for i in range(args.usuarios)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            duracao = time.monotonic() - inicio
+        except Exception:
+            if log is not None:
+                log.flush()
+                print((Path(pasta) / 'servidor.log').read_text(errors='replace')[-3000:])
+            raise
+        finally:
+            if processo is not None:
+                processo.terminate()
+                processo.wait(timeout=30)
+                log.close()
+
+        linhas = metricas.resumo()
+        imprimir_relatorio(linhas, metricas, duracao, args.usuarios)
+
+    total = sum(linha['chamadas'] for linha in linhas)
+    taxa_erro = sum(linha['erros'] for linha in linhas) / total if total else 1.0
+    if args.saida:
+        Path(args.saida).write_text(json.dumps({
+            'criado_em': datetime.now().isoformat(timespec='seconds'),
+            'usuarios': args.usuarios, 'duracao_s': duracao, 'mix': args.mix,
+            'taxa_erro': taxa_erro, 'callbacks': linhas,
+        }, indent=2), encoding='utf-8')
+
+    ok = taxa_erro <= args.limite_erros
+    print("OK" if ok else f"FALHOU: taxa de erro {taxa_erro:.2%} acima de {args.limite_erros:.2%}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,465 @@
+"""
+Comparação entre as implementações antigas (linha a linha) das funções de
+dados e as atuais, sobre um banco sintético.
+
+Cada comparação roda a versão de referência, guardada aqui exatamente como
+era, e a versão atual com a mesma entrada; o resultado precisa ser idêntico
+(pandas.testing) e os tempos são medidos com benchmarks.medir.
+
+Uso (a partir da raiz do projeto):
+    python -m desempenho.equivalencia
+    python -m desempenho.equivalencia --pedidos 10000 --comparacoes relatorio_tabela
+    python -m desempenho.equivalencia --banco /tmp/bd_10k.sqlite
+
+Retorna código de saída 1 se alguma saída divergir.
+"""
+from datetime import date
+from pathlib import Path
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+
+# Comparações ============================================
+# Cada comparação recebe o contexto do banco e devolve (referencia, atual):
+# duas funções sem argumentos que devem produzir o mesmo resultado.
+COMPARACOES = {}
+
+def comparacao(nome):
+    def registrar(funcao):
+        COMPARACOES[nome] = funcao
+        return funcao
+    return registrar
+
+
+# Referências ============================================
+def _soma_qtd_baixa(pcp_pcp):
+    from sqlalchemy import func
+    from sqlalchemy.orm import Session
+    from banco_dados.banco import BAIXA, engine
+    with Session(engine) as session:
+        soma_qtd = session.query(func.sum(BAIXA.qtd)).filter(BAIXA.pcp_id == pcp_pcp).scalar()
+        return soma_qtd or 0
+
+def _soma_qtd_retirada(pcp_id):
+    from sqlalchemy import func
+    from sqlalchemy.orm import Session
+    from banco_dados.banco import RETIRADA, engine
+    with Session(engine) as session:
+        soma_qtd = session.query(func.sum(RETIRADA.ret_qtd)).filter(RETIRADA.ret_id_pcp == pcp_id).scalar()
+        return soma_qtd or 0
+
+def _formatar_numero(val):
+    # calculos.formatar_numero como era antes de formatacao.py
+    if val is not None:
+        return '{:,.0f}'.format(val).replace(',', '.')
+    return val
+
+def _referencia_relatorio_tabela(df, status=None, semana=None):
+    """
+    calculos.relatorio_tabela antes da agregação por pcp_saldo: duas consultas
+    SUM por pedido, status e formatação com apply.
+    """
+    import pandas as pd
+    from banco_dados.banco import Banco
+
+    banco = Banco()
+    df_produtos = banco.ler_tabela("produtos")
+    df_filtrado = df.copy()
+    df_filtrado = df_filtrado.merge(df_produtos[['produto_id', 'nome', 'pedido_mensal', 'fluxo_producao']],
+                                    left_on='pcp_produto_id', right_on='produto_id', how='left')
+
+    df_filtrado['pcp_entrega'] = pd.to_datetime(df_filtrado['pcp_entrega'], format='%Y-%m-%d', errors='coerce')
+    df_filtrado['pcp_emissao'] = pd.to_datetime(df_filtrado['pcp_emissao'], format='%Y-%m-%d', errors='coerce')
+    df_filtrado['pcp_primiera_entrega'] = pd.to_datetime(df_filtrado['pcp_primiera_entrega'], format='%Y-%m-%d', errors='coerce')
+    df_filtrado['pcp_semana'] = df_filtrado['pcp_entrega'].dt.isocalendar().week
+    df_filtrado['pcp_semana_primeira'] = df_filtrado['pcp_primiera_entrega'].dt.isocalendar().week
+
+    if semana:
+        df_filtrado = df_filtrado[df_filtrado['pcp_semana'] == semana]
+
+    df_filtrado['qtd_baixa'] = df_filtrado['pcp_id'].apply(_soma_qtd_baixa)
+    df_filtrado['qtd_retirada'] = df_filtrado['pcp_id'].apply(_soma_qtd_retirada)
+
+    def calcular_status(row):
+        if row['qtd_baixa'] == 0:
+            return 'PENDENTE'
+        elif row['qtd_baixa'] > 0 and row['qtd_baixa'] < 0.9 * row['pcp_qtd']:
+            return 'PARCIAL'
+        elif row['qtd_baixa'] >= 0.9 * row['pcp_qtd']:
+            return 'FEITO'
+        else:
+            return 'PENDENTE'
+
+    df_filtrado['status_baixa'] = df_filtrado.apply(calcular_status, axis=1)
+
+    if status:
+        df_filtrado = df_filtrado[df_filtrado['status_baixa'].isin(status)]
+
+    df_filtrado['saldo_em_processo'] = (df_filtrado['pcp_qtd'] - df_filtrado['qtd_baixa']).clip(lower=0)
+    df_filtrado['saldo_em_estoque'] = (df_filtrado['qtd_baixa'] - df_filtrado['qtd_retirada']).clip(lower=0)
+
+    df_filtrado['saldo_em_estoque'] = df_filtrado['saldo_em_estoque'].apply(_formatar_numero)
+    df_filtrado['pcp_qtd'] = df_filtrado['pcp_qtd'].apply(_formatar_numero)
+    df_filtrado['saldo_em_processo'] = df_filtrado['saldo_em_processo'].apply(_formatar_numero)
+    df_filtrado['qtd_retirada'] = df_filtrado['qtd_retirada'].apply(_formatar_numero)
+
+    df_filtrado['pcp_entrega_formatada'] = df_filtrado['pcp_entrega'].apply(lambda x: x.strftime('%d/%m/%Y') if pd.notnull(x) else '')
+    df_filtrado['pcp_emissao_formatada'] = df_filtrado['pcp_emissao'].apply(lambda x: x.strftime('%d/%m/%Y') if pd.notnull(x) else '')
+    df_filtrado['pcp_primiera_entrega'] = df_filtrado['pcp_primiera_entrega'].apply(lambda x: x.strftime('%d/%m/%Y') if pd.notnull(x) else '')
+    df_filtrado = df_filtrado.sort_values(by='pcp_entrega', ascending=True)
+    return df_filtrado
+
+@comparacao('relatorio_tabela')
+def _comparacao_relatorio_tabela(contexto):
+    from calculos import relatorio_tabela
+    from desempenho.benchmarks import _pcp_como_na_tela
+
+    df = _pcp_como_na_tela()
+    return (lambda: _referencia_relatorio_tabela(df), lambda: relatorio_tabela(df))
+
+@comparacao('relatorio_tabela_status_semana')
+def _comparacao_relatorio_tabela_filtrado(contexto):
+    from calculos import relatorio_tabela
+    from desempenho.benchmarks import _pcp_como_na_tela
+
+    df = _pcp_como_na_tela()
+    filtros = (['PENDENTE', 'PARCIAL'], contexto['semana'])
+    return (lambda: _referencia_relatorio_tabela(df, *filtros), lambda: relatorio_tabela(df, *filtros))
+
+def _referencia_relatorio_planejamento(semana=None, comparacao_semana='==', ano_iso=False):
+    """
+    calculos.relatorio_planejamento com o laço por programação, que filtra todas
+    as baixas a cada linha. O original compara a semana ISO com o ano civil;
+    ano_iso=True usa o ano ISO, como a versão atual (só muda na virada do ano).
+    """
+    import pandas as pd
+    from banco_dados.banco import Banco, listar_pcp
+    from calculos import Filtros
+
+    banco = Banco()
+    df_plan = banco.ler_tabela('planejamento', tipado=True)
+    df_pcp_full = listar_pcp(tipado=True)
+    df_baixas = banco.ler_tabela('baixa', colunas=['pcp_id', 'qtd', 'data'], tipado=True)
+    if df_plan.empty or df_pcp_full.empty:
+        return pd.DataFrame()
+
+    df_merged = pd.merge(df_plan, df_pcp_full, left_on='id_pcp', right_on='pcp_id', how='left')
+    df_merged = df_merged.dropna(subset=['data_programacao'])
+    df_merged['semana_prog'] = df_merged['data_programacao'].dt.isocalendar().week.astype('Int64')
+    if semana is not None and comparacao_semana:
+        df_merged = Filtros.filtrar(df_merged, {'semana_prog': ('comparar_num', (comparacao_semana, semana))})
+
+    if not df_baixas.empty:
+        df_merged['Qtd Feita'] = 0
+        for idx, row in df_merged.iterrows():
+            data_prog = row['data_programacao']
+            if ano_iso:
+                mesmo_ano = df_baixas['data'].dt.isocalendar().year == data_prog.isocalendar()[0]
+            else:
+                mesmo_ano = df_baixas['data'].dt.year == data_prog.year
+            baixas_pcp = df_baixas[
+                (df_baixas['pcp_id'] == row['pcp_id']) &
+                (df_baixas['data'].dt.isocalendar().week == data_prog.isocalendar().week) &
+                mesmo_ano
+            ]
+            df_merged.at[idx, 'Qtd Feita'] = baixas_pcp['qtd'].sum()
+
+    df_final = df_merged[['data_programacao', 'pcp_pcp', 'pcp_categoria', 'cliente_nome', 'produto_nome',
+                          'quantidade', 'Qtd Feita', 'etiqueta', 'observacao']].copy()
+    df_final.rename(columns={
+        'data_programacao': 'Data Programação', 'pcp_pcp': 'PCP OS', 'pcp_categoria': 'Categoria',
+        'cliente_nome': 'Cliente', 'produto_nome': 'Produto', 'quantidade': 'Qtd Planejada',
+        'etiqueta': 'Etiqueta', 'observacao': 'Observação'
+    }, inplace=True)
+    df_final = df_final.sort_values(['Data Programação', 'Cliente'])
+    df_final['Data Programação'] = df_final['Data Programação'].dt.strftime('%d/%m/%Y')
+    return df_final
+
+@comparacao('relatorio_planejamento_semana')
+def _comparacao_relatorio_planejamento_semana(contexto):
+    from calculos import relatorio_planejamento
+
+    # Semanas 1, 52 e 53 podem cruzar a virada do ano, onde o original usava o ano civil
+    semana = contexto['semana'] if 1 < contexto['semana'] < 52 else 26
+    return (lambda: _referencia_relatorio_planejamento(semana, '=='),
+            lambda: relatorio_planejamento(semana, '=='))
+
+@comparacao('relatorio_planejamento')
+def _comparacao_relatorio_planejamento(contexto):
+    from calculos import relatorio_planejamento
+
+    return (lambda: _referencia_relatorio_planejamento(None, ano_iso=True),
+            lambda: relatorio_planejamento(None))
+
+
+def _referencia_filtrar(df, filtros):
+    """
+    Filtros.filtrar original: copia o DataFrame e refiltra uma vez por critério,
+    com query(engine='python') nas comparações numéricas.
+    """
+    import pandas as pd
+
+    df_filtrado = df.copy()
+
+    for coluna, filtro in filtros.items():
+        if coluna in df_filtrado.columns and filtro is not None:
+            tipo, valor = filtro
+
+            # Ignora filtros com valor None ou string vazia (exceto para 'contem')
+            if valor is None or (isinstance(valor, (str, list)) and not valor):
+                # Allow empty string for 'contem' if needed, otherwise skip
+                if tipo != 'contem' or valor is None:
+                   continue
+
+            try: # Add error handling for robustness
+                if tipo == 'contem' and isinstance(valor, str):
+                    df_filtrado = df_filtrado[df_filtrado[coluna].astype(str).str.contains(valor, case=False, na=False)]
+
+                elif tipo == 'multi' and isinstance(valor, list):
+                    # No need for is not valor check here, already handled above
+                    df_filtrado = df_filtrado[df_filtrado[coluna].isin(valor)]
+
+                # --- New Filter Type: 'comparar_num' ---
+                elif tipo == 'comparar_num' and isinstance(valor, tuple) and len(valor) == 2:
+                    operador, num_valor = valor
+                    allowed_ops = ['==', '>=', '<=', '>', '<']
+                    if operador not in allowed_ops:
+                        print(f"Warning: Operador de comparação inválido '{operador}' para a coluna '{coluna}'. Pulando filtro.")
+                        continue
+
+                    if num_valor is None or str(num_valor).strip() == '':
+                         print(f"Warning: Valor numérico inválido para comparação na coluna '{coluna}'. Pulando filtro.")
+                         continue
+
+                    # Convert column and value to numeric, handling errors
+                    df_filtrado[coluna] = pd.to_numeric(df_filtrado[coluna], errors='coerce')
+                    num_valor_numeric = pd.to_numeric(num_valor, errors='coerce')
+
+                    if pd.isna(num_valor_numeric):
+                        print(f"Warning: Não foi possível converter '{num_valor}' para número na coluna '{coluna}'. Pulando filtro.")
+                        continue
+
+                    # Drop rows where column conversion failed before querying
+                    df_filtrado = df_filtrado.dropna(subset=[coluna])
+
+                    # Use query for dynamic comparison
+                    # Note: Ensure column names don't have spaces or special chars for query
+                    safe_coluna = f"`{coluna}`" # Backticks for safety if col name has spaces/special chars
+                    query_str = f"{safe_coluna} {operador} @num_valor_numeric"
+                    df_filtrado = df_filtrado.query(query_str, engine='python')
+                # --- End New Filter Type ---
+
+                else:  # Filtro exato (padrão)
+                    # Attempt conversion for comparison if types might differ, e.g., int vs str
+                    try:
+                        col_type = df_filtrado[coluna].dtype
+                        if pd.api.types.is_numeric_dtype(col_type):
+                            valor_convertido = pd.to_numeric(valor, errors='ignore')
+                        elif pd.api.types.is_string_dtype(col_type):
+                            valor_convertido = str(valor)
+                        else:
+                            valor_convertido = valor # Use original value if type is unknown/mixed
+
+                        df_filtrado = df_filtrado[df_filtrado[coluna] == valor_convertido]
+                    except Exception as e_conv:
+                        print(f"Warning: Erro na comparação exata para coluna '{coluna}' com valor '{valor}': {e_conv}. Usando comparação direta.")
+                        df_filtrado = df_filtrado[df_filtrado[coluna] == valor] # Fallback
+
+            except Exception as e:
+                print(f"Erro ao aplicar filtro na coluna '{coluna}' com tipo '{tipo}' e valor '{valor}': {e}")
+                # Decide whether to continue or stop based on the error
+                continue # Example: Skip this filter and continue with others
+
+    return df_filtrado
+
+@comparacao('filtrar')
+def _comparacao_filtrar(contexto):
+    from calculos import Filtros
+    from desempenho.benchmarks import _pcp_como_na_tela
+
+    df = _pcp_como_na_tela()
+    # Valores frequentes do próprio banco, como em atualizar_cards
+    produto = str(df['produto_nome'].mode().iat[0])
+    filtros = {
+        'cliente_nome': ('exato', df['cliente_nome'].mode().iat[0]),
+        'produto_nome': ('contem', produto[len(produto) // 3:][:4].upper()),
+        'pcp_categoria': ('multi', list(df['pcp_categoria'].value_counts().index[:3])),
+        'pcp_sem': ('comparar_num', ('>=', contexto['semana'] // 2)),
+        'pcp_oc': ('contem', ''),
+    }
+    return (lambda: _referencia_filtrar(df, filtros), lambda: Filtros.filtrar(df, filtros))
+
+
+def _filtros_tela_pcp(df, contexto):
+    """
+    Especificações de filtro como as de atualizar_cards, com valores do banco.
+    """
+    import pandas as pd
+
+    produto = str(df['produto_nome'].mode().iat[0])
+    categorias = list(df['pcp_categoria'].value_counts().index)
+    return {
+        'cliente_semana': {
+            'cliente_nome': ('exato', df['cliente_nome'].mode().iat[0]),
+            'pcp_categoria': [('multi', categorias[:3]), ('contem', None)],
+            'pcp_sem': ('comparar_num', ('>=', contexto['semana'] // 2)),
+        },
+        'textos': {
+            'produto_nome': ('contem', produto[len(produto) // 3:][:4].upper()),
+            'pcp_pcp': ('contem', str(df['pcp_pcp'].dropna().astype(int).iat[0])[-2:]),
+            'pcp_categoria': ('contem', categorias[0][:3].lower()),
+            'pcp_oc': ('contem', ''),
+        },
+        # pcp_entrega não tem tradução: fica para o filtro em memória
+        'misto': {
+            'pcp_sem': ('comparar_num', ('<=', contexto['semana'])),
+            'pcp_entrega': ('exato', pd.Timestamp(df['pcp_entrega'].mode().iat[0])),
+            'pcp_categoria': ('multi', categorias[:1]),
+        },
+    }
+
+def _categorias_usadas(df):
+    # A leitura filtrada tipa só as linhas que casam, então as categorias saem do subconjunto
+    for coluna in df.select_dtypes('category'):
+        df[coluna] = df[coluna].cat.remove_unused_categories()
+    return df
+
+def _filtrar_em_memoria(filtros):
+    from banco_dados.banco import listar_pcp
+    from calculos import Filtros
+    from desempenho.benchmarks import _pcp_como_na_tela
+
+    return _categorias_usadas(Filtros.filtrar(_pcp_como_na_tela(listar_pcp(tipado=True)), filtros).reset_index(drop=True))
+
+def _filtrar_no_banco(filtros):
+    from banco_dados.banco import listar_pcp_filtrado
+    from calculos import Filtros
+    from desempenho.benchmarks import _pcp_como_na_tela
+
+    df, restantes = listar_pcp_filtrado(filtros, tipado=True)
+    return _categorias_usadas(Filtros.filtrar(_pcp_como_na_tela(df), restantes).reset_index(drop=True))
+
+def _registrar_comparacoes_pcp_filtrado():
+    for nome in ('cliente_semana', 'textos', 'misto'):
+        def preparar(contexto, nome=nome):
+            from banco_dados.banco import listar_pcp
+            filtros = _filtros_tela_pcp(listar_pcp(), contexto)[nome]
+            return (lambda: _filtrar_em_memoria(filtros), lambda: _filtrar_no_banco(filtros))
+        comparacao(f'listar_pcp_filtrado_{nome}')(preparar)
+
+_registrar_comparacoes_pcp_filtrado()
+
+
+# Execução ===============================================
+def _diferenca(esperado, obtido):
+    """
+    None se os resultados forem idênticos, senão a descrição da diferença.
+    """
+    import pandas as pd
+
+    try:
+        if isinstance(esperado, pd.DataFrame):
+            pd.testing.assert_frame_equal(esperado, obtido)
+        elif isinstance(esperado, pd.Series):
+            pd.testing.assert_series_equal(esperado, obtido)
+        elif esperado != obtido:
+            return f"{esperado!r} != {obtido!r}"
+    except AssertionError as e:
+        return ' '.join(str(e).split())[:500]
+    return None
+
+def executar_comparacoes(nomes, repeticoes):
+    """
+    Roda as comparações no banco configurado neste processo.
+    Retorna {comparacao: {referencia, atual, diferenca}}.
+    """
+    if str(RAIZ_PROJETO) not in sys.path:
+        sys.path.insert(0, str(RAIZ_PROJETO))
+    from desempenho.benchmarks import _limpar_caches, contexto_banco, medir
+
+    contexto = contexto_banco()
+    resultados = {}
+    for nome in nomes:
+        try:
+            referencia, atual = COMPARACOES[nome](contexto)
+            _limpar_caches()
+            esperado = referencia()
+            _limpar_caches()
+            obtido = atual()
+            resultados[nome] = {
+                'diferenca': _diferenca(esperado, obtido),
+                'linhas': len(esperado) if hasattr(esperado, '__len__') else None,
+                'referencia': medir(referencia, repeticoes, aquecimento=0),
+                'atual': medir(atual, repeticoes, aquecimento=1),
+            }
+        except Exception as e:
+            resultados[nome] = {'erro': f"{type(e).__name__}: {e}"}
+    return contexto['pedidos'], resultados
+
+
+# Linha de comando =======================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Equivalência e ganho das funções de dados reescritas")
+    parser.add_argument('--pedidos', type=int, default=2000, help="Escala do banco sintético")
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--banco', help="Usar um banco existente em vez do sintético")
+    parser.add_argument('--comparacoes', type=lambda t: [c.strip() for c in t.split(',') if c.strip()], default=list(COMPARACOES))
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--saida', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.saida:
+        # Subprocesso: o banco já está em PCP_BD_ARQUIVO
+        pedidos, resultados = executar_comparacoes(args.comparacoes, args.repeticoes)
+        Path(args.saida).write_text(json.dumps({'pedidos': pedidos, 'resultados': resultados}), encoding='utf-8')
+        return 0
+
+    if args.banco:
+        banco = Path(args.banco)
+    else:
+        from desempenho.benchmarks import garantir_banco
+        banco = garantir_banco(args.pedidos, args.semente, date.today())
+
+    # A engine é criada na importação: as comparações rodam em um processo apontado para o banco
+    with tempfile.TemporaryDirectory() as pasta:
+        saida = Path(pasta) / 'equivalencia.json'
+        ambiente = dict(os.environ, PCP_BD_ARQUIVO=str(banco), PCP_SNAPSHOT_INTERVALO='0',
+                        PCP_LOG_CONSULTAS_LENTAS=str(Path(pasta) / 'consultas_lentas.log'))
+        processo = subprocess.run(
+            [sys.executable, '-m', 'desempenho.equivalencia', '--saida', str(saida),
+             '--comparacoes', ','.join(args.comparacoes), '--repeticoes', str(args.repeticoes)],
+            cwd=RAIZ_PROJETO, env=ambiente, capture_output=True, text=True
+        )
+        if processo.returncode != 0 or not saida.exists():
+            print(processo.stdout[-2000:])
+            print(processo.stderr[-2000:], file=sys.stderr)
+            return 2
+        dados = json.loads(saida.read_text(encoding='utf-8'))
+
+    print(f"Banco {banco} ({dados['pedidos']} pedidos)")
+    print(f"  {'comparação':<34}{'linhas':>8}{'antes ms':>11}{'depois ms':>11}{'ganho':>8}{'SQL antes':>11}{'SQL depois':>12}  saída")
+    divergencias = 0
+    for nome, r in dados['resultados'].items():
+        if 'erro' in r:
+            print(f"  {nome:<34}  ERRO: {r['erro'][:100]}")
+            divergencias += 1
+            continue
+        antes, depois = r['referencia'], r['atual']
+        ganho = antes['mediana_ms'] / depois['mediana_ms'] if depois['mediana_ms'] else float('inf')
+        print(f"  {nome:<34}{r['linhas'] if r['linhas'] is not None else '-':>8}{antes['mediana_ms']:>11.1f}"
+              f"{depois['mediana_ms']:>11.1f}{ganho:>7.1f}x{antes['consultas']:>11}{depois['consultas']:>12}"
+              f"  {'idêntica' if r['diferenca'] is None else 'DIVERGENTE'}")
+        if r['diferenca'] is not None:
+            print(f"      {r['diferenca']}")
+            divergencias += 1
+    return 1 if divergencias else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+Verificação dos planos de execução (EXPLAIN QUERY PLAN) das consultas críticas.
+
+Cada caso executa a função real sobre um banco sintético (o mesmo dos
+benchmarks) registrando os SELECTs que ela emite, e roda EXPLAIN QUERY PLAN em
+cada um com os mesmos parâmetros. O caso falha quando uma tabela grande é
+lida por varredura completa (SCAN) sem estar entre as varreduras esperadas,
+ou quando uma tabela que deveria ser acessada por índice (SEARCH) não é.
+
+Uso (a partir da raiz do projeto):
+    python -m desempenho.planos_consulta
+    python -m desempenho.planos_consulta --pedidos 100000 --mostrar
+    python -m desempenho.planos_consulta --banco /tmp/bd_100k.sqlite
+
+Os índices vêm dos modelos (migrar_indices os recria na importação), então uma
+regressão aqui indica mudança no SQL ou em __table_args__.
+
+Retorna código de saída 1 se algum plano regredir.
+"""
+from datetime import date, timedelta
+from pathlib import Path
+import argparse
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+# Tabelas que crescem com a operação; as demais (cadastros) podem ser varridas
+TABELAS_GRANDES = {
+    'pcp', 'pcp_saldo', 'baixa', 'retirada', 'retirada_exp', 'planejamento', 'producao', 'apontamento',
+    'apontamento_produto', 'ordem_compra', 'cotacao', 'carregamento', 'inspecao_processo',
+    'apontamento_retrabalho', 'laudos', 'saida_notas', 'pedidos_em_aberto', 'agendamento_logistica',
+    'agendamento_historico', 'logs',
+}
+
+_padrao_tabela = re.compile(r'\b(?:FROM|JOIN)\s+["`\[]?(\w+)["`\]]?(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_padrao_plano = re.compile(r'^(SCAN|SEARCH)\s+(\w+)(.*)$')
+_nao_alias = {'LEFT', 'RIGHT', 'INNER', 'OUTER', 'CROSS', 'JOIN', 'ON', 'WHERE', 'GROUP', 'ORDER', 'LIMIT', 'USING',
+              'UNION', 'NATURAL', 'SELECT', 'AND', 'OR'}
+
+
+# Casos ==================================================
+# 'executar' recebe o contexto do banco e chama a função real.
+# 'busca': tabelas que devem ser lidas por índice (SEARCH).
+# 'varredura': tabelas grandes cuja leitura completa é esperada hoje.
+def _oee_metricas(contexto):
+    from dashboards.dashboard_oee import calculate_oee_metrics
+    fim = contexto['dia_producao']
+    calculate_oee_metrics.sem_cache(fim - timedelta(days=30), fim, contexto['setor_id'], contexto['maquina_id'])
+    calculate_oee_metrics.sem_cache(fim - timedelta(days=30), fim, None, None)
+
+def _tabela_producao(contexto):
+    from oee.pagina_oee import update_production_table
+    update_production_table(contexto['setor_id'], contexto['maquina_id'], contexto['dia_producao'].isoformat())
+
+def _ordens_compra(contexto):
+    _chamar_callback('container-tabelas-ordens')
+
+def _ordens_compra_status(contexto):
+    _chamar_callback('container-tabelas-ordens', {'filtro-status.value': ['Aguardando Recebimento']})
+
+def _entregas_pizza(contexto):
+    from modulo_pizza.Entregas_pizza import get_daily_delivery_data
+    get_daily_delivery_data()
+
+def _listar_pcp(contexto):
+    from banco_dados.banco import listar_pcp
+    listar_pcp.sem_cache()
+
+CASOS = {
+    'dashboard_oee.calculate_oee_metrics': {
+        'executar': _oee_metricas,
+        # As CTEs somam só os apontamentos das produções filtradas
+        'busca': {'producao', 'apontamento', 'apontamento_produto'},
+        'varredura': set(),
+    },
+    'pagina_oee.update_production_table': {
+        'executar': _tabela_producao,
+        'busca': {'producao', 'apontamento', 'apontamento_produto'},
+        'varredura': set(),
+    },
+    'compras.carregar_ordens_agrupadas': {
+        'executar': _ordens_compra,
+        'busca': set(),
+        # Sem filtros a lista traz todas as ordens; carregamento é agregado por ordem
+        'varredura': {'ordem_compra', 'carregamento'},
+    },
+    'compras.carregar_ordens_agrupadas (status)': {
+        'executar': _ordens_compra_status,
+        'busca': {'ordem_compra'},
+        'varredura': {'carregamento'},
+    },
+    'Entregas_pizza.get_daily_delivery_data': {
+        'executar': _entregas_pizza,
+        'busca': set(),
+        # Saldos e retiradas agregados por produto sobre todos os pedidos
+        'varredura': {'pcp', 'pcp_saldo', 'retirada_exp'},
+    },
+    'banco.listar_pcp': {
+        'executar': _listar_pcp,
+        'busca': {'clientes', 'produtos'},
+        'varredura': {'pcp'},
+    },
+}
+
+
+# Execução ===============================================
+def _chamar_callback(trecho_saida, valores=None):
+    """
+    Chama um callback pelo /_dash-update-component (cliente de teste do Flask),
+    para funções que dependem do callback_context. Entradas não informadas
+    vão como None; entradas ALL, como lista vazia.
+    """
+    from app import app
+    valores = valores or {}
+    cliente = app.server.test_client()
+    dependencias = cliente.get('/_dash-dependencies').get_json()
+    dep = next(d for d in dependencias if trecho_saida in d['output'])
+
+    def item(entrada):
+        if entrada['id'].startswith('{'):
+            return []
+        chave = f"{entrada['id']}.{entrada['property']}"
+        return {'id': entrada['id'], 'property': entrada['property'], 'value': valores.get(chave)}
+
+    saida = dep['output']
+    textos = saida[2:-2].split('...') if saida.startswith('..') else [saida]
+    saidas = [dict(zip(('id', 'property'), texto.rsplit('.', 1))) for texto in textos]
+    resposta = cliente.post('/_dash-update-component', json={
+        'output': saida,
+        'outputs': saidas if saida.startswith('..') else saidas[0],
+        'inputs': [item(e) for e in dep['inputs']],
+        'state': [item(s) for s in dep['state']],
+        'changedPropIds': [],
+    })
+    if resposta.status_code >= 500:
+        raise RuntimeError(f"Callback {trecho_saida} retornou HTTP {resposta.status_code}")
+
+def capturar_consultas(funcao, contexto):
+    """
+    Executa funcao(contexto) e devolve os SELECTs emitidos com seus parâmetros.
+    """
+    consultas = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            consultas.append((statement, parameters))
+
+    event.listen(Engine, 'before_cursor_execute', _registrar)
+    try:
+        funcao(contexto)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', _registrar)
+    return consultas
+
+def aliases(sql):
+    """
+    {alias ou nome: tabela} das tabelas citadas em FROM/JOIN.
+    """
+    mapa = {}
+    for tabela, alias in _padrao_tabela.findall(sql):
+        mapa[tabela] = tabela
+        if alias and alias.upper() not in _nao_alias:
+            mapa[alias] = tabela
+    return mapa
+
+def plano(conexao, sql, parametros):
+    return [linha[3] for linha in conexao.execute(f"EXPLAIN QUERY PLAN {sql}", parametros or ()).fetchall()]
+
+def avaliar(linhas_plano, sql, busca, varredura):
+    """
+    Lista de problemas do plano: varreduras inesperadas de tabelas grandes,
+    tabelas de 'busca' acessadas sem índice e índices automáticos (o SQLite
+    monta um quando falta o índice declarado) nessas tabelas.
+    """
+    mapa = aliases(sql)
+    problemas = []
+    for linha in linhas_plano:
+        encontrado = _padrao_plano.match(linha)
+        if not encontrado:
+            continue
+        operacao, nome, resto = encontrado.groups()
+        tabela = mapa.get(nome)
+        if tabela is None:
+            continue  # CTE/subconsulta materializada
+        if 'AUTOMATIC' in resto:
+            if tabela in busca or tabela in TABELAS_GRANDES:
+                problemas.append(f"índice automático em {tabela} (falta índice declarado): {linha}")
+        elif operacao == 'SCAN' and tabela in busca:
+            problemas.append(f"{tabela} deveria usar índice: {linha}")
+        elif operacao == 'SCAN' and tabela in TABELAS_GRANDES and tabela not in varredura:
+            problemas.append(f"varredura completa de {tabela}: {linha}")
+    return problemas
+
+def contexto_banco():
+    from sqlalchemy import text
+    from banco_dados.banco import engine
+
+    with engine.connect() as conn:
+        linha = conn.execute(text(
+            "SELECT pr_data, pr_setor_id, pr_maquina_id FROM producao ORDER BY pr_data DESC, pr_id DESC LIMIT 1"
+        )).first()
+    if linha is None:
+        return {'dia_producao': date.today(), 'setor_id': 1, 'maquina_id': 1}
+    return {'dia_producao': date.fromisoformat(str(linha[0])[:10]), 'setor_id': linha[1], 'maquina_id': linha[2]}
+
+def verificar(nomes, mostrar=False):
+    """
+    Roda os casos no banco configurado neste processo. Retorna {caso: problemas}.
+    """
+    if str(RAIZ_PROJETO) not in sys.path:
+        sys.path.insert(0, str(RAIZ_PROJETO))
+    import index  # registra os callbacks usados por _chamar_callback
+    from banco_dados.banco import engine
+
+    contexto = contexto_banco()
+    resultados = {}
+    conexao_crua = engine.raw_connection()
+    try:
+        conexao = conexao_crua.driver_connection
+        for nome in nomes:
+            caso = CASOS[nome]
+            problemas = []
+            try:
+                consultas = capturar_consultas(caso['executar'], contexto)
+            except Exception as e:
+                resultados[nome] = [f"erro ao executar: {type(e).__name__}: {e}"]
+                continue
+            if not consultas:
+                problemas.append("nenhuma consulta capturada")
+            for sql, parametros in consultas:
+                linhas = plano(conexao, sql, parametros)
+                if mostrar:
+                    print(f"\n[{nome}] {' '.join(sql.split())[:120]}")
+                    for linha in linhas:
+                        print(f"    {linha}")
+                problemas += avaliar(linhas, sql, caso['busca'], caso['varredura'])
+            resultados[nome] = problemas
+    finally:
+        conexao_crua.close()
+    return resultados
+
+
+# Linha de comando =======================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verificação dos planos das consultas críticas")
+    parser.add_argument('--pedidos', type=int, default=10000, help="Escala do banco sintético")
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--banco', help="Verificar um banco existente em vez do sintético")
+    parser.add_argument('--casos', type=lambda t: [c.strip() for c in t.split(',') if c.strip()], default=list(CASOS))
+    parser.add_argument('--mostrar', action='store_true', help="Imprimir os planos completos")
+    parser.add_argument('--saida', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.saida:
+        # Subprocesso: o banco já está em PCP_BD_ARQUIVO
+        resultados = verificar(args.casos, args.mostrar)
+        Path(args.saida).write_text(json.dumps(resultados), encoding='utf-8')
+        return 0
+
+    if args.banco:
+        banco = Path(args.banco)
+    else:
+        from desempenho.benchmarks import garantir_banco
+        banco = garantir_banco(args.pedidos, args.semente, date.today())
+
+    # A engine é criada na importação: a verificação roda em um processo apontado para o banco
+    import tempfile
+    with tempfile.TemporaryDirectory() as pasta:
+        saida = Path(pasta) / 'planos.json'
+        ambiente = dict(os.environ, PCP_BD_ARQUIVO=str(banco), PCP_SNAPSHOT_INTERVALO='0',
+                        PCP_LOG_CONSULTAS_LENTAS=str(Path(pasta) / 'consultas_lentas.log'))
+        comando = [sys.executable, '-m', 'desempenho.planos_consulta', '--saida', str(saida), '--casos', ','.join(args.casos)]
+        if args.mostrar:
+            comando.append('--mostrar')
+        processo = subprocess.run(comando, cwd=RAIZ_PROJETO, env=ambiente, capture_output=True, text=True)
+        if processo.returncode != 0 or not saida.exists():
+            print(processo.stdout[-2000:])
+            print(processo.stderr[-2000:], file=sys.stderr)
+            return 2
+        if args.mostrar:
+            print(processo.stdout)
+        resultados = json.loads(saida.read_text(encoding='utf-8'))
+
+    print(f"Planos verificados em {banco}")
+    falhas = 0
+    for nome, problemas in resultados.items():
+        print(f"  {'OK    ' if not problemas else 'FALHOU'} {nome}")
+        for problema in problemas:
+            print(f"         {problema}")
+        falhas += bool(problemas)
+    print("OK" if not falhas else f"FALHOU: {falhas} caso(s) com regressão de plano")
+    return 1 if falhas else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Mede o tempo de importação de um módulo do sistema e quais comandos SQL ele
+executa durante a importação.
+
+O orçamento vale para o código do sistema: as bibliotecas de terceiros que o
+módulo usa (dash, pandas, plotly...) são descobertas em um subprocesso e
+importadas antes da medição, com o tempo delas informado à parte
+(--incluir-dependencias soma as duas coisas no orçamento).
+
+Uso (a partir da raiz do projeto):
+    python -m desempenho.tempo_importacao
+    python -m desempenho.tempo_importacao --modulo index --orcamento 5
+
+Retorna código de saída 1 se o tempo passar do orçamento ou se a importação
+ler alguma tabela de dados (SELECT fora do catálogo do SQLite).
+"""
+import argparse
+import importlib
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+# Tabelas que podem ser lidas na inicialização sem contar como leitura de dados
+TABELAS_PERMITIDAS = {'sqlite_master', 'sqlite_temp_master', 'sqlite_schema', 'users'}
+
+_padrao_from = re.compile(r'\bFROM\s+["`]?(\w+)', re.IGNORECASE)
+
+
+def dependencias_externas(modulo):
+    """
+    Módulos de fora do projeto carregados ao importar o módulo, listados por
+    um subprocesso (a importação do próprio módulo não é reaproveitada).
+    """
+    codigo = (
+        "import importlib, sys; from pathlib import Path\n"
+        f"raiz = Path({str(RAIZ_PROJETO)!r})\n"
+        f"importlib.import_module({modulo!r})\n"
+        "for nome, mod in list(sys.modules.items()):\n"
+        "    arquivo = getattr(mod, '__file__', None)\n"
+        "    if arquivo and raiz not in Path(arquivo).resolve().parents:\n"
+        "        print('MODULO', nome)\n"
+    )
+    processo = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ_PROJETO, capture_output=True, text=True)
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao listar as dependências de {modulo}: {processo.stderr[-2000:]}")
+    return [linha.split(' ', 1)[1] for linha in processo.stdout.splitlines() if linha.startswith('MODULO ')]
+
+
+def importar_dependencias(nomes):
+    """
+    Importa os módulos de terceiros. Retorna os segundos gastos.
+    """
+    inicio = time.perf_counter()
+    for nome in nomes:
+        try:
+            importlib.import_module(nome)
+        except Exception:
+            pass  # submódulos que só carregam pelo pacote pai ou em outro contexto
+    return time.perf_counter() - inicio
+
+
+def medir_importacao(modulo):
+    """
+    Importa o módulo registrando cada comando SQL executado.
+    Retorna (segundos, lista de comandos).
+    """
+    comandos = []
+
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        comandos.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', _registrar)
+    try:
+        inicio = time.perf_counter()
+        importlib.import_module(modulo)
+        duracao = time.perf_counter() - inicio
+    finally:
+        event.remove(Engine, 'before_cursor_execute', _registrar)
+    return duracao, comandos
+
+
+def leituras_de_dados(comandos):
+    """
+    Filtra os SELECTs que leem tabelas de dados (ignora PRAGMAs e catálogo).
+    """
+    leituras = []
+    for comando in comandos:
+        texto = comando.strip()
+        if not texto.upper().startswith(('SELECT', 'WITH')):
+            continue
+        tabelas = set(_padrao_from.findall(texto))
+        if tabelas - TABELAS_PERMITIDAS:
+            leituras.append(texto)
+    return leituras
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Orçamento de tempo de importação")
+    parser.add_argument('--modulo', default='banco_dados.banco')
+    parser.add_argument('--orcamento', type=float, default=1.5, help="Tempo máximo em segundos")
+    parser.add_argument('--incluir-dependencias', action='store_true',
+                        help="Medir também a importação das bibliotecas de terceiros")
+    args = parser.parse_args(argv)
+
+    if str(RAIZ_PROJETO) not in sys.path:
+        sys.path.insert(0, str(RAIZ_PROJETO))
+
+    tempo_dependencias = None
+    if not args.incluir_dependencias:
+        tempo_dependencias = importar_dependencias(dependencias_externas(args.modulo))
+    duracao, comandos = medir_importacao(args.modulo)
+    leituras = leituras_de_dados(comandos)
+
+    print(f"Módulo: {args.modulo}")
+    if tempo_dependencias is not None:
+        print(f"Bibliotecas de terceiros: {tempo_dependencias:.3f}s (fora do orçamento)")
+    print(f"Tempo de importação: {duracao:.3f}s (orçamento {args.orcamento:.3f}s)")
+    print(f"Comandos SQL executados: {len(comandos)}")
+    for leitura in leituras:
+        print(f"  LEITURA DE DADOS: {' '.join(leitura.split())[:150]}")
+
+    ok = duracao <= args.orcamento and not leituras
+    print("OK" if ok else "FALHOU")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Formatação pt-BR para tabelas e exportações: números com ponto de milhar e
+vírgula decimal, moeda (R$) e datas dd/mm/aaaa.
+
+As funções no plural recebem uma Series inteira e formatam cada valor distinto
+uma só vez; as no singular formatam um valor avulso (células do
+openpyxl, textos de cards). Em todas, `vazio` é o texto para valores
+ausentes (None/NaN/''); com vazio=None o valor original é mantido. Valores
+não numéricos são devolvidos como vieram.
+
+Para DataTable, coluna_numerica mantém os dados numéricos e deixa a
+formatação para o navegador, o que preserva a ordenação e os filtros.
+"""
+from dash.dash_table.Format import Format, Group, Scheme, Symbol
+import numpy as np
+import pandas as pd
+
+
+# Séries =================================================
+def formatar_numeros(serie, casas=0, vazio=None, prefixo=''):
+    """
+    1234567.891 -> '1.234.568' (casas=0) ou '1.234.567,89' (casas=2).
+    """
+    serie = pd.Series(serie)
+    valores = pd.to_numeric(serie, errors='coerce')
+    numericos = valores.notna().to_numpy()
+    texto = serie.astype(object).copy()
+
+    if numericos.any():
+        # Colunas de quantidade repetem muito: formata cada valor distinto uma vez
+        numeros = valores[numericos]
+        codigos, unicos = pd.factorize(numeros)
+        base = unicos if len(unicos) <= len(numeros) // 2 else numeros
+        formato = f'{{:,.{casas}f}}'.format
+        if casas:
+            textos = [prefixo + formato(v).replace(',', '_').replace('.', ',').replace('_', '.') for v in base.tolist()]
+        else:
+            textos = [prefixo + formato(v).replace(',', '.') for v in base.tolist()]
+        textos = np.array(textos, dtype=object)
+        texto[numericos] = textos[codigos] if base is unicos else textos
+
+    if vazio is not None:
+        texto[(serie.isna() | serie.astype(object).eq('')).to_numpy()] = vazio
+    return texto
+
+def formatar_moedas(serie, casas=2, vazio=''):
+    """
+    1234.5 -> 'R$ 1.234,50'.
+    """
+    return formatar_numeros(serie, casas=casas, vazio=vazio, prefixo='R$ ')
+
+def formatar_datas(serie, formato='%d/%m/%Y', vazio=''):
+    """
+    Datas (datetime64 ou texto ISO) no formato informado; inválidas viram vazio.
+    """
+    datas = pd.to_datetime(pd.Series(serie), errors='coerce')
+    return datas.dt.strftime(formato).astype(object).where(datas.notna(), vazio)
+
+
+# Valores avulsos ========================================
+def _ausente(valor):
+    return valor is None or valor is pd.NA or valor is pd.NaT or valor == '' or (isinstance(valor, float) and np.isnan(valor))
+
+def formatar_numero(valor, casas=0, vazio=None, prefixo=''):
+    if _ausente(valor):
+        return valor if vazio is None else vazio
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return valor
+    return prefixo + f"{numero:,.{casas}f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+def formatar_moeda(valor, casas=2, vazio=''):
+    return formatar_numero(valor, casas=casas, vazio=vazio, prefixo='R$ ')
+
+def formatar_data(valor, formato='%d/%m/%Y', vazio=''):
+    data = pd.to_datetime(valor, errors='coerce')
+    return vazio if pd.isna(data) else data.strftime(formato)
+
+
+# DataTable ==============================================
+def formato_numerico(casas=0, moeda=False):
+    """
+    Format do dash_table em pt-BR para colunas type='numeric'.
+    """
+    formato = Format(precision=casas, scheme=Scheme.fixed, group=Group.yes, group_delimiter='.', decimal_delimiter=',')
+    if moeda:
+        formato = formato.symbol(Symbol.yes).symbol_prefix('R$ ')
+    return formato
+
+def coluna_numerica(nome, id_coluna, casas=0, moeda=False, **extras):
+    """
+    Coluna de DataTable que mantém o valor numérico e formata no navegador.
+    """
+    return {'name': nome, 'id': id_coluna, 'type': 'numeric', 'format': formato_numerico(casas, moeda), **extras}
@@ -2,9 +2,8 @@ import dash
 from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc
 import pandas as pd
-from banco_dados.banco import df_pcp, df_baixas, df_clientes, Banco
 import time
-from banco_dados.banco import authenticate_user
+from banco_dados.banco import authenticate_user, verificar_pragmas
 from compras.pages import page_principal_compras
 from login import login
 from app import *
@@ -26,6 +25,9 @@ from modulo_pizza.Entregas_pizza import layout_dashboard as pizza_layout
 from dashboards import dashboard_dre, dashboard_oee_geral, dashboard_quali
 from dashboards.dashboard_produtos import layout as dashboard_produtos_layout
 from dashboards.carregamento import layout as carregamento_layout
+from dashboards.desempenho_consultas import layout as desempenho_consultas_layout
+from dashboards import indicador_snapshot
+from banco_dados.snapshot import iniciar_snapshot
 
 #ESTRUTURA DE STORE INTERMEDIARIO==============
 data_int = {
@@ -97,9 +99,7 @@ store_int = pd.DataFrame(data_int)
 pote_int = pd.DataFrame(data_pote)
 baixa_int = pd.DataFrame(data_baixa)
 retirada_int = pd.DataFrame(data_retirada)
-banco = Banco()
 
-df_retirada = banco.ler_tabela('retirada')
 app.title = "PCP"
 app._favicon = "producao.png"
 
@@ -115,10 +115,12 @@ app.layout = dbc.Container(children=[
     dcc.Store(id='store_int_retirada', data=retirada_int.to_dict()),
     
     #TABELAS SESSION
-    dcc.Store(id='store_pcp', data=df_pcp.to_dict(), storage_type='session'),
-    dcc.Store(id='store_cliente', data=df_clientes.to_dict(), storage_type='session'),
-    dcc.Store(id='store_baixa', data=df_baixas.to_dict(), storage_type='session'),
-    dcc.Store(id='store_retirada', data=df_retirada.to_dict(), storage_type='session'),
+    # Começam vazias: os callbacks que usam estes stores recarregam os dados do banco,
+    # então nada é lido das tabelas ao montar o layout.
+    dcc.Store(id='store_pcp', data={}, storage_type='session'),
+    dcc.Store(id='store_cliente', data={}, storage_type='session'),
+    dcc.Store(id='store_baixa', data={}, storage_type='session'),
+    dcc.Store(id='store_retirada', data={}, storage_type='session'),
     
     
     dcc.Store(id="login-state", data=""),
@@ -131,7 +133,7 @@ app.layout = dbc.Container(children=[
 
         dbc.Row([
             dbc.Col([sidebar.layout], id='sidebar-col', md=2, style={'padding': '0px', 'transition': 'width 0.5s'}),
-            dbc.Col([dbc.Container(id="page-content", fluid=True)], id='content-col', md=10, style={'padding': '0px'}),
+            dbc.Col([indicador_snapshot.layout, dbc.Container(id="page-content", fluid=True)], id='content-col', md=10, style={'padding': '0px'}),
         ])
     ], style={"display": "none"}),  # Inicialmente escondido, é atualizado no callback
 ], fluid=True)
@@ -271,6 +273,9 @@ def render_page_content(pathname):
     elif pathname == "/agendamentologistica":
         return carregamento_layout
 
+    elif pathname == "/desempenhoconsultas":
+        return desempenho_consultas_layout
+
     return dbc.Container(
         [
             html.H1("404: Not Found", className="text-danger"),
@@ -283,6 +288,12 @@ def render_page_content(pathname):
 
 if __name__ == '__main__':
 
+    # Pragmas efetivos do perfil SQLite, uma vez por inicialização
+    verificar_pragmas()
+
+    # Cópia de leitura para os painéis (só se PCP_SNAPSHOT_INTERVALO > 0)
+    iniciar_snapshot()
+
     while True:
         try:
             # app.run(debug=True)
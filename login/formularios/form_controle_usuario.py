@@ -1,8 +1,7 @@
 from dash import html, dcc, Input, Output, State, callback_context
 import dash_bootstrap_components as dbc
 from app import app
-from sqlalchemy.orm import sessionmaker
-from banco_dados.banco import engine, User
+from banco_dados.banco import SessionLocal, User
 import json
 
 
@@ -76,8 +75,7 @@ layout = dbc.Modal([
 def load_users_options(is_open):
     if not is_open:
         return []
-    SessionFactory = sessionmaker(bind=engine)
-    session = SessionFactory()
+    session = SessionLocal()
     try:
         users = session.query(User).order_by(User.username.asc()).all()
         return [{"label": u.username, "value": u.id} for u in users]
@@ -112,8 +110,7 @@ def toggle_modal(open_clicks, close_clicks, is_open):
 def load_user(n_clicks, user_id):
     if not user_id:
         return "", "", []
-    SessionFactory = sessionmaker(bind=engine)
-    session = SessionFactory()
+    session = SessionLocal()
     try:
         u = session.query(User).get(user_id)
         if not u:
@@ -144,8 +141,7 @@ def save_user(n_clicks, username, password, enabled_collapses, selected_user_id)
 
     perms = {"collapses": {k: True for k in (enabled_collapses or [])}}
 
-    SessionFactory = sessionmaker(bind=engine)
-    session = SessionFactory()
+    session = SessionLocal()
     try:
         if selected_user_id:
             user = session.query(User).get(selected_user_id)
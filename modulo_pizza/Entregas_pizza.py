@@ -5,12 +5,13 @@ from datetime import datetime, timedelta
 from sqlalchemy import text, func
 from sqlalchemy.orm import Session
 from app import app
-from banco_dados.banco import Banco, engine, BAIXA, RETIRADA, PRODUTO
+from banco_dados.banco import Banco, engine, BAIXA, RETIRADA, PCP_SALDO, PRODUTO
 import pandas as pd
 import numpy as np
 import json
 from .formularios.form_apontamento_estoque import modal_apontamento_estoque
 from calculos import Filtros
+from formatacao import formatar_numeros, formatar_datas
 from .funcoes.excel_pizza import generate_excel_download
  
 # --- Helper Functions and Data (Pizza View) ---
@@ -38,20 +39,13 @@ def get_daily_delivery_data(cliente_id=None, etiquetas=None, produto_nome=None):
  
     # Query consolidada que faz os joins e a agregação no banco de dados
     query = f"""
-    WITH BaixasAgg AS (
+    WITH SaldosAgg AS (
         SELECT
             p.pcp_produto_id,
-            SUM(b.qtd) AS total_baixas
-        FROM baixa b
-        JOIN pcp p ON b.pcp_id = p.pcp_id
-        GROUP BY p.pcp_produto_id
-    ),
-    RetiradasAgg AS (
-        SELECT
-            p.pcp_produto_id,
-            SUM(r.ret_qtd) AS total_retiradas
-        FROM retirada r
-        JOIN pcp p ON r.ret_id_pcp = p.pcp_id
+            SUM(s.qtd_baixa) AS total_baixas,
+            SUM(s.qtd_retirada) AS total_retiradas
+        FROM pcp_saldo s
+        JOIN pcp p ON s.pcp_id = p.pcp_id
         GROUP BY p.pcp_produto_id
     ),
     RetiradasExpAgg AS (
@@ -69,8 +63,8 @@ def get_daily_delivery_data(cliente_id=None, etiquetas=None, produto_nome=None):
         p.dia_entrega,
         p.pedido_mensal,
         p.tipo_trabalho,
-        COALESCE(ba.total_baixas, 0) AS total_baixas,
-        COALESCE(re.total_retiradas, 0) AS total_retiradas,
+        COALESCE(sa.total_baixas, 0) AS total_baixas,
+        COALESCE(sa.total_retiradas, 0) AS total_retiradas,
         COALESCE(rex.total_retiradas_exp, 0) AS total_retiradas_exp
     FROM (
         SELECT DISTINCT pcp_produto_id, pcp_cliente_id
@@ -78,8 +72,7 @@ def get_daily_delivery_data(cliente_id=None, etiquetas=None, produto_nome=None):
     ) AS pcp_clientes
     JOIN produtos p ON pcp_clientes.pcp_produto_id = p.produto_id
     JOIN clientes c ON pcp_clientes.pcp_cliente_id = c.cliente_id
-    LEFT JOIN BaixasAgg ba ON p.produto_id = ba.pcp_produto_id
-    LEFT JOIN RetiradasAgg re ON p.produto_id = re.pcp_produto_id
+    LEFT JOIN SaldosAgg sa ON p.produto_id = sa.pcp_produto_id
     LEFT JOIN RetiradasExpAgg rex ON p.produto_id = rex.ret_exp_produto_id
     WHERE {where_sql}
     """
@@ -151,18 +144,12 @@ def create_day_column(day_name, children, card_style=None):
 # --- Helper Functions (Empurrado View) ---
 def calcular_somas(pcp_ids):
     with Session(engine) as session:
-        soma_qtd_baixa = dict(session.query(BAIXA.pcp_id, func.sum(BAIXA.qtd))
-                              .filter(BAIXA.pcp_id.in_(pcp_ids))
-                              .group_by(BAIXA.pcp_id).all())
-       
-        soma_qtd_retirada = dict(session.query(RETIRADA.ret_id_pcp, func.sum(RETIRADA.ret_qtd))
-                                 .filter(RETIRADA.ret_id_pcp.in_(pcp_ids))
-                                 .group_by(RETIRADA.ret_id_pcp).all())
+        saldos = session.query(PCP_SALDO.pcp_id, PCP_SALDO.qtd_baixa, PCP_SALDO.qtd_retirada) \
+                        .filter(PCP_SALDO.pcp_id.in_(pcp_ids)).all()
+    soma_qtd_baixa = {pcp_id: qtd_baixa for pcp_id, qtd_baixa, _ in saldos}
+    soma_qtd_retirada = {pcp_id: qtd_retirada for pcp_id, _, qtd_retirada in saldos}
     return soma_qtd_baixa, soma_qtd_retirada
  
-def formatar_numero(val):
-    return '{:,.0f}'.format(val).replace(',', '.') if val is not None else val
- 
 def tabela_pcp_formacao(df):
     banco = Banco()
     df_produtos = banco.ler_tabela("produtos")
@@ -183,7 +170,7 @@ def tabela_pcp_formacao(df):
     df['qtd_retirada'] = df['pcp_id'].map(soma_qtd_retirada).fillna(0)
     df['saldo_em_processo'] = (df['pcp_qtd'] - df['qtd_baixa']).clip(lower=0)
     df['saldo_em_estoque'] = (df['qtd_baixa'] - df['qtd_retirada']).clip(lower=0)
-    df['pcp_entrega_formatada'] = df['pcp_entrega'].dt.strftime('%d/%m/%Y').fillna('')
+    df['pcp_entrega_formatada'] = formatar_datas(df['pcp_entrega'])
     df.sort_values(by='pcp_entrega', ascending=True, inplace=True)
    
     return df
@@ -257,7 +244,7 @@ def tabela_estoque_empurrado(df, cliente, produto, categoria):
    
     df_final.sort_values(by='saldo_em_estoque_por_pedido', ascending=True, inplace=True)
    
-    for col in numeric_cols: df_final[col] = df_final[col].map(formatar_numero)
+    for col in numeric_cols: df_final[col] = formatar_numeros(df_final[col])
        
     df_final = Filtros.filtrar(df_final, {
         'cliente_nome': ('exato', cliente),
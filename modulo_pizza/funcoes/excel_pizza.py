@@ -8,12 +8,11 @@ from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.utils import get_column_letter
 import io
 import base64
+from formatacao import formatar_numero
 
 def format_number(val):
     """Formata números para exibição"""
-    if val is not None and not pd.isna(val):
-        return f"{val:,.0f}".replace(',', '.')
-    return "0"
+    return formatar_numero(val, vazio="0")
 
 def get_status_color(pedido_mensal, imp_qtd, feito_qtd):
     """Determina a cor do status baseado nas quantidades"""
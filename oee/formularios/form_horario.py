@@ -189,16 +189,12 @@ def agendar_producao(n_clicks, setor_id, maquina_id, data, hora_inicio, hora_fin
     # Converter espaçamento de hora para timedelta (ex: '01:00:00' para 1 hora)
     espacamento = timedelta(hours=int(espacamento.split(":")[0]), minutes=int(espacamento.split(":")[1]), seconds=int(espacamento.split(":")[2]))
     
-    df_producao = banco.ler_tabela("producao")
+    # Só precisa saber se existe algum registro da máquina na data
+    agendamentos_existentes = banco.ler_tabela("producao", colunas=["pr_id"], limit=1,
+                                               pr_maquina_id=maquina_id, pr_data=data)
 
-    if not df_producao.empty:
-        agendamentos_existentes = df_producao[
-            (df_producao["pr_maquina_id"] == maquina_id) & 
-            (df_producao["pr_data"] == (data))  # Converter data para string se necessário
-        ]
-
-        if not agendamentos_existentes.empty:
-            return "Já existe um agendamento para esta máquina nesta data."
+    if not agendamentos_existentes.empty:
+        return "Já existe um agendamento para esta máquina nesta data."
     # Criar registros de produção
     registros = []
     
@@ -233,8 +229,7 @@ def agendar_producao(n_clicks, setor_id, maquina_id, data, hora_inicio, hora_fin
         # Avançar para o próximo intervalo
         hora_atual += espacamento
 
-    # Inserir os registros na tabela de produção
-    for registro in registros:
-        banco.inserir_dados("producao", **registro)
+    # Inserir os registros na tabela de produção em uma única transação
+    banco.inserir_em_lote("producao", registros)
     
     return "Agendamento realizado com sucesso!"
\ No newline at end of file
@@ -91,8 +91,8 @@ def preencher_dados_edicao(maquina_id_edit):
         raise dash.exceptions.PreventUpdate
     
     # Obtém os detalhes da máquina selecionada
-    maquina = banco.ler_tabela("maquina").query("maquina_id == @maquina_id_edit").iloc[0]
-    setores = banco.ler_tabela("setor")
+    maquina = banco.ler_tabela("maquina", colunas=["maquina_nome", "setor_id", "maquina_custo"], maquina_id=maquina_id_edit).iloc[0]
+    setores = banco.ler_tabela("setor", colunas=["setor_id", "setor_nome"])
     
     return maquina["maquina_nome"], maquina["setor_id"], maquina["maquina_custo"], [
         {"label": row["setor_nome"], "value": row["setor_id"]} for _, row in setores.iterrows()
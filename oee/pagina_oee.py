@@ -199,9 +199,26 @@ def update_production_table(setor_id, maquina_id, selected_date):
         
     banco = Banco()
     
+    # Filtros das produções, aplicados também nas CTEs para somar só os
+    # apontamentos das produções exibidas
+    filtros = ""
+    params = {}
+    if setor_id:
+        filtros += " AND p.pr_setor_id = :setor_id"
+        params['setor_id'] = setor_id
+    if maquina_id:
+        filtros += " AND p.pr_maquina_id = :maquina_id"
+        params['maquina_id'] = maquina_id
+    if selected_date:
+        filtros += " AND p.pr_data = :selected_date"
+        params['selected_date'] = selected_date
+    
     # Base query
-    query = """
-    WITH apontamentos_producao AS (
+    query = f"""
+    WITH producao_filtrada AS (
+        SELECT p.pr_id FROM producao p WHERE 1=1{filtros}
+    ),
+    apontamentos_producao AS (
         SELECT 
             atp_producao as pr_id,
             CAST(SUM(atp_qtd) AS INTEGER) as total_producao,
@@ -221,6 +238,7 @@ def update_production_table(setor_id, maquina_id, selected_date):
         FROM apontamento_produto ap
         LEFT JOIN pcp ON ap.atp_pcp = pcp.pcp_id
         LEFT JOIN produtos prod ON pcp.pcp_produto_id = prod.produto_id
+        WHERE ap.atp_producao IN (SELECT pr_id FROM producao_filtrada)
         GROUP BY ap.atp_producao
     ),
     apontamentos_parada AS (
@@ -244,6 +262,7 @@ def update_production_table(setor_id, maquina_id, selected_date):
         LEFT JOIN razao r4 ON a.ap_lv4 = r4.ra_id
         LEFT JOIN razao r5 ON a.ap_lv5 = r5.ra_id
         LEFT JOIN razao r6 ON a.ap_lv6 = r6.ra_id
+        WHERE a.ap_pr IN (SELECT pr_id FROM producao_filtrada)
         GROUP BY a.ap_pr
     )
     SELECT 
@@ -281,21 +300,9 @@ def update_production_table(setor_id, maquina_id, selected_date):
     LEFT JOIN categoria_produto cp ON p.pr_categoria_produto_id = cp.cp_id
     LEFT JOIN apontamentos_producao ap ON p.pr_id = ap.pr_id
     LEFT JOIN apontamentos_parada apt ON p.pr_id = apt.pr_id
-    WHERE 1=1
+    WHERE 1=1{filtros}
     """
     
-    # Add filters
-    params = {}
-    if setor_id:
-        query += " AND p.pr_setor_id = :setor_id"
-        params['setor_id'] = setor_id
-    if maquina_id:
-        query += " AND p.pr_maquina_id = :maquina_id"
-        params['maquina_id'] = maquina_id
-    if selected_date:
-        query += " AND p.pr_data = :selected_date"
-        params['selected_date'] = selected_date
-    
     query += " ORDER BY p.pr_data DESC, p.pr_inicio ASC"
     
     # Execute query
@@ -15,7 +15,7 @@ from app import *
 from datetime import datetime, timedelta
 from pcp.pag_principal import *
 
-from banco_dados.banco import df_pcp, listar_pcp, listar_dados, Banco
+from banco_dados.banco import listar_pcp, listar_dados, Banco
 
 col_centered_style={'display': 'flex', 'justify-content': 'center'}
 
@@ -31,7 +31,7 @@ dbc.ModalBody([
                 dbc.Label("ID PCP"),
                 dcc.Dropdown(
                     id="baixa_pcp",
-                options=[{'label': pcp, 'value': pcp} for pcp in df_pcp['pcp_id']],  # Substitua 'df_pcp' com a sua lista de códigos PCP
+                options=[],  # Preenchido por abrir_modal_baixa ao abrir o formulário
                 placeholder="Selecione o id PCP...",
         clearable=False
     )
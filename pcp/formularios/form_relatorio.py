@@ -12,7 +12,7 @@ from app import *
 from datetime import datetime, timedelta
 from pcp.pag_principal import *
 
-from banco_dados.banco import df_pcp, listar_dados, listar_pcp
+from banco_dados.banco import listar_dados, listar_pcp
 
 
 
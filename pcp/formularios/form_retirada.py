@@ -1,7 +1,7 @@
 import dash_bootstrap_components as dbc
 from datetime import date
 from dash import html, dcc, callback_context, dash_table
-from banco_dados.banco import df_pcp, Banco
+from banco_dados.banco import Banco
 
 from dash.dependencies import Input, Output, State, ALL
 
@@ -23,7 +23,7 @@ layout = dbc.Modal([
                 dbc.Label("ID PCP"),
                 dcc.Dropdown(
                     id="retirada_pcp",
-                    options=[{'label': pcp, 'value': pcp} for pcp in df_pcp['pcp_id']],  # Substitua 'df_pcp' com a sua lista de códigos PCP
+                    options=[],  # Preenchido pelo callback ao abrir o modal
                     placeholder="Selecione o id PCP...",
                     clearable=False
                 )
@@ -18,40 +18,20 @@ from pcp.planejamento import planejamento
 from modulo_pizza.Entregas_pizza import layout_dashboard as pizza_layout
 from pcp.formularios import form_solicitacao
 from calculos import *
-from banco_dados.banco import listar_pcp, df_clientes, listar_dados, juncao, listar_lembretes, Banco
+from banco_dados.banco import listar_pcp, listar_pcp_filtrado, listar_dados, juncao, listar_lembretes, Banco
 import json
 from openpyxl.styles import Alignment
 
 banco = Banco()
-df_setores = banco.ler_tabela('setor')
-setor_options = [{'label': 'Todos os Setores', 'value': 'todos'}] + \
-                [{'label': row['setor_nome'], 'value': row['setor_id']} for index, row in df_setores.iterrows()]
 
-def relatorio_planejamento(semana=None, comparacao_semana='=='):
-    banco = Banco()
-    df_plan = banco.ler_tabela('planejamento')
-    df_pcp = listar_pcp()
-    
-    # Merge and filter data similar to the planning page
-    df_merged = pd.merge(df_plan, df_pcp, left_on='id_pcp', right_on='pcp_id', how='left')
-    df_merged['data_programacao'] = pd.to_datetime(df_merged['data_programacao'], errors='coerce')
-    
-    if semana and comparacao_semana:
-        df_merged['semana_prog'] = df_merged['data_programacao'].dt.isocalendar().week.astype('Int64')
-        df_merged = Filtros.filtrar(df_merged.copy(), {'semana_prog': ('comparar_num', (comparacao_semana, semana))})
-    
-    # Rename columns for the report
-    mapeamento_colunas = {
-        'plan_id': 'ID Plan', 'id_pcp': 'ID PCP', 'pcp_pcp': 'PCP OS',
-        'pcp_categoria': 'Categoria', 'cliente_nome': 'Cliente',
-        'produto_nome': 'Produto', 'pcp_qtd': 'Qtd Total OP',
-        'quantidade': 'Qtd Planejada', 'data_programacao': 'Data Prog.',
-        'observacao': 'Obs. Plan.', 'plano_setor': 'plano_setor'
-    }
-    df_relatorio = df_merged.rename(columns=mapeamento_colunas)
-    
-    colunas_finais = list(mapeamento_colunas.values())
-    return df_relatorio[colunas_finais]
+# Colunas da exportação do planejamento (plano_setor vira uma aba por setor)
+COLUNAS_EXPORTACAO_PLANEJAMENTO = {
+    'plan_id': 'ID Plan', 'id_pcp': 'ID PCP', 'pcp_pcp': 'PCP OS',
+    'pcp_categoria': 'Categoria', 'cliente_nome': 'Cliente',
+    'produto_nome': 'Produto', 'pcp_qtd': 'Qtd Total OP',
+    'quantidade': 'Qtd Planejada', 'data_programacao': 'Data Prog.',
+    'observacao': 'Obs. Plan.', 'plano_setor': 'plano_setor'
+}
  
 # ========= Styles ========= #
 card_style={'height': '100%',  'margin-bottom': '12px'}
@@ -345,7 +325,7 @@ html.Div(style={'height': '70px'}),
                                         dbc.Col([
                                         dcc.Dropdown(
                                         id='cliente_filter',
-                                        options=[{'label': i, 'value': i} for i in df_clientes['nome']],
+                                        options=[],  # Preenchido pelo callback atualizar_clientes
                                         placeholder='Cliente',
                                         className='dbc'
                                     ),
@@ -606,15 +586,32 @@ def atualizar_cards(n, click_excel, tipo_produto, produto, status,
     filtro_os, filtro_arte, comparacao_semana, ocorrencia, chapa_selecionada, pagina_chapas, indicadores_selecionados, mostrar_partes):
  
     #FILTROS =========================================
-    df_pcp = listar_pcp()
+    opcao_pote = opcao_pote[0] if opcao_pote else None
+    filtros_pcp = {
+    'cliente_nome': ('exato', cliente),
+   
+    'pcp_pcp': ('contem', ordem_filtro),
+    'produto_nome': ('contem', produto),
+    'pcp_categoria': [('multi', categoria), ('contem', opcao_pote)],
+    'pcp_oc': ('contem', oc),
+    'pcp_cod_prod': ('contem', cod_prod),
+    }
+    if semana is not None and comparacao_semana:
+        # Mesmo recorte que personalizar_tabela aplica depois; aqui já sai filtrado do banco
+        filtros_pcp['pcp_sem'] = ('comparar_num', (comparacao_semana, semana))
+
+    # O estoque de PA recebe o PCP sem os filtros da tabela; as demais telas leem
+    # do banco só as linhas que casam e aplicam em memória o que não foi traduzido
+    if visualizacao == 'estoque_pa':
+        df_pcp, filtros_restantes = listar_pcp(tipado=True), filtros_pcp
+    else:
+        df_pcp, filtros_restantes = listar_pcp_filtrado(filtros_pcp, tipado=True)
  
-    df_filtrado = df_pcp.copy()
+    df_filtrado = df_pcp
     trigg_id = callback_context.triggered[0]['prop_id'].split('.')[0]
  
     try:
-        df_filtrado['pcp_entrega'] = pd.to_datetime(df_filtrado['pcp_entrega'], errors='coerce')
-        df_filtrado['pcp_emissao'] = pd.to_datetime(df_filtrado['pcp_emissao'], errors='coerce')
-       
+        # Leitura tipada: pcp_entrega e pcp_emissao já chegam como datetime64
         linhas_invalidas = df_filtrado[df_filtrado['pcp_entrega'].isna()]
         if not linhas_invalidas.empty:
             print("Linhas com 'pcp_entrega' inválidas:")
@@ -657,23 +654,7 @@ def atualizar_cards(n, click_excel, tipo_produto, produto, status,
     except Exception as e:
         print(f"Erro ao processar o DataFrame: {e}")
  
-    opcao_pote = opcao_pote[0] if opcao_pote else None
-   
-    df_filtrado_final = Filtros.filtrar(df_filtrado,
-    {
-    'cliente_nome': ('exato', cliente),
-   
-    'pcp_pcp': ('contem', ordem_filtro),
-    'produto_nome': ('contem', produto),
-    'pcp_categoria': ('multi', categoria),
-    'pcp_oc': ('contem', oc),
-    'pcp_cod_prod': ('contem', cod_prod),
-    })
- 
-    df_filtrado_final = Filtros.filtrar(df_filtrado_final,
-    {
-    'pcp_categoria': ('contem', opcao_pote),
-    })
+    df_filtrado_final = Filtros.filtrar(df_filtrado, filtros_restantes)
  
     # Filtro para chapas vazias
     chapas_vazias = chapas_vazias_check[0] if chapas_vazias_check else None
@@ -728,7 +709,8 @@ def atualizar_cards(n, click_excel, tipo_produto, produto, status,
     #====================================================================
     if trigg_id == 'btn_exp_excel':
         if visualizacao == 'planejamento_semanal':
-            df = relatorio_planejamento(semana=semana, comparacao_semana=comparacao_semana)
+            df = relatorio_planejamento(semana=semana, comparacao_semana=comparacao_semana, qtd_feita=False,
+                                        colunas=COLUNAS_EXPORTACAO_PLANEJAMENTO)
             excel_data = to_excel_with_sectors(df)
             file_name = f"Relatorio_Planejamento_Semana_{semana}.xlsx"
         elif visualizacao == 'estoque_pa':
@@ -17,7 +17,7 @@ def calcular_totais_categoria(df_merged, semana=31, comparacao_semana='=='):
         # Aplicar filtro de semana primeiro
         if semana is not None and comparacao_semana:
             df_merged['semana_prog'] = df_merged['data_programacao'].dt.isocalendar().week.astype('Int64')
-            df_filtered = Filtros.filtrar(df_merged.copy(), {
+            df_filtered = Filtros.filtrar(df_merged, {
                 'semana_prog': ('comparar_num', (comparacao_semana, semana))
             })
         else:
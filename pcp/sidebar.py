@@ -4,6 +4,7 @@ from dash.dependencies import Input, Output, State
 from dash.exceptions import PreventUpdate
 import pandas as pd
 import io
+from openpyxl import Workbook
 from sqlalchemy import inspect
 import json
 
@@ -18,7 +19,6 @@ from oee.formularios.form_horario import layout as form_horario_layout
 from oee.formularios.form_categoria import layout as form_categoria_layout
 from banco_dados.banco import Banco
 from banco_dados.banco import User
-from sqlalchemy.orm import sessionmaker
 
 from pcp.formularios import form_baixa_producao, form_chapa, form_pcp, form_retirada
 
@@ -31,6 +31,25 @@ def to_excel(df, sheet_name='Dados'):
     output.seek(0)
     return output
 
+def to_excel_em_blocos(blocos, sheet_name='Dados'):
+    """
+    Escreve uma sequência de DataFrames na mesma planilha, linha a linha
+    (openpyxl em modo write_only), sem juntar os blocos em memória.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_name[:31])
+    cabecalho = False
+    for bloco in blocos:
+        if not cabecalho:
+            ws.append(list(bloco.columns))
+            cabecalho = True
+        for linha in bloco.itertuples(index=False, name=None):
+            ws.append([json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else (None if v is None or v != v else v) for v in linha])
+    output = io.BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output
+
 
 # ========= Layout ========= #
 layout = dbc.Container([
@@ -571,8 +590,7 @@ def load_sidebar_permissions(username_text):
         if not username:
             return {}
         banco = Banco()
-        SessionFactory = sessionmaker(bind=banco.engine)
-        session = SessionFactory()
+        session = banco.Session()
         try:
             user = session.query(User).filter_by(username=username).first()
             if not user or not user.user_level:
@@ -625,10 +643,10 @@ def export_selected_table(n_clicks, table_name):
 
     try:
         banco = Banco()
-        with banco.engine.connect() as conn:
-            df = pd.read_sql_table(table_name, conn)
-        
-        return dcc.send_bytes(to_excel(df, sheet_name=table_name).getvalue(), f"{table_name}.xlsx")
+        # Lê em blocos pela chave primária; tabelas grandes (producao, logs) não são carregadas inteiras
+        blocos = banco.ler_em_blocos(table_name)
+
+        return dcc.send_bytes(to_excel_em_blocos(blocos, sheet_name=table_name).getvalue(), f"{table_name}.xlsx")
 
     except Exception as e:
         print(f"Erro ao exportar tabela {table_name}: {e}")
@@ -6,6 +6,7 @@ from dash import html
 import dash_bootstrap_components as dbc
 import numpy as np
 from calculos import *
+from formatacao import formatar_numeros, formatar_moedas, formatar_datas
 from sqlalchemy.orm import Session
 
 def obter_status_ordem_compra_em_lote(pcp_ids):
@@ -25,15 +26,11 @@ def obter_dados_em_lote(pcp_ids):
     Combina todas as consultas ao banco em uma única função para reduzir o número de conexões
     """
     with Session(engine) as session:
-        # Baixas
-        baixas = session.query(BAIXA.pcp_id, func.sum(BAIXA.qtd).label("qtd_baixa")) \
-                        .filter(BAIXA.pcp_id.in_(pcp_ids)) \
-                        .group_by(BAIXA.pcp_id).all()
-        
-        # Retiradas
-        retiradas = session.query(RETIRADA.ret_id_pcp, func.sum(RETIRADA.ret_qtd).label("qtd_retirada")) \
-                          .filter(RETIRADA.ret_id_pcp.in_(pcp_ids)) \
-                          .group_by(RETIRADA.ret_id_pcp).all()
+        # Baixas e retiradas (totais mantidos em pcp_saldo)
+        saldos = session.query(PCP_SALDO.pcp_id, PCP_SALDO.qtd_baixa, PCP_SALDO.qtd_retirada) \
+                        .filter(PCP_SALDO.pcp_id.in_(pcp_ids)).all()
+        baixas = [(pcp_id, qtd_baixa) for pcp_id, qtd_baixa, _ in saldos]
+        retiradas = [(pcp_id, qtd_retirada) for pcp_id, _, qtd_retirada in saldos]
         
         # Status ordem compra
         status_oc = session.query(ORDEM_COMPRA.oc_pcp_id, ORDEM_COMPRA.oc_status) \
@@ -69,26 +66,19 @@ def obter_dados_em_lote(pcp_ids):
             'last_machine': dict(last_machine)
         }
 
-def formatar_numero(val):
-    if pd.isna(val):
-        return val
-    return '{:,.0f}'.format(val).replace(',', '.')
-
 def personalizar_tabela(df, tipo_produto, status, semana, comparacao_semana='==', ocorrencia=None):
     banco = Banco()
     
     # Carregar dados do banco uma única vez
     df_produtos = banco.ler_tabela("produtos")
-    df_planejamento = banco.ler_tabela("planejamento")
-    df_valor_produto = banco.ler_tabela("valor_produto")
+    df_planejamento = banco.ler_tabela("planejamento", tipado=True)
+    df_valor_produto = banco.ler_tabela("valor_produto", tipado=True)
     
     # Obter o valor mais recente do produto
     if not df_valor_produto.empty:
-        df_valor_produto['data'] = pd.to_datetime(df_valor_produto['data'])
         df_valor_produto = df_valor_produto.sort_values(by='data', ascending=False).drop_duplicates('produto_id')
 
-    # Converter datas uma única vez
-    df_planejamento['data_programacao'] = pd.to_datetime(df_planejamento['data_programacao'], errors='coerce')
+    # Leituras tipadas: as datas (aqui e no df de listar_pcp(tipado=True)) já são datetime64
     df_planejamento['semana_planejamento'] = df_planejamento['data_programacao'].dt.isocalendar().week
     
     # Otimizar merge de planejamento
@@ -120,11 +110,6 @@ def personalizar_tabela(df, tipo_produto, status, semana, comparacao_semana='=='
         ""
     )
     
-    # Converter datas de uma vez
-    colunas_datas = ['pcp_entrega', 'pcp_emissao', 'pcp_primiera_entrega']
-    for col in colunas_datas:
-        df_filtrado[col] = pd.to_datetime(df_filtrado[col], format='%Y-%m-%d', errors='coerce')
-    
     # Calcular semanas de uma vez
     df_filtrado['pcp_semana'] = df_filtrado['pcp_entrega'].dt.isocalendar().week
     df_filtrado['pcp_semana_primeira'] = df_filtrado['pcp_primiera_entrega'].dt.isocalendar().week
@@ -203,14 +188,14 @@ def personalizar_tabela(df, tipo_produto, status, semana, comparacao_semana='=='
     # Formatar colunas numéricas de uma vez
     colunas_numericas = ['saldo_em_estoque', 'pcp_qtd', 'saldo_em_processo', 'qtd_retirada']
     for col in colunas_numericas:
-        df_filtrado[col] = df_filtrado[col].apply(formatar_numero)
+        df_filtrado[col] = formatar_numeros(df_filtrado[col])
     
-    df_filtrado['valor'] = df_filtrado['valor'].apply(lambda x: f'R$ {x:,.2f}'.replace(',', 'v').replace('.', ',').replace('v', '.') if pd.notna(x) else '')
+    df_filtrado['valor'] = formatar_moedas(df_filtrado['valor'])
 
     # Formatar datas de uma vez
-    df_filtrado['pcp_entrega_formatada'] = df_filtrado['pcp_entrega'].dt.strftime('%d/%m/%Y').fillna('')
-    df_filtrado['pcp_emissao_formatada'] = df_filtrado['pcp_emissao'].dt.strftime('%d/%m/%Y').fillna('')
-    df_filtrado['pcp_primiera_entrega_formatada'] = df_filtrado['pcp_primiera_entrega'].dt.strftime('%d/%m/%Y').fillna('')
+    df_filtrado['pcp_entrega_formatada'] = formatar_datas(df_filtrado['pcp_entrega'])
+    df_filtrado['pcp_emissao_formatada'] = formatar_datas(df_filtrado['pcp_emissao'])
+    df_filtrado['pcp_primiera_entrega_formatada'] = formatar_datas(df_filtrado['pcp_primiera_entrega'])
     
     # Ordenar
     df_filtrado = df_filtrado.sort_values(by='pcp_entrega', ascending=True).head(120)
@@ -9,29 +9,7 @@ from app import app # Importar a instância principal do app
 # Instanciar a conexão com o banco de dados
 banco = Banco()
 
-# --- Carregar dados para os dropdowns ---
-try:
-    df_setores = banco.ler_tabela('setor')
-    setor_options = [{'label': row['setor_nome'], 'value': row['setor_id']} for index, row in df_setores.iterrows()]
-except Exception as e:
-    print(f"Erro ao carregar setores: {e}")
-    setor_options = []
-
-try:
-    df_pcp = banco.ler_tabela('pcp')
-    # Filtrar PCPs que não são nulos e converter o label para string
-    df_pcp_filtered = df_pcp[pd.notna(df_pcp['pcp_pcp'])]
-    pcp_options = [{'label': str(int(row['pcp_pcp'])), 'value': row['pcp_id']} for index, row in df_pcp_filtered.iterrows()]
-except Exception as e:
-    print(f"Erro ao carregar PCP: {e}")
-    pcp_options = []
-    
-try:
-    df_maquinas = banco.ler_tabela('maquina')
-except Exception as e:
-    print(f"Erro ao carregar máquinas: {e}")
-    df_maquinas = pd.DataFrame()
-
+# Setores, máquinas e PCPs dos dropdowns são lidos nos callbacks, quando o modal abre
 # Itens do Checklist por tipo de produto - podem ser modificados diretamente no código
 checklist_items_por_produto = {
     "Pote e Copo": {
@@ -124,7 +102,7 @@ def get_layout():
                             html.Label("Setor", htmlFor="inspecao-setor-dropdown"),
                             dcc.Dropdown(
                                 id="inspecao-setor-dropdown",
-                                options=setor_options,
+                                options=[],  # preenchido ao abrir o modal
                                 placeholder="Selecione o Setor",
                             ),
                         ], md=6),
@@ -217,7 +195,11 @@ def update_maquina_dropdown(setor_id):
     if not setor_id:
         return [], True
     
-    maquinas_filtradas = df_maquinas[df_maquinas['setor_id'] == setor_id]
+    try:
+        maquinas_filtradas = banco.ler_tabela('maquina', colunas=['maquina_id', 'maquina_nome'], setor_id=setor_id)
+    except Exception as e:
+        print(f"Erro ao carregar máquinas: {e}")
+        maquinas_filtradas = pd.DataFrame(columns=['maquina_id', 'maquina_nome'])
     maquina_options = [{'label': row['maquina_nome'], 'value': row['maquina_id']} for _, row in maquinas_filtradas.iterrows()]
     
     return maquina_options, False
@@ -302,9 +284,8 @@ def fechar_modal(n_clicks):
 def _get_pcp_options():
     """Lê PCPs do banco e retorna options do Dropdown sempre atualizadas."""
     try:
-        df_pcp = banco.ler_tabela('pcp')
-        # filtra apenas linhas com pcp_pcp não nulo
-        df_pcp = df_pcp[pd.notna(df_pcp['pcp_pcp'])]
+        # apenas linhas com pcp_pcp não nulo, filtradas no SQL
+        df_pcp = banco.ler_tabela('pcp', colunas=['pcp_id', 'pcp_pcp'], pcp_pcp__ne=None)
         # cuidado com conversão para int/str (pode ter valores não numéricos)
         options = []
         for _, row in df_pcp.iterrows():
@@ -327,4 +308,18 @@ def refresh_pcp_options_on_modal(is_open):
     if not is_open:
         return no_update, no_update
     options = _get_pcp_options()
-    return options, None  # limpa o valor selecionado ao abrir
\ No newline at end of file
+    return options, None  # limpa o valor selecionado ao abrir
+
+@app.callback(
+    Output("inspecao-setor-dropdown", "options"),
+    Input("modal-form-inspecao", "is_open"),
+)
+def refresh_setor_options_on_modal(is_open):
+    if not is_open:
+        return no_update
+    try:
+        df_setores = banco.ler_tabela('setor', colunas=['setor_id', 'setor_nome'])
+    except Exception as e:
+        print(f"Erro ao carregar setores: {e}")
+        return []
+    return [{'label': row['setor_nome'], 'value': row['setor_id']} for index, row in df_setores.iterrows()]
\ No newline at end of file
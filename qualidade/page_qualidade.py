@@ -7,10 +7,11 @@ import dash
 from app import app
 from sqlalchemy import create_engine, text, func
 from sqlalchemy.orm import Session
-from banco_dados.banco import engine, BAIXA, RETIRADA, Banco
+from banco_dados.banco import engine, BAIXA, RETIRADA, PCP_SALDO, Banco
 from dash import dash_table
 import numpy as np
 from .formularios import form_retrabalho
+from formatacao import formatar_numeros
  
 # ========= Styles ========= #
 card_style = {'height': '100%', 'margin-bottom': '12px'}
@@ -121,29 +122,15 @@ def obter_dados_em_lote(pcp_ids):
         return {'baixas': {}, 'retiradas': {}}
  
     with Session(engine) as session:
-        # Baixas
-        baixas = session.query(BAIXA.pcp_id, func.sum(BAIXA.qtd).label("qtd_baixa")) \
-                        .filter(BAIXA.pcp_id.in_(pcp_ids)) \
-                        .group_by(BAIXA.pcp_id).all()
-       
-        # Retiradas
-        retiradas = session.query(RETIRADA.ret_id_pcp, func.sum(RETIRADA.ret_qtd).label("qtd_retirada")) \
-                          .filter(RETIRADA.ret_id_pcp.in_(pcp_ids)) \
-                          .group_by(RETIRADA.ret_id_pcp).all()
+        # Baixas e retiradas (totais mantidos em pcp_saldo)
+        saldos = session.query(PCP_SALDO.pcp_id, PCP_SALDO.qtd_baixa, PCP_SALDO.qtd_retirada) \
+                        .filter(PCP_SALDO.pcp_id.in_(pcp_ids)).all()
        
         return {
-            'baixas': dict(baixas),
-            'retiradas': dict(retiradas),
+            'baixas': {pcp_id: qtd_baixa for pcp_id, qtd_baixa, _ in saldos},
+            'retiradas': {pcp_id: qtd_retirada for pcp_id, _, qtd_retirada in saldos},
         }
  
-def formatar_numero(val):
-    if pd.isna(val) or val == '':
-        return ''
-    try:
-        return '{:,.0f}'.format(float(val)).replace(',', '.')
-    except (ValueError, TypeError):
-        return val
- 
 def gerar_tabela_qualidade(lot, produto, cliente, categoria, status_baixa_filtro, status_retrabalho_filtro):
    
     query = text("""
@@ -221,7 +208,7 @@ def gerar_tabela_qualidade(lot, produto, cliente, categoria, status_baixa_filtro
  
     colunas_formatar = ['pcp_qtd', 'saldo_em_processo', 'saldo_em_estoque', 'qtd_retirada', 'qtd_retrabalho']
     for col in colunas_formatar:
-        df_filtrado[col] = df_filtrado[col].apply(formatar_numero)
+        df_filtrado[col] = formatar_numeros(df_filtrado[col], vazio='')
  
     colunas_tabela = [
         {"name": "OC", "id": "pcp_oc"},
@@ -97,6 +97,8 @@ def tabela_estoque(df, cliente, produto, categoria, tipo_produto):
     )
     df_somas['qtd_retirada'] = df_somas['qtd_retirada_mes_atual'].fillna(0)
     df_somas.drop('qtd_retirada_mes_atual', axis=1, inplace=True)
+    # Com listar_pcp(tipado=True) estas colunas são categorias, que não aceitam o fillna(0) abaixo
+    df_somas = df_somas.astype({'pcp_categoria': object, 'cliente_nome': object})
     
     banco = Banco()
     df_produtos = banco.ler_tabela("produtos")
@@ -227,6 +229,8 @@ def relatorio_estoque(df, cliente, produto, categoria, tipo_produto):
     )
     df_somas['qtd_retirada'] = df_somas['qtd_retirada_mes_atual'].fillna(0)
     df_somas.drop('qtd_retirada_mes_atual', axis=1, inplace=True)
+    # Com listar_pcp(tipado=True) estas colunas são categorias, que não aceitam o fillna(0) abaixo
+    df_somas = df_somas.astype({'pcp_categoria': object, 'cliente_nome': object})
     
     df_produtos = banco.ler_tabela("produtos")
     df_final = df_produtos.merge(df_somas, on="produto_id", how="left").fillna(0)
@@ -0,0 +1,51 @@
+"""
+Edição pelo Banco com o id vindo como texto, como os callbacks do Dash mandam.
+
+A engine é criada na importação de banco_dados.banco a partir de
+PCP_BD_ARQUIVO, então cada teste roda em um subprocesso sobre um banco novo.
+"""
+from pathlib import Path
+import os
+import subprocess
+import sys
+import textwrap
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+
+def _rodar(tmp_path, codigo):
+    ambiente = dict(os.environ, PCP_BD_ARQUIVO=str(tmp_path / 'bd_teste.sqlite'), PCP_SNAPSHOT_INTERVALO='0',
+                    PCP_LOG_CONSULTAS_LENTAS=str(tmp_path / 'consultas_lentas.log'))
+    processo = subprocess.run([sys.executable, '-c', textwrap.dedent(codigo)], cwd=RAIZ_PROJETO, env=ambiente,
+                              capture_output=True, text=True, timeout=120)
+    assert processo.returncode == 0, processo.stdout[-2000:] + processo.stderr[-2000:]
+    return processo.stdout
+
+
+def test_editar_dado_com_id_texto(tmp_path):
+    saida = _rodar(tmp_path, """
+        from banco_dados.banco import Banco
+        banco = Banco()
+        banco.inserir_dados('clientes', nome='CLIENTE A')
+        id_cliente = int(banco.ler_tabela('clientes')['cliente_id'].iat[0])
+        print('RESULTADO', banco.editar_dado('clientes', str(id_cliente), nome='CLIENTE B'))
+        print('NOME', banco.ler_tabela('clientes')['nome'].iat[0])
+    """)
+    assert 'RESULTADO True' in saida
+    assert 'NOME CLIENTE B' in saida
+
+
+def test_editar_em_lote_com_ids_texto(tmp_path):
+    saida = _rodar(tmp_path, """
+        from banco_dados.banco import Banco
+        banco = Banco()
+        banco.inserir_dados('clientes', nome='CLIENTE A')
+        banco.inserir_dados('clientes', nome='CLIENTE B')
+        ids = banco.ler_tabela('clientes', order_by='cliente_id')['cliente_id'].tolist()
+        alteradas = banco.editar_em_lote('clientes', {str(ids[0]): {'nome': 'X'}, ids[1]: {'cli_prazo': '30'}})
+        print('ALTERADAS', alteradas)
+        df = banco.ler_tabela('clientes', order_by='cliente_id')
+        print('NOMES', list(df['nome']), list(df['cli_prazo']))
+    """)
+    assert 'ALTERADAS 2' in saida
+    assert "NOMES ['X', 'CLIENTE B'] [None, '30']" in saida
@@ -0,0 +1,78 @@
+"""
+Cache de consultas: resultados de erro não ficam guardados e escritas de fora
+da engine invalidam o cache.
+"""
+import sqlite3
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from banco_dados.cache import (CacheConsultas, cache_consultas, em_cache, monitorar_escritas, nao_guardar_resultado,
+                               versoes)
+
+
+def test_resultado_de_erro_nao_fica_no_cache():
+    cache = CacheConsultas()
+    chamadas = []
+
+    def carregar():
+        chamadas.append(1)
+        if len(chamadas) == 1:
+            nao_guardar_resultado()
+            return pd.DataFrame()
+        return pd.DataFrame({'a': [1]})
+
+    assert cache.obter('chave', ('tabela_teste',), carregar).empty
+    assert len(cache.obter('chave', ('tabela_teste',), carregar)) == 1
+    assert len(cache.obter('chave', ('tabela_teste',), carregar)) == 1
+    assert len(chamadas) == 2
+
+
+def test_erro_em_funcao_interna_nao_guarda_a_externa():
+    falhar = [True]
+
+    @em_cache('tabela_teste_interna')
+    def interna():
+        if falhar[0]:
+            nao_guardar_resultado()
+            return pd.DataFrame()
+        return pd.DataFrame({'a': [1, 2]})
+
+    @em_cache('tabela_teste_interna')
+    def externa():
+        return len(interna())
+
+    cache_consultas.limpar()
+    assert externa() == 0
+    falhar[0] = False
+    assert externa() == 2
+
+
+def test_escrita_de_outra_conexao_invalida_o_cache(tmp_path):
+    arquivo = tmp_path / 'bd_teste.sqlite'
+    engine = create_engine(f'sqlite:///{arquivo}')
+    with engine.begin() as conn:
+        conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+        conn.exec_driver_sql('CREATE TABLE tabela_teste_vigia (x INTEGER)')
+    monitorar_escritas(engine)
+
+    @em_cache('tabela_teste_vigia')
+    def contar():
+        with engine.connect() as conn:
+            return conn.execute(text('SELECT COUNT(*) FROM tabela_teste_vigia')).scalar()
+
+    assert contar() == 0
+    # Escrita pela engine: só a versão da tabela muda, não a global
+    global_antes = versoes(())
+    with engine.begin() as conn:
+        conn.execute(text('INSERT INTO tabela_teste_vigia VALUES (1)'))
+    assert versoes(()) == global_antes
+    assert contar() == 1
+
+    # Escrita por fora (outro processo, sqlite3 direto): invalida tudo
+    externa = sqlite3.connect(arquivo)
+    externa.execute('INSERT INTO tabela_teste_vigia VALUES (2)')
+    externa.commit()
+    externa.close()
+    assert contar() == 2
+    engine.dispose()
@@ -0,0 +1,43 @@
+"""
+Baixas somadas por semana da programação (calculos.somar_baixas_na_semana)
+na virada do ano.
+
+calculos importa banco_dados.banco, que cria a engine a partir de
+PCP_BD_ARQUIVO, então o teste roda em um subprocesso sobre um banco novo.
+"""
+from pathlib import Path
+import os
+import subprocess
+import sys
+import textwrap
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+
+def _rodar(tmp_path, codigo):
+    ambiente = dict(os.environ, PCP_BD_ARQUIVO=str(tmp_path / 'bd_teste.sqlite'), PCP_SNAPSHOT_INTERVALO='0',
+                    PCP_LOG_CONSULTAS_LENTAS=str(tmp_path / 'consultas_lentas.log'))
+    processo = subprocess.run([sys.executable, '-c', textwrap.dedent(codigo)], cwd=RAIZ_PROJETO, env=ambiente,
+                              capture_output=True, text=True, timeout=120)
+    assert processo.returncode == 0, processo.stdout[-2000:] + processo.stderr[-2000:]
+    return processo.stdout
+
+
+def test_baixas_pela_semana_iso_na_virada_do_ano(tmp_path):
+    saida = _rodar(tmp_path, """
+        import pandas as pd
+        from calculos import somar_baixas_na_semana
+
+        # 29/12/2025 e 01/01/2026 são a semana 1 de 2026; 01/01/2025 é a semana 1 de 2025
+        planejamento = pd.DataFrame({
+            'pcp_id': [1, 1, 2],
+            'data_programacao': pd.to_datetime(['2026-01-01', '2025-12-29', '2025-06-10']),
+        })
+        baixas = pd.DataFrame({
+            'pcp_id': [1, 1, 1, 2],
+            'qtd': [10, 5, 7, 3],
+            'data': pd.to_datetime(['2025-12-29', '2026-01-02', '2025-01-01', '2025-06-12']),
+        })
+        print('QTD', somar_baixas_na_semana(planejamento, baixas).tolist())
+    """)
+    assert 'QTD [15, 15, 3]' in saida
@@ -0,0 +1,37 @@
+"""
+Migrações executadas na importação de banco_dados.banco sobre um banco antigo.
+"""
+from pathlib import Path
+import os
+import sqlite3
+import subprocess
+import sys
+
+RAIZ_PROJETO = Path(__file__).resolve().parent.parent
+
+
+def test_baixa_sem_ajuste_ganha_a_coluna(tmp_path):
+    arquivo = tmp_path / 'bd_antigo.sqlite'
+    conexao = sqlite3.connect(arquivo)
+    # baixa como era antes de o modelo declarar ajuste
+    conexao.execute(
+        "CREATE TABLE baixa (baixa_id INTEGER PRIMARY KEY, pcp_id INTEGER NOT NULL, qtd INTEGER NOT NULL, "
+        "pallets INTEGER, turno VARCHAR(50), maquina VARCHAR(50), observacao VARCHAR(255), data DATE NOT NULL, "
+        "categoria_qualidade INTEGER, status VARCHAR(50), notafiscal VARCHAR(50))"
+    )
+    conexao.execute("INSERT INTO baixa (pcp_id, qtd, data) VALUES (1, 10, '2024-01-02')")
+    conexao.commit()
+    conexao.close()
+
+    ambiente = dict(os.environ, PCP_BD_ARQUIVO=str(arquivo), PCP_SNAPSHOT_INTERVALO='0',
+                    PCP_LOG_CONSULTAS_LENTAS=str(tmp_path / 'consultas_lentas.log'))
+    processo = subprocess.run([sys.executable, '-c', 'import banco_dados.banco'], cwd=RAIZ_PROJETO, env=ambiente,
+                              capture_output=True, text=True, timeout=120)
+    assert processo.returncode == 0, processo.stderr[-2000:]
+
+    conexao = sqlite3.connect(arquivo)
+    colunas = [linha[1] for linha in conexao.execute("PRAGMA table_info(baixa)")]
+    linhas = conexao.execute("SELECT qtd, ajuste FROM baixa").fetchall()
+    conexao.close()
+    assert colunas[-1] == 'ajuste'
+    assert linhas == [(10, None)]